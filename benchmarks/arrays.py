@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Compare batched array export to converting each graph in a loop.
+
+Usage::
+
+    python benchmarks/arrays.py FILE [REPEAT]
+
+The graphs in the corpus are converted to node, edge, and attribute
+arrays with a loop over :meth:`~penman.graph.Graph.instances`,
+:meth:`~penman.graph.Graph.edges`, and
+:meth:`~penman.graph.Graph.attributes` of each graph, with
+:func:`penman.corpus.to_arrays`, and with
+:meth:`penman.corpus.GraphCorpus.to_arrays` from a corpus built
+beforehand, and the edges are checked to be the same.
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from penman.codec import PENMANCodec
+from penman.corpus import (GraphCorpus, to_arrays)
+
+
+def read(path):
+    with open(path, encoding='utf-8') as fh:
+        return list(PENMANCodec().iterdecode(fh))
+
+
+def looped(graphs):
+    vocab = {}
+    concepts, sources, targets, roles = [], [], [], []
+    attr_sources, attr_roles, attr_targets = [], [], []
+    offset = 0
+    for g in graphs:
+        nodes = {}
+        for var in [t[0] for t in g.triples] + [g.top]:
+            if var is not None and var not in nodes:
+                nodes[var] = offset + len(nodes)
+        graph_concepts = [-1] * len(nodes)
+        for source, _, concept in reversed(g.instances()):
+            graph_concepts[nodes[source] - offset] = vocab.setdefault(
+                concept, len(vocab))
+        concepts.extend(graph_concepts)
+        for source, role, target in g.edges():
+            sources.append(nodes[source])
+            targets.append(nodes[target])
+            roles.append(vocab.setdefault(role, len(vocab)))
+        for source, role, target in g.attributes():
+            attr_sources.append(nodes[source])
+            attr_roles.append(vocab.setdefault(role, len(vocab)))
+            attr_targets.append(vocab.setdefault(target, len(vocab)))
+        offset += len(nodes)
+    return (np.array(concepts), np.array(sources), np.array(targets),
+            np.array(roles), np.array(attr_sources), np.array(attr_roles),
+            np.array(attr_targets))
+
+
+def batched(graphs):
+    return to_arrays(graphs)
+
+
+def main(path, repeat):
+    graphs = read(path)
+    corpus = GraphCorpus(graphs)
+    expected = looped(graphs)
+    for arrays in (batched(graphs), corpus.to_arrays()):
+        if not ((expected[1] == arrays.edge_sources).all()
+                and (expected[2] == arrays.edge_targets).all()):
+            sys.exit('error: edges differ')
+    print(f'{len(graphs)} graphs')
+    times = {}
+    for name, func in (('looped', lambda: looped(graphs)),
+                       ('batched', lambda: batched(graphs)),
+                       ('corpus', corpus.to_arrays)):
+        times[name] = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f'{name:>16}  {times[name]:8.3f}s')
+    for name in ('batched', 'corpus'):
+        speedup = times['looped'] / times[name]
+        print(f'{name + " speedup":>16}  {speedup:8.1f}x')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('usage: python benchmarks/arrays.py FILE [REPEAT]')
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""
+Compare canonical encoding to other ways of normalizing graphs.
+
+Usage::
+
+    python benchmarks/canonicalize.py FILE [REPEAT]
+
+Every graph in the corpus is encoded with
+:meth:`penman.codec.PENMANCodec.encode` in its original layout, after
+:func:`penman.layout.reconfigure` (the usual way to discard the
+original layout), and with ``canonical=True``. Canonical encodings
+are checked to be the same when the triples of each graph are
+reversed.
+"""
+
+import sys
+import timeit
+
+from penman.codec import PENMANCodec
+from penman.graph import Graph
+from penman import layout
+
+codec = PENMANCodec()
+
+
+def read(path):
+    with open(path, encoding='utf-8') as fh:
+        return list(codec.iterdecode(fh))
+
+
+def encoded(graphs):
+    return [codec.encode(g) for g in graphs]
+
+
+def reconfigured(graphs):
+    return [codec.format(layout.reconfigure(g)) for g in graphs]
+
+
+def canonical(graphs):
+    return [codec.encode(g, canonical=True) for g in graphs]
+
+
+def main(path, repeat):
+    graphs = read(path)
+    reversed_graphs = [Graph(list(reversed(g.triples)), top=g.top)
+                       for g in graphs]
+    if canonical(graphs) != canonical(reversed_graphs):
+        sys.exit('error: canonical encodings differ')
+    print(f'{len(graphs)} graphs')
+    times = {}
+    for func in (encoded, reconfigured, canonical):
+        times[func] = min(timeit.repeat(lambda: func(graphs),
+                                        number=1, repeat=repeat))
+        print(f'{func.__name__:>16}  {times[func]:8.3f}s')
+    speedup = times[reconfigured] / times[canonical]
+    print(f'{"speedup":>16}  {speedup:8.1f}x')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('usage: python benchmarks/canonicalize.py FILE [REPEAT]')
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
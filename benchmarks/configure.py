@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""
+Compare configuring graphs without layout markers to rescanning.
+
+Usage::
+
+    python benchmarks/configure.py [REPEAT]
+
+Graphs are random trees of nodes with a concept each, plus some
+reentrant ``:mod`` edges, built directly from their triples in a
+shuffled order so they have no layout markers, as when graphs are
+created by a program. The rescanning configuration is the one used by
+:func:`penman.layout.configure` before graphs without markers were
+configured in one pass. It is reproduced here with the functions of
+:mod:`penman.layout` so only the strategy differs, and the trees are
+checked to be the same.
+"""
+
+import random
+import sys
+import timeit
+
+from penman.graph import Graph
+from penman.model import Model
+from penman.tree import Tree
+from penman.layout import (
+    configure,
+    _configure,
+    _configure_node,
+    _find_next,
+)
+
+
+SIZES = (10, 100, 1000, 10000)
+
+
+def rescanning_configure(g, model=Model()):
+    node, data, nodemap = _configure(g, None, model, False)
+    while data:
+        skipped, var, data = _find_next(data, nodemap)
+        _configure_node(var, data, nodemap, model)
+        data = skipped + data
+    return Tree(node, metadata=g.metadata)
+
+
+def graph(size, rng):
+    """Return a shuffled graph of about *size* triples."""
+    count = max(2, size * 3 // 7)
+    variables = [f'n{i}' for i in range(count)]
+    triples = [(var, ':instance', f'c{rng.randrange(10)}')
+               for var in variables]
+    for i in range(1, count):
+        parent = variables[rng.randrange(i)]
+        triples.append((parent, f':ARG{rng.randrange(3)}', variables[i]))
+    while len(triples) < size:
+        triples.append((rng.choice(variables), ':mod', rng.choice(variables)))
+    rng.shuffle(triples)
+    return Graph(triples, top=variables[0])
+
+
+def main(repeat):
+    rng = random.Random(1)
+    print(f'{"triples":>7}  {"rescanning":>12}  {"one pass":>12}')
+    for size in SIZES:
+        g = graph(size, rng)
+        if rescanning_configure(g) != configure(g):
+            sys.exit('error: trees differ')
+        number = max(1, 10000 // size)
+        times = [min(timeit.repeat(lambda: func(g),
+                                   number=number, repeat=repeat)) / number
+                 for func in (rescanning_configure, configure)]
+        print(f'{size:>7}  {times[0] * 1000:10.3f}ms'
+              f'  {times[1] * 1000:10.3f}ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
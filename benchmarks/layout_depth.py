@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+Compare iterative tree interpretation and configuration to recursive.
+
+Usage::
+
+    python benchmarks/layout_depth.py [REPEAT]
+
+Trees are single chains of nested nodes such as::
+
+    (n0 / c :ARG (n1 / c :ARG (n2 / c ... (x / c))))
+
+The recursive functions are the ones used by
+:func:`penman.layout.interpret` and :func:`penman.layout.configure`
+before nested nodes were visited with an explicit stack. They are
+reproduced here with the rest of :mod:`penman.layout` so only the
+traversal differs, and the results are checked to be the same.
+"""
+
+import sys
+import timeit
+
+from penman.graph import Graph, CONCEPT_ROLE
+from penman.model import Model
+from penman.tree import Tree, is_atomic
+from penman.layout import (
+    Push,
+    POP,
+    interpret,
+    _configure_node,
+    _preconfigure,
+)
+
+
+DEPTHS = (10, 100, 1000, 10000)
+
+model = Model()
+
+
+def recursive_interpret(t):
+    variables = {v for v, _ in t.nodes()}
+    top, triples, epidata = _interpret_node(t.node, variables)
+    return Graph(triples, top=top, epidata=epidata)
+
+
+def _interpret_node(t, variables):
+    has_concept = False
+    triples = []
+    epidata = {}
+    var, edges = t
+    for role, target in edges:
+        epis = []
+        if role == '/':
+            role = CONCEPT_ROLE
+            has_concept = True
+        if is_atomic(target):
+            triple = (var, role, target)
+            triples.append(triple)
+            epidata[triple] = epis
+        else:
+            triple = model.deinvert((var, role, target[0]))
+            triples.append(triple)
+            epidata[triple] = epis
+            epidata[triple].append(Push(target[0]))
+            _, _triples, _epis = _interpret_node(target, variables)
+            triples.extend(_triples)
+            epidata.update(_epis)
+            epidata[triples[-1]].append(POP)
+    if not has_concept:
+        instance = (var, CONCEPT_ROLE, None)
+        triples.insert(0, instance)
+        epidata[instance] = []
+    return var, triples, epidata
+
+
+def recursive_configure(g):
+    data = _preconfigure(g.triples, g.epidata, False)
+    data.reverse()
+    nodemap = {var: None for var in g.variables()}
+    nodemap[g.top] = (g.top, [])
+    return Tree(_recursive_configure_node(g.top, data, nodemap))
+
+
+def _recursive_configure_node(var, data, nodemap):
+    node = nodemap[var]
+    edges = node[1]
+    while data:
+        datum = data.pop()
+        if datum is POP:
+            break
+        triple, push = datum
+        if triple[0] == var:
+            source, role, target = triple
+        elif triple[2] == var:
+            source, role, target = model.invert(triple)
+        else:
+            data.append(datum)
+            break
+        if role == CONCEPT_ROLE:
+            if not target:
+                continue
+            role = '/'
+            index = 0
+        else:
+            index = len(edges)
+        if push and push.variable == target:
+            nodemap[push.variable] = (push.variable, [])
+            target = _recursive_configure_node(push.variable, data, nodemap)
+        elif target in nodemap and nodemap[target] is None:
+            nodemap[target] = node
+        edges.insert(index, (role, target))
+    return node
+
+
+def iterative_configure(g):
+    data = _preconfigure(g.triples, g.epidata, False)
+    data.reverse()
+    nodemap = {var: None for var in g.variables()}
+    nodemap[g.top] = (g.top, [])
+    return Tree(_configure_node(g.top, data, nodemap, model))
+
+
+def chain(depth):
+    node = ('x', [('/', 'c')])
+    for i in range(depth - 1, -1, -1):
+        node = (f'n{i}', [('/', 'c'), (':ARG', node)])
+    return Tree(node)
+
+
+def timed(func, arg, number, repeat):
+    try:
+        t = min(timeit.repeat(lambda: func(arg),
+                              number=number, repeat=repeat))
+    except RecursionError:
+        return f'{"RecursionError":>14}'
+    return f'{t / number * 1000:12.3f}ms'
+
+
+def main(repeat):
+    print(f'{"":>7}  {"interpret":>30}  {"configure":>30}')
+    print(f'{"depth":>7}' + '  {:>14}  {:>14}'.format(
+        'recursive', 'iterative') * 2)
+    for depth in DEPTHS:
+        t = chain(depth)
+        g = interpret(t)
+        if depth < sys.getrecursionlimit() // 2:
+            if recursive_interpret(t).triples != g.triples:
+                sys.exit(f'error: graphs differ at depth {depth}')
+            if recursive_configure(g) != iterative_configure(g):
+                sys.exit(f'error: trees differ at depth {depth}')
+        number = max(1, 10000 // depth)
+        times = [timed(recursive_interpret, t, number, repeat),
+                 timed(interpret, t, number, repeat),
+                 timed(recursive_configure, g, number, repeat),
+                 timed(iterative_configure, g, number, repeat)]
+        print(f'{depth:>7}  ' + '  '.join(times))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+"""
+Compare reading only metadata to parsing every graph.
+
+Usage::
+
+    python benchmarks/metadata.py FILE [REPEAT]
+
+The metadata is read with :func:`penman.corpus.iter_metadata` and
+with :meth:`penman.codec.PENMANCodec.iterparse`, and the two are
+checked to be the same.
+"""
+
+import sys
+import timeit
+
+from penman.codec import PENMANCodec
+from penman.corpus import iter_metadata
+
+
+def parsed_metadata(path):
+    with open(path, encoding='utf-8') as fh:
+        return [tree.metadata for tree in PENMANCodec().iterparse(fh)]
+
+
+def scanned_metadata(path):
+    return list(iter_metadata(path))
+
+
+def main(path, repeat):
+    if parsed_metadata(path) != scanned_metadata(path):
+        sys.exit('error: metadata differs')
+    times = {}
+    for func in (parsed_metadata, scanned_metadata):
+        times[func] = min(timeit.repeat(lambda: func(path),
+                                        number=1, repeat=repeat))
+        print(f'{func.__name__:>16}  {times[func]:8.3f}s')
+    speedup = times[parsed_metadata] / times[scanned_metadata]
+    print(f'{"speedup":>16}  {speedup:8.1f}x')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('usage: python benchmarks/metadata.py FILE [REPEAT]')
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
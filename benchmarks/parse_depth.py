@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Compare the iterative parser to a recursive one on deeply nested graphs.
+
+Usage::
+
+    python benchmarks/parse_depth.py [REPEAT]
+
+Graphs are single chains of nested nodes such as::
+
+    (n0 / c :ARG (n1 / c :ARG (n2 / c ... (x / c))))
+
+The recursive parser is the one used by :class:`PENMANCodec` before
+nested nodes were parsed with an explicit stack. It is reproduced here
+over the same :class:`~penman.lexer.TokenStream` so only the parsing
+strategy differs.
+"""
+
+import sys
+import timeit
+
+from penman.codec import (
+    PENMANCodec,
+    _LPAREN, _RPAREN, _SLASH, _ROLE, _SYMBOL, _STRING,
+)
+from penman.lexer import TokenStream, PENMAN_RE
+
+
+DEPTHS = (10, 100, 1000, 10000)
+
+
+def recursive_parse(s):
+    return _parse_node(TokenStream(s, PENMAN_RE))
+
+
+def _parse_node(tokens):
+    tokens.expect(_LPAREN)
+    var = None
+    edges = []
+    if tokens.type != _RPAREN:
+        var = tokens.expect(_SYMBOL).group()
+        if tokens.type == _SLASH:
+            tokens.advance()
+            concept = None
+            if tokens.type in (_SYMBOL, _STRING):
+                concept = tokens.advance().group()
+            edges.append(('/', concept))
+        while tokens.type != _RPAREN:
+            edges.append(_parse_edge(tokens))
+    tokens.expect(_RPAREN)
+    return (var, edges)
+
+
+def _parse_edge(tokens):
+    role = tokens.expect(_ROLE)
+    target = None
+    if tokens.type in (_SYMBOL, _STRING):
+        target = tokens.advance().group()
+    elif tokens.type == _LPAREN:
+        target = _parse_node(tokens)
+    return (role.group(), target)
+
+
+def chain(depth):
+    s = ''.join(f'(n{i} / c :ARG ' for i in range(depth))
+    return s + '(x / c)' + ')' * depth
+
+
+def main(repeat):
+    codec = PENMANCodec()
+    print(f'{"depth":>7}  {"recursive":>12}  {"iterative":>12}')
+    for depth in DEPTHS:
+        s = chain(depth)
+        number = max(1, 10000 // depth)
+        times = []
+        for parse in (recursive_parse, codec.parse):
+            try:
+                t = min(timeit.repeat(lambda: parse(s),
+                                      number=number, repeat=repeat))
+            except RecursionError:
+                times.append(f'{"RecursionError":>12}')
+            else:
+                times.append(f'{t / number * 1000:10.3f}ms')
+        print(f'{depth:>7}  {times[0]}  {times[1]}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
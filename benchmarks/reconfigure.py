@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+Compare reconfiguring graphs with and without copying them.
+
+Usage::
+
+    python benchmarks/reconfigure.py FILE [REPEAT]
+
+Every graph in the corpus is reconfigured in three ways: by deep
+copying it and removing the layout markers from the copy, as
+:func:`penman.layout.reconfigure` once did; the same with
+:meth:`penman.graph.Graph.copy`; and with
+:func:`penman.layout.configure` ignoring the layout markers, as
+:func:`~penman.layout.reconfigure` does now. The trees are checked to
+be the same. The best time of REPEAT runs over the corpus is printed
+for each, with the peak memory allocated while reconfiguring one
+graph at a time, measured with :mod:`tracemalloc`, which is the
+working memory beyond the graphs and trees.
+"""
+
+import copy
+import sys
+import timeit
+import tracemalloc
+
+from penman.codec import PENMANCodec
+from penman.layout import (LayoutMarker, configure)
+
+codec = PENMANCodec()
+
+
+def read(path):
+    with open(path, encoding='utf-8') as fh:
+        return list(codec.iterdecode(fh))
+
+
+def _strip_and_configure(p):
+    for epilist in p.epidata.values():
+        epilist[:] = [epi for epi in epilist
+                      if not isinstance(epi, LayoutMarker)]
+    return configure(p)
+
+
+def deepcopied(g):
+    return _strip_and_configure(copy.deepcopy(g))
+
+
+def copied(g):
+    return _strip_and_configure(g.copy())
+
+
+def ignored(g):
+    return configure(g, ignore_markers=True)
+
+
+def peak_memory(func, graphs):
+    tracemalloc.start()
+    for g in graphs:
+        func(g)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main(path, repeat):
+    graphs = read(path)
+    for g in graphs:
+        if not deepcopied(g) == copied(g) == ignored(g):
+            sys.exit('error: trees differ')
+    print(f'{len(graphs)} graphs')
+    for func in (deepcopied, copied, ignored):
+        time = min(timeit.repeat(lambda: [func(g) for g in graphs],
+                                 number=1, repeat=repeat))
+        peak = peak_memory(func, graphs)
+        print(f'{func.__name__:>16}  {time:8.3f}s'
+              f'  {peak / 2**10:8.1f} KiB peak')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('usage: python benchmarks/reconfigure.py FILE [REPEAT]')
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Compare layout queries with and without a layout analysis.
+
+Usage::
+
+    python benchmarks/reify.py [REPEAT]
+
+Graphs have a root with many children, each of which is the target of
+a second, reentrant ``:mod`` edge. Reentrant edges have no
+:class:`~penman.layout.Push` marker, so :func:`penman.layout.appears_inverted`
+walks the node contexts of the triples before them. Calling it for
+every triple is compared to querying one
+:class:`~penman.layout.LayoutAnalysis`, and
+:func:`penman.transform.reify_edges`, which uses the analysis, is
+timed as well. The answers are checked to be the same.
+"""
+
+import sys
+import timeit
+
+from penman.codec import PENMANCodec
+from penman.models.amr import model
+from penman.layout import (appears_inverted, LayoutAnalysis)
+from penman.transform import reify_edges
+
+codec = PENMANCodec(model=model)
+
+SIZES = (10, 100, 1000, 2000)
+
+
+def make_graph(size):
+    children = ' '.join(f':ARG0 (n{i} / node)' for i in range(size))
+    mods = ' '.join(f':mod n{i}' for i in range(size))
+    return codec.decode(f'(r / root {children} {mods})')
+
+
+def per_call(g):
+    return [appears_inverted(g, triple) for triple in g.triples]
+
+
+def analyzed(g):
+    analysis = LayoutAnalysis(g)
+    return [analysis.appears_inverted(triple) for triple in g.triples]
+
+
+def reified(g):
+    return reify_edges(g, model)
+
+
+def main(repeat):
+    print(f'{"size":>8}  {"per call":>10}  {"analysis":>10}'
+          f'  {"speedup":>8}  {"reify":>10}')
+    for size in SIZES:
+        g = make_graph(size)
+        if per_call(g) != analyzed(g):
+            sys.exit(f'error: answers differ for size {size}')
+        times = {}
+        for func in (per_call, analyzed, reified):
+            times[func] = min(timeit.repeat(lambda: func(g),
+                                            number=1, repeat=repeat))
+        speedup = times[per_call] / times[analyzed]
+        print(f'{size:>8}  {times[per_call]:9.4f}s  {times[analyzed]:9.4f}s'
+              f'  {speedup:7.1f}x  {times[reified]:9.4f}s')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
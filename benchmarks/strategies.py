@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Compare the layouts of graphs chosen by layout strategies.
+
+Usage::
+
+    python benchmarks/strategies.py FILE [REPEAT]
+
+Every graph in the corpus is configured from a randomly chosen top,
+as when a graph is serialized from a different focus, with
+:func:`penman.layout.reconfigure` and with each layout strategy. For
+each, the total number of inverted edges, the total depth of the
+trees, the length of the serialization without newlines, and the
+time to encode all graphs are printed.
+"""
+
+import random
+import sys
+import timeit
+
+from penman.codec import PENMANCodec
+from penman.models.amr import model
+from penman.tree import is_atomic
+from penman import layout
+
+codec = PENMANCodec(model=model)
+
+STRATEGIES = (
+    None,
+    layout.first_occurrence,
+    layout.least_depth,
+    layout.fewest_inverted,
+)
+
+
+def read(path):
+    with open(path, encoding='utf-8') as fh:
+        return list(codec.iterdecode(fh))
+
+
+def configured(graphs, tops, strategy):
+    if strategy is None:
+        return [layout.reconfigure(g, top=top, model=model)
+                for g, top in zip(graphs, tops)]
+    return [layout.configure(g, top=top, model=model, strategy=strategy)
+            for g, top in zip(graphs, tops)]
+
+
+def measure(tree):
+    inverted = depth = 0
+    agenda = [(tree.node, 0)]
+    while agenda:
+        (_, branches), level = agenda.pop()
+        depth = max(depth, level)
+        for role, target in branches:
+            if role != '/' and model.is_role_inverted(role):
+                inverted += 1
+            if not is_atomic(target):
+                agenda.append((target, level + 1))
+    return inverted, depth
+
+
+def main(path, repeat):
+    graphs = read(path)
+    rng = random.Random(1)
+    tops = [rng.choice(sorted(g.variables())) for g in graphs]
+    print(f'{len(graphs)} graphs')
+    print(f'{"strategy":>16}  {"inverted":>8}  {"depth":>6}'
+          f'  {"length":>8}  {"time":>8}')
+    for strategy in STRATEGIES:
+        trees = configured(graphs, tops, strategy)
+        inverted = depth = 0
+        for tree in trees:
+            i, d = measure(tree)
+            inverted += i
+            depth += d
+        length = sum(len(codec.format(tree, indent=None)) for tree in trees)
+        time = min(timeit.repeat(
+            lambda: [codec.format(t) for t in
+                     configured(graphs, tops, strategy)],
+            number=1, repeat=repeat))
+        name = strategy.__name__ if strategy else 'reconfigure'
+        print(f'{name:>16}  {inverted:8}  {depth:6}'
+              f'  {length:8}  {time:7.3f}s')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        sys.exit('usage: python benchmarks/strategies.py FILE [REPEAT]')
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 3)
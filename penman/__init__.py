@@ -18,6 +18,7 @@ __all__ = [
     'encode',
     'load',
     'loads',
+    'load_indexed',
     'dump',
     'dumps',
 ]
@@ -42,6 +43,7 @@ from penman.interface import (
     encode,
     load,
     loads,
+    load_indexed,
     dump,
     dumps,
 )
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""
+Helpers for decoding and scoring graphs in a process pool.
+
+These are shared by :mod:`penman.codec`, :mod:`penman.corpus`, and
+:mod:`penman.smatch` and are not part of the public API.
+"""
+
+from typing import (
+    Any, Optional, Iterable, Iterator, List, Tuple, Deque, Callable,
+    TypeVar)
+from collections import deque
+
+from penman.exceptions import (PenmanError, DecodeError)
+from penman.graph import Graph
+from penman.model import Model
+from penman.lexer import (PENMAN_RE, TokenStream)
+T = TypeVar('T')
+
+#: The graphs decoded from a chunk, the error that stopped decoding,
+#: if any, and whether decoding stopped at something that is not a
+#: graph.
+DecodedChunk = Tuple[List[Graph], Optional[PenmanError], bool]
+
+_COMMENT = PENMAN_RE.groupindex['COMMENT']
+_LPAREN = PENMAN_RE.groupindex['LPAREN']
+
+
+def imap(func: Callable[..., T],
+         tasks: Iterable[tuple],
+         workers: int) -> Iterator[T]:
+    """
+    Return an iterator of the results of calling *func* on *tasks*.
+
+    The tasks are run in a pool of *workers* processes. Each task is
+    a tuple of arguments to *func*. Results are yielded in the order
+    of *tasks* and at most two tasks per worker are submitted ahead
+    of what has been yielded. Tasks that were submitted but not yet
+    started are cancelled when the iterator is closed.
+
+    Raises:
+        ValueError
+            If *workers* is less than 1.
+    """
+    if workers < 1:
+        raise ValueError('workers must be a positive integer')
+    return _imap(func, iter(tasks), workers)
+
+
+def _imap(func: Callable[..., T],
+          tasks: Iterator[tuple],
+          workers: int) -> Iterator[T]:
+    # imported here as most users never start a process pool
+    from concurrent.futures import ProcessPoolExecutor
+    pending: Deque[Any] = deque()  # futures of the results
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                while len(pending) < workers * 2:
+                    args = next(tasks, None)
+                    if args is None:
+                        break
+                    pending.append(executor.submit(func, *args))
+                if not pending:
+                    break
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def decode_chunk(model: Model, text: str, lineno: int) -> DecodedChunk:
+    """
+    Decode the graphs in *text*, which starts on line *lineno*.
+
+    Decoding errors are returned instead of raised, after the graphs
+    decoded before them, and their line numbers are made relative to
+    the whole input.
+    """
+    from penman.codec import PENMANCodec  # codec imports this module
+    codec = PENMANCodec(model=model)
+    tokens = TokenStream(text, PENMAN_RE)
+    graphs = []
+    try:
+        while tokens.type in (_COMMENT, _LPAREN):
+            graphs.append(codec._decode(tokens))
+    except PenmanError as exc:
+        if isinstance(exc, DecodeError) and exc.lineno:
+            exc.lineno += lineno - 1
+        return graphs, exc, False
+    return graphs, None, bool(tokens)
+
+
+def chunk_graphs(chunks: Iterable[DecodedChunk]) -> Iterator[Graph]:
+    """
+    Yield the graphs of decoded *chunks* in order.
+
+    The error of a chunk is raised after its graphs are yielded, and
+    no more chunks are read after one that stopped at something that
+    is not a graph, as when decoding all of the input at once.
+    """
+    chunks = iter(chunks)
+    try:
+        for graphs, error, stopped in chunks:
+            yield from graphs
+            if error is not None:
+                raise error
+            elif stopped:
+                break
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
@@ -4,7 +4,10 @@
 Serialization of PENMAN graphs.
 """
 
-from typing import Optional, Union, Iterable, Iterator, List
+from typing import (
+    Optional, Union, Iterable, Iterator, List, Dict, Set, Tuple, Any,
+    Mapping)
+from itertools import chain
 import logging
 
 from penman.types import (
@@ -12,20 +15,39 @@ from penman.types import (
     Target,
     BasicTriple,
 )
-from penman.tree import (Tree, is_atomic)
-from penman.graph import Graph
+from penman.epigraph import Epidatum
+from penman.surface import (Alignment, RoleAlignment)
+from penman.tree import (Tree, Node, Branch, is_atomic)
+from penman.graph import (Graph, LazyGraph, CONCEPT_ROLE)
 from penman.model import Model
 from penman.lexer import (
     PENMAN_RE,
     TRIPLE_RE,
     lex,
     TokenIterator,
+    TokenStream,
+    GraphSpan,
+    scan_graphs,
 )
 from penman import layout
+from penman.layout import (Push, POP)
+from penman._parallel import (imap, decode_chunk, chunk_graphs)
 
 
 logger = logging.getLogger(__name__)
 
+# token type codes for PENMAN_RE in a TokenStream
+_COMMENT = PENMAN_RE.groupindex['COMMENT']
+_STRING = PENMAN_RE.groupindex['STRING']
+_LPAREN = PENMAN_RE.groupindex['LPAREN']
+_RPAREN = PENMAN_RE.groupindex['RPAREN']
+_SLASH = PENMAN_RE.groupindex['SLASH']
+_ROLE = PENMAN_RE.groupindex['ROLE']
+_SYMBOL = PENMAN_RE.groupindex['SYMBOL']
+
+# approximate number of characters scanned at once for parallel decoding
+_BLOCK_SIZE = 1 << 20
+
 
 class PENMANCodec(object):
     """
@@ -50,21 +72,84 @@ class PENMANCodec(object):
             >>> codec.decode('(b / bark-01 :ARG0 (d / dog))')
             <Graph object (top=b) at ...>
         """
-        tree = self.parse(s)
-        return layout.interpret(tree, self.model)
+        tokens = TokenStream(s, PENMAN_RE)
+        return self._decode(tokens)
 
     def iterdecode(self,
-                   lines: Union[Iterable[str], str]) -> Iterator[Graph]:
+                   lines: Union[Iterable[str], str],
+                   workers: int = None,
+                   chunksize: int = 100,
+                   lazy: bool = False) -> Iterator[Graph]:
         """
         Yield graphs parsed from *lines*.
 
+        If *workers* is given, *lines* are split into chunks of about
+        *chunksize* graphs at graph boundaries and the chunks are
+        decoded by a pool of *workers* processes. The graphs are still
+        yielded in their original order, and at most two chunks per
+        worker are decoded ahead of what has been yielded. The codec's
+        model must be picklable to decode in parallel.
+
+        If *lazy* is ``True``, :class:`~penman.graph.LazyGraph` objects
+        are yielded instead. Only their metadata is parsed; each graph
+        is decoded when it is first used, so decoding errors are raised
+        then. Graphs are found with :func:`~penman.lexer.scan_graphs`,
+        so any text between graphs is skipped instead of ending the
+        iteration. Lazy decoding cannot be combined with *workers*.
+
         Args:
             lines: a string or open file with PENMAN-serialized graphs
+            workers: if given, the number of processes used to decode
+            chunksize: the approximate number of graphs in each chunk
+                when decoding in parallel or lazily
+            lazy: if ``True``, yield graphs that are decoded on first
+                use
         Returns:
             The :class:`Graph` objects described in *lines*.
+        Example:
+            >>> codec = PENMANCodec()
+            >>> with open('corpus.txt') as fh:
+            ...     for g in codec.iterdecode(fh, workers=4):
+            ...         print(g.top)
         """
-        for tree in self.iterparse(lines):
-            yield layout.interpret(tree, self.model)
+        # not a generator so invalid arguments are reported right away
+        if lazy:
+            if workers is not None:
+                raise ValueError('lazy decoding cannot use workers')
+            return self._iterdecode_lazy(lines, chunksize)
+        if workers is not None:
+            if workers < 1:
+                raise ValueError('workers must be a positive integer')
+            if chunksize < 1:
+                raise ValueError('chunksize must be a positive integer')
+            return self._iterdecode_parallel(lines, workers, chunksize)
+        return self._iterdecode(lines)
+
+    def _iterdecode(self,
+                    lines: Union[Iterable[str], str]) -> Iterator[Graph]:
+        tokens = TokenStream(lines, PENMAN_RE)
+        while tokens.type in (_COMMENT, _LPAREN):
+            yield self._decode(tokens)
+
+    def _iterdecode_lazy(self,
+                         lines: Union[Iterable[str], str],
+                         chunksize: int) -> Iterator[Graph]:
+        for text, lineno, spans in _split_chunks(lines, chunksize):
+            pos = 0
+            for start, body, end in spans:
+                lineno += text.count('\n', pos, start)
+                pos = start
+                metadata = self._parse_comment_text(text[start:body])
+                yield LazyGraph(text[start:end], metadata, self.decode,
+                                body=body - start, lineno=lineno)
+
+    def _iterdecode_parallel(self,
+                             lines: Union[Iterable[str], str],
+                             workers: int,
+                             chunksize: int) -> Iterator[Graph]:
+        tasks = ((self.model, text, lineno)
+                 for text, lineno, _ in _split_chunks(lines, chunksize))
+        yield from chunk_graphs(imap(decode_chunk, tasks, workers))
 
     def iterparse(self, lines: Union[Iterable[str], str]) -> Iterator[Tree]:
         """
@@ -75,8 +160,8 @@ class PENMANCodec(object):
         Returns:
             The :class:`Tree` object described in *lines*.
         """
-        tokens = lex(lines, pattern=PENMAN_RE)
-        while tokens and tokens.peek().type in ('COMMENT', 'LPAREN'):
+        tokens = TokenStream(lines, PENMAN_RE)
+        while tokens.type in (_COMMENT, _LPAREN):
             yield self._parse(tokens)
 
     def parse(self, s: str) -> Tree:
@@ -92,88 +177,240 @@ class PENMANCodec(object):
             >>> codec.parse('(b / bark-01 :ARG0 (d / dog))')  # noqa
             Tree(('b', [('/', 'bark-01'), ('ARG0', ('d', [('/', 'dog')]))]))
         """
-        tokens = lex(s, pattern=PENMAN_RE)
+        tokens = TokenStream(s, PENMAN_RE)
         return self._parse(tokens)
 
-    def _parse(self, tokens: TokenIterator) -> Tree:
+    def _decode(self, tokens: TokenStream) -> Graph:
+        """
+        Decode a graph from *tokens* without building a tree.
+
+        The result is the same as interpreting the tree from
+        :meth:`_parse` with :func:`penman.layout.interpret`, but the
+        triples, layout markers, and alignments are produced while
+        parsing.
+        """
+        metadata = self._parse_comments(tokens)
+        model = self.model
+        triples: List[BasicTriple] = []
+        epidata: Dict[BasicTriple, List[Epidatum]] = {}
+        variables: Set[Variable] = set()
+        # inverted roles with atomic targets can only be deinverted
+        # once all variables are known, so keep their indices
+        inverted: List[int] = []
+        # each item is the (var, instance, role, epis) of a node whose
+        # edge with role is waiting for its nested node, where instance
+        # is the node's instance triple if it has no concept
+        stack: List[Tuple[Variable, Optional[BasicTriple],
+                          str, List[Epidatum]]] = []
+        top = None
+        var: Any  # None for an empty node: ()
+        instance: Optional[BasicTriple]
+        epis: List[Epidatum]
+        target: Target
+
+        while True:
+            # start of a node
+            tokens.expect(_LPAREN)
+            var = None
+            if tokens.type != _RPAREN:
+                var = tokens.expect(_SYMBOL).group()
+                variables.add(var)
+
+            if stack:  # nested node; add the edge that leads to it
+                source, _, role, epis = stack[-1]
+                triple = model.deinvert((source, role, var))
+                epis.append(Push(var))
+                triples.append(triple)
+                epidata[triple] = epis
+            else:
+                top = var
+
+            instance = None
+            if var is not None and tokens.type == _SLASH:
+                slash = tokens.advance()
+                # for robustness, don't assume next token is the concept
+                target = None
+                if tokens.type in (_SYMBOL, _STRING):
+                    target = tokens.advance().group()
+                else:
+                    logger.warning('Missing concept: %s',
+                                   tokens.locate(slash)[2])
+                epis = []
+                if target and '~' in target:
+                    target, _, alignment = target.partition('~')
+                    epis.append(Alignment.from_string(alignment))
+                triple = (var, CONCEPT_ROLE, target)
+                triples.append(triple)
+                epidata[triple] = epis
+            else:
+                # the epidata of a default concept is added at the end
+                # of the node, as in layout.interpret()
+                instance = (var, CONCEPT_ROLE, None)
+                triples.append(instance)
+
+            # edges of the node until it ends or a nested node starts
+            while True:
+                if tokens.type == _RPAREN:
+                    tokens.advance()
+                    if instance is not None:
+                        epidata[instance] = []
+                    if not stack:
+                        break
+                    var, instance, _, _ = stack.pop()
+                    epidata[triples[-1]].append(POP)
+                    continue
+
+                role_token = tokens.expect(_ROLE)
+                role = role_token.group()
+                epis = []
+                if '~' in role:
+                    role, _, alignment = role.partition('~')
+                    epis.append(RoleAlignment.from_string(alignment))
+
+                next_type = tokens.type
+                if next_type == _LPAREN:
+                    stack.append((var, instance, role, epis))
+                    break
+                elif next_type in (_SYMBOL, _STRING):
+                    target = tokens.advance().group()
+                    if '~' in target:
+                        target, _, alignment = target.partition('~')
+                        epis.append(Alignment.from_string(alignment))
+                # for robustness in parsing, allow edges with no target:
+                #    (x :ROLE :ROLE2...  <- followed by another role
+                #    (x :ROLE )          <- end of node
+                elif next_type not in (_ROLE, _RPAREN):
+                    raise tokens.error('Expected: SYMBOL, STRING, LPAREN',
+                                       token=tokens.advance())
+                else:
+                    logger.warning('Missing target: %s',
+                                   tokens.locate(role_token)[2])
+                    target = None
+
+                triple = (var, role, target)
+                if model.is_role_inverted(role):
+                    inverted.append(len(triples))
+                triples.append(triple)
+                epidata[triple] = epis
+
+            if not stack:
+                break
+
+        if inverted:
+            deinverted = {}
+            for i in inverted:
+                triple = triples[i]
+                if triple[2] in variables:
+                    deinverted[triple] = triples[i] = model.invert(triple)
+                else:
+                    logger.warning('cannot deinvert attribute: %r', triple)
+            if deinverted:
+                epidata = {deinverted.get(triple, triple): epis
+                           for triple, epis in epidata.items()}
+
+        g = Graph(triples, top=top, epidata=epidata, metadata=metadata)
+        logger.debug('Decoded: %s', g)
+        return g
+
+    def _parse(self, tokens: TokenStream) -> Tree:
         metadata = self._parse_comments(tokens)
         node = self._parse_node(tokens)
         tree = Tree(node, metadata=metadata)
         logger.debug('Parsed: %s', tree)
         return tree
 
-    def _parse_comments(self, tokens: TokenIterator):
+    def _parse_comments(self, tokens: TokenStream):
         """
         Parse PENMAN comments from *tokens* and return any metadata.
         """
-        metadata = {}
-        while tokens.peek().type == 'COMMENT':
-            comment = tokens.next().text
-            while comment:
-                comment, found, meta = comment.rpartition('::')
-                if found:
-                    key, _, value = meta.partition(' ')
-                    metadata[key] = value.rstrip()
+        metadata: Dict[str, str] = {}
+        while tokens.type == _COMMENT:
+            _parse_metadata(tokens.advance().group(), metadata)
         return metadata
 
-    def _parse_node(self, tokens: TokenIterator):
+    def _parse_comment_text(self, comments: str) -> Dict[str, str]:
         """
-        Parse a PENMAN node from *tokens*.
-
-        Nodes have the following pattern::
+        Parse the PENMAN comments in *comments* and return any metadata.
 
-            Node := '(' ID ('/' Concept)? Edge* ')'
+        This is like :meth:`_parse_comments` for the text of a graph's
+        leading comments, such as from :func:`penman.lexer.scan_graphs`.
         """
-        tokens.expect('LPAREN')
-
-        var = None
-        concept: Union[str, None]
-        edges = []
-
-        if tokens.peek().type != 'RPAREN':
-            var = tokens.expect('SYMBOL').text
-            if tokens.peek().type == 'SLASH':
-                slash = tokens.next()
-                # for robustness, don't assume next token is the concept
-                if tokens.peek().type in ('SYMBOL', 'STRING'):
-                    concept = tokens.next().text
-                else:
-                    concept = None
-                    logger.warning('Missing concept: %s', slash.line)
-                edges.append(('/', concept))
-            while tokens.peek().type != 'RPAREN':
-                edges.append(self._parse_edge(tokens))
-
-        tokens.expect('RPAREN')
-
-        return (var, edges)
+        metadata: Dict[str, str] = {}
+        # comments are usually one per line, which is faster than lexing
+        for line in comments.split('\n'):
+            line = line.lstrip()
+            if line.startswith('#'):
+                _parse_metadata(line, metadata)
+            elif line:
+                return self._parse_comments(TokenStream(comments, PENMAN_RE))
+        return metadata
 
-    def _parse_edge(self, tokens: TokenIterator):
+    def _parse_node(self, tokens: TokenStream) -> Node:
         """
-        Parse a PENMAN edge from *tokens*.
+        Parse a PENMAN node from *tokens*.
 
-        Edges have the following pattern::
+        Nodes and edges have the following patterns::
 
+            Node := '(' ID ('/' Concept)? Edge* ')'
             Edge := Role (Constant | Node)
+
+        Nested nodes are parsed with an explicit stack instead of
+        recursion, so there is no limit on the depth of the tree.
         """
-        role = tokens.expect('ROLE')
-        target = None
-
-        _next = tokens.peek()
-        next_type = _next.type
-        if next_type in ('SYMBOL', 'STRING'):
-            target = tokens.next().text
-        elif next_type == 'LPAREN':
-            target = self._parse_node(tokens)
-        # for robustness in parsing, allow edges with no target:
-        #    (x :ROLE :ROLE2...  <- followed by another role
-        #    (x :ROLE )          <- end of node
-        elif next_type not in ('ROLE', 'RPAREN'):
-            raise tokens.error('Expected: SYMBOL, STRING, LPAREN', token=_next)
-        else:
-            logger.warning('Missing target: %s', role.line)
+        # each item is the (var, edges, role) of a node whose edge
+        # with role is waiting for its nested node to be parsed
+        stack: List[Tuple[Variable, List[Branch], str]] = []
+        var: Any  # None for an empty node: ()
+        concept: Union[str, None]
+        target: Any
 
-        return (role.text, target)
+        while True:
+            # start of a node
+            tokens.expect(_LPAREN)
+            var = None
+            edges: List[Branch] = []
+            if tokens.type != _RPAREN:
+                var = tokens.expect(_SYMBOL).group()
+                if tokens.type == _SLASH:
+                    slash = tokens.advance()
+                    # for robustness, don't assume next token is the concept
+                    if tokens.type in (_SYMBOL, _STRING):
+                        concept = tokens.advance().group()
+                    else:
+                        concept = None
+                        logger.warning('Missing concept: %s',
+                                       tokens.locate(slash)[2])
+                    edges.append(('/', concept))
+
+            # edges of the node until it ends or a nested node starts
+            while True:
+                if tokens.type == _RPAREN:
+                    tokens.advance()
+                    if not stack:
+                        return (var, edges)
+                    target = (var, edges)
+                    var, edges, role = stack.pop()
+                    edges.append((role, target))
+                    continue
+
+                role_token = tokens.expect(_ROLE)
+                role = role_token.group()
+                next_type = tokens.type
+                if next_type in (_SYMBOL, _STRING):
+                    edges.append((role, tokens.advance().group()))
+                elif next_type == _LPAREN:
+                    stack.append((var, edges, role))
+                    break
+                # for robustness in parsing, allow edges with no target:
+                #    (x :ROLE :ROLE2...  <- followed by another role
+                #    (x :ROLE )          <- end of node
+                elif next_type not in (_ROLE, _RPAREN):
+                    raise tokens.error('Expected: SYMBOL, STRING, LPAREN',
+                                       token=tokens.advance())
+                else:
+                    logger.warning('Missing target: %s',
+                                   tokens.locate(role_token)[2])
+                    edges.append((role, None))
 
     def parse_triples(self, s: str) -> List[BasicTriple]:
         """ Parse a triple conjunction from *s*."""
@@ -240,7 +477,9 @@ class PENMANCodec(object):
                g: Graph,
                top: Variable = None,
                indent: Union[int, None] = -1,
-               compact: bool = False) -> str:
+               compact: bool = False,
+               canonical: bool = False,
+               strategy: layout.LayoutStrategy = None) -> str:
         """
         Serialize the graph *g* into PENMAN notation.
 
@@ -249,6 +488,12 @@ class PENMANCodec(object):
             top: if given, the node to use as the top in serialization
             indent: how to indent formatted strings
             compact: if ``True``, put initial attributes on the first line
+            canonical: if ``True``, serialize the canonical tree of *g*
+                (see :func:`penman.layout.canonicalize`) without
+                metadata, so equal graphs give identical strings
+            strategy: if given, the layout strategy used to configure
+                *g* instead of its layout markers (see
+                :func:`penman.layout.configure`)
         Returns:
             the PENMAN-serialized string of the Graph *g*
         Example:
@@ -257,8 +502,28 @@ class PENMANCodec(object):
             >>> codec.encode(Graph([('h', 'instance', 'hi')]))
             (h / hi)
 
+        If *g* is a :class:`~penman.graph.LazyGraph` that has not been
+        modified and the default *top*, *indent*, *compact*, and
+        *strategy* values are used, the graph's original text is
+        returned. If only its metadata has changed, the new metadata is
+        formatted before the graph's original text.
         """
-        tree = layout.configure(g, top=top, model=self.model)
+        if canonical:
+            tree = layout.canonicalize(g, top=top, model=self.model)
+            return self.format(tree, indent=indent, compact=compact)
+        if (isinstance(g, LazyGraph)
+                and top is None
+                and indent == -1
+                and not compact
+                and strategy is None
+                and not g.is_modified()):
+            if g.metadata == g._metadata:
+                return g.text
+            parts = self._format_metadata(g.metadata)
+            parts.append(g.text[g.body:])
+            return '\n'.join(parts)
+        tree = layout.configure(g, top=top, model=self.model,
+                                strategy=strategy)
         return self.format(tree, indent=indent, compact=compact)
 
     def format(self,
@@ -271,11 +536,15 @@ class PENMANCodec(object):
         if not isinstance(tree, Tree):
             tree = Tree(tree)
         vars = [var for var, _ in tree.nodes()] if compact else []
-        parts = ['# ::{}{}'.format(key, ' ' + value if value else value)
-                 for key, value in tree.metadata.items()]
+        parts = self._format_metadata(tree.metadata)
         parts.append(self._format_node(tree.node, indent, 0, set(vars)))
         return '\n'.join(parts)
 
+    def _format_metadata(self, metadata: Mapping[str, str]) -> List[str]:
+        """Return the comment lines for *metadata*."""
+        return ['# ::{}{}'.format(key, ' ' + value if value else value)
+                for key, value in metadata.items()]
+
     def _format_node(self,
                      node,
                      indent: Optional[int],
@@ -363,3 +632,62 @@ class PENMANCodec(object):
         conjunction = [f'{role.lstrip(":")}({source}, {target})'
                        for source, role, target in triples]
         return delim.join(conjunction)
+
+
+def _parse_metadata(comment: str, metadata: Dict[str, str]) -> None:
+    """Add the ``::key value`` pairs in *comment* to *metadata*."""
+    while comment:
+        comment, found, meta = comment.rpartition('::')
+        if found:
+            key, _, value = meta.partition(' ')
+            metadata[key.rstrip()] = value.rstrip()
+
+
+def _split_chunks(lines: Union[Iterable[str], str],
+                  chunksize: int) -> Iterator[Tuple[str, int,
+                                                    List[GraphSpan]]]:
+    """
+    Yield (text, lineno, spans) chunks of *chunksize* graphs in *lines*.
+
+    Chunks end after graphs found by :func:`~penman.lexer.scan_graphs`,
+    so no graph is split across chunks. Lines are read in blocks of
+    about :data:`_BLOCK_SIZE` characters and the unfinished chunk at
+    the end of a block is carried over to the next. The *lineno* is
+    the line number where the chunk starts in *lines* and *spans* are
+    the spans of the graphs relative to the start of the chunk.
+    """
+    if isinstance(lines, str):
+        lines = [lines]
+    buf = ''
+    pos = 0
+    lineno = 1
+    spans: List[GraphSpan] = []
+    batch: List[str] = []
+    size = 0
+    for line in chain(lines, [None]):
+        if line is not None:
+            if not line.endswith('\n'):
+                line += '\n'
+            batch.append(line)
+            size += len(line)
+            if size < _BLOCK_SIZE:
+                continue
+        buf += ''.join(batch)
+        batch = []
+        size = 0
+        cut = 0
+        for start, body, end in scan_graphs(buf, pos):
+            if end == len(buf) and line is not None:
+                break  # the graph may continue in the next block
+            pos = end
+            spans.append(GraphSpan(start - cut, body - cut, end - cut))
+            if len(spans) >= chunksize:
+                text = buf[cut:pos]
+                yield text, lineno, spans
+                lineno += text.count('\n')
+                cut = pos
+                spans = []
+        buf = buf[cut:]
+        pos -= cut
+    if buf:
+        yield buf, lineno, spans
@@ -0,0 +1,927 @@
+# -*- coding: utf-8 -*-
+
+"""
+Random access to graphs in PENMAN corpus files and in-memory corpora.
+"""
+
+from typing import (
+    Union, Optional, Iterable, List, Dict, Tuple, Iterator, Any, NamedTuple)
+from collections.abc import Sequence
+from itertools import chain
+from array import array
+from pathlib import Path
+import json
+import mmap
+import os
+import sys
+import logging
+
+from penman.exceptions import DecodeError
+from penman.types import (file_or_filename, Variable, Role, Target)
+from penman.graph import (
+    CONCEPT_ROLE,
+    Graph,
+    StringTable,
+    _AlignedEpidata,
+    _align_epidata,
+    _unalign_epidata,
+)
+from penman.model import Model
+from penman.codec import (
+    PENMANCodec,
+    _split_chunks,
+)
+from penman._parallel import (
+    DecodedChunk,
+    imap,
+    decode_chunk,
+    chunk_graphs,
+)
+from penman.lexer import scan_graphs
+
+
+logger = logging.getLogger(__name__)
+
+#: The first line of an index file; the number is the format version.
+INDEX_MAGIC = b'PENMAN-INDEX 1\n'
+#: The suffix appended to a corpus filename to get its index filename.
+INDEX_SUFFIX = '.idx'
+
+_Data = Union[bytes, mmap.mmap]
+
+
+class CorpusIndex(object):
+    """
+    The locations of the graphs in a PENMAN corpus file.
+
+    Offsets are byte offsets in the file, as given by the
+    :class:`~penman.lexer.GraphSpan` objects of
+    :func:`~penman.lexer.scan_graphs`. The file's size and modification
+    time are kept so an index can be checked against its file with
+    :meth:`is_current`.
+
+    Args:
+        size: the size of the corpus file in bytes
+        mtime_ns: the modification time of the corpus file in
+            nanoseconds
+        starts: the offset of each graph's leading comments
+        bodies: the offset of each graph's opening parenthesis
+        ends: the offset after each graph's closing parenthesis
+        ids: the ``::id`` metadata value of each graph, or ``''``
+    """
+
+    __slots__ = 'size', 'mtime_ns', 'starts', 'bodies', 'ends', 'ids'
+
+    def __init__(self,
+                 size: int,
+                 mtime_ns: int,
+                 starts: array,
+                 bodies: array,
+                 ends: array,
+                 ids: List[str]):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.starts = starts
+        self.bodies = bodies
+        self.ends = ends
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @classmethod
+    def build(cls, path: Union[str, Path]) -> 'CorpusIndex':
+        """
+        Build the index of the corpus file at *path*.
+        """
+        stat = os.stat(path)
+        data = _map_file(path)
+        try:
+            starts, bodies, ends, ids = _scan_corpus(data)
+        finally:
+            _close(data)
+        logger.info('Indexed %d graphs in %s', len(starts), path)
+        return cls(stat.st_size, stat.st_mtime_ns, starts, bodies, ends, ids)
+
+    @classmethod
+    def read(cls, path: Union[str, Path]) -> 'CorpusIndex':
+        """
+        Read the index file at *path*.
+
+        A :exc:`ValueError` is raised if the file is not a valid index
+        file.
+        """
+        with open(path, 'rb') as fh:
+            if fh.readline() != INDEX_MAGIC:
+                raise ValueError(f'not a PENMAN index file: {path!s}')
+            header = json.loads(fh.readline().decode('utf-8'))
+            count = header['count']
+            arrays = []
+            for _ in range(3):
+                offsets = array('q')
+                offsets.frombytes(fh.read(count * offsets.itemsize))
+                if len(offsets) != count:
+                    raise ValueError(f'truncated PENMAN index file: {path!s}')
+                if sys.byteorder != 'little':
+                    offsets.byteswap()
+                arrays.append(offsets)
+            ids = fh.read().decode('utf-8').split('\n') if count else []
+        if len(ids) != count:
+            raise ValueError(f'truncated PENMAN index file: {path!s}')
+        starts, bodies, ends = arrays
+        return cls(header['size'], header['mtime_ns'],
+                   starts, bodies, ends, ids)
+
+    def write(self, path: Union[str, Path]) -> None:
+        """
+        Write the index to the file at *path*.
+
+        The index is written to a temporary file first and then moved
+        to *path*, so readers never see a partially written index.
+        """
+        header = {'count': len(self),
+                  'size': self.size,
+                  'mtime_ns': self.mtime_ns}
+        tmp = f'{path!s}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'wb') as fh:
+                fh.write(INDEX_MAGIC)
+                fh.write(json.dumps(header).encode('utf-8') + b'\n')
+                for offsets in (self.starts, self.bodies, self.ends):
+                    if sys.byteorder != 'little':
+                        offsets = array('q', offsets)
+                        offsets.byteswap()
+                    fh.write(offsets.tobytes())
+                fh.write('\n'.join(self.ids).encode('utf-8'))
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def is_current(self, path: Union[str, Path]) -> bool:
+        """
+        Return ``True`` if the index matches the corpus file at *path*.
+
+        The index matches if the size and modification time of the
+        file are the same as when the index was built.
+        """
+        stat = os.stat(path)
+        return (stat.st_size == self.size
+                and stat.st_mtime_ns == self.mtime_ns)
+
+
+def _scan_corpus(data: _Data):
+    """Return the offset arrays and ids of the graphs in *data*."""
+    codec = PENMANCodec()
+    starts, bodies, ends = array('q'), array('q'), array('q')
+    ids = []
+    for start, body, end in scan_graphs(data):
+        starts.append(start)
+        bodies.append(body)
+        ends.append(end)
+        comments = data[start:body].decode('utf-8')
+        metadata = codec._parse_comment_text(comments)
+        ids.append(metadata.get('id', ''))
+    return starts, bodies, ends, ids
+
+
+def load_index(path: Union[str, Path],
+               index_path: Union[str, Path] = None) -> CorpusIndex:
+    """
+    Return the index for the corpus file at *path*.
+
+    If the index file at *index_path* (by default, *path* with
+    :data:`INDEX_SUFFIX` appended) exists and is current, it is read.
+    Otherwise the index is built and written to *index_path*. If it
+    cannot be written, a warning is logged and the index is only
+    used in memory.
+
+    Args:
+        path: the filename of a PENMAN corpus
+        index_path: the filename of the corpus's index
+    Returns:
+        The :class:`CorpusIndex` for *path*.
+    """
+    if index_path is None:
+        index_path = f'{path!s}{INDEX_SUFFIX}'
+    try:
+        index = CorpusIndex.read(index_path)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, KeyError) as exc:
+        logger.warning('could not read index %s: %s', index_path, exc)
+    else:
+        if index.is_current(path):
+            return index
+        logger.info('index %s is out of date', index_path)
+    index = CorpusIndex.build(path)
+    try:
+        index.write(index_path)
+    except OSError as exc:
+        logger.warning('could not write index %s: %s', index_path, exc)
+    return index
+
+
+class IndexedCorpus(Sequence):
+    """
+    A lazy sequence of the graphs in a PENMAN corpus file.
+
+    Graphs are decoded when they are accessed, using the
+    :class:`CorpusIndex` of the file to find the requested graph in a
+    read-only memory map of the file. Only the requested graph is
+    read and decoded. Graphs are not cached, so accessing the same
+    graph twice decodes it twice.
+
+    Args:
+        path: the filename of a PENMAN corpus
+        model: the model used for interpreting the graphs
+        index_path: the filename of the corpus's index; see
+            :func:`load_index`
+    Example:
+        >>> from penman.corpus import IndexedCorpus
+        >>> with IndexedCorpus('corpus.txt') as corpus:
+        ...     print(len(corpus))
+        ...     g = corpus.by_id('sent-42')
+        ...
+        1000
+    """
+
+    def __init__(self,
+                 path: Union[str, Path],
+                 model: Model = None,
+                 index_path: Union[str, Path] = None):
+        self.path = path
+        #: The :class:`CorpusIndex` of the corpus file.
+        self.corpus_index = load_index(path, index_path=index_path)
+        self._codec = PENMANCodec(model=model)
+        self._data: Optional[_Data] = None
+        self._ids: Optional[Dict[str, int]] = None
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} {self.path!s} ({len(self)} graphs)>'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.corpus_index)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._codec.decode(self.text(i))
+
+    def __iter__(self) -> Iterator[Graph]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def text(self, i: int) -> str:
+        """
+        Return the PENMAN string of the *i*\\ th graph.
+
+        The string includes the graph's leading comments.
+        """
+        index = self.corpus_index
+        start = index.starts[i]
+        end = index.ends[i]
+        if self._data is None:
+            self._data = _map_file(self.path)
+        return self._data[start:end].decode('utf-8')
+
+    def by_id(self, graph_id: str) -> Graph:
+        """
+        Return the graph whose ``::id`` metadata is *graph_id*.
+
+        If more than one graph has the id, the first is returned. A
+        :exc:`KeyError` is raised if no graph has the id.
+        """
+        if self._ids is None:
+            ids: Dict[str, int] = {}
+            for i, _id in enumerate(self.corpus_index.ids):
+                if _id:
+                    ids.setdefault(_id, i)
+            self._ids = ids
+        return self[self._ids[graph_id]]
+
+    def close(self) -> None:
+        """Close the memory map of the corpus file if it is open."""
+        if self._data is not None:
+            _close(self._data)
+            self._data = None
+
+
+class GraphArrays(NamedTuple):
+    """
+    The nodes, edges, and attributes of graphs as NumPy arrays.
+
+    The nodes of all graphs are numbered together, in the order of the
+    graphs and, within a graph, of the first triple with the node's
+    variable as its source. Edges and attributes refer to their
+    sources and targets by these node numbers, so the arrays can be
+    used directly for a batch of graphs in a graph neural network.
+    The nodes, edges, and attributes of the *i*\\ th graph are those
+    from ``offsets[i]`` to ``offsets[i + 1]`` in the corresponding
+    arrays. Strings, such as concepts and roles, are given as their
+    ids in :attr:`table`.
+
+    Edges and attributes are those of
+    :meth:`penman.graph.Graph.edges` and
+    :meth:`penman.graph.Graph.attributes`, and the concept of a node
+    is the target of the first of its
+    :meth:`penman.graph.Graph.instances`.
+    """
+
+    table: StringTable
+    """The table of the strings of the graphs."""
+
+    node_offsets: Any
+    """The offsets of the nodes of each graph, plus the total."""
+
+    node_variables: Any
+    """The ids of the variables of the nodes."""
+
+    node_concepts: Any
+    """The ids of the concepts of the nodes, or -1 for none."""
+
+    tops: Any
+    """The node number of the top of each graph, or -1 for none."""
+
+    edge_offsets: Any
+    """The offsets of the edges of each graph, plus the total."""
+
+    edge_sources: Any
+    """The node numbers of the sources of the edges."""
+
+    edge_targets: Any
+    """The node numbers of the targets of the edges."""
+
+    edge_roles: Any
+    """The ids of the roles of the edges."""
+
+    attribute_offsets: Any
+    """The offsets of the attributes of each graph, plus the total."""
+
+    attribute_sources: Any
+    """The node numbers of the sources of the attributes."""
+
+    attribute_roles: Any
+    """The ids of the roles of the attributes."""
+
+    attribute_targets: Any
+    """The ids of the constant targets of the attributes."""
+
+
+def to_arrays(graphs: Iterable[Graph],
+              table: StringTable = None) -> GraphArrays:
+    """
+    Return the nodes, edges, and attributes of *graphs* as arrays.
+
+    The triples of the graphs are converted to ids in one pass and
+    then divided into nodes, edges, and attributes with array
+    operations, so no objects are created for each node or edge.
+    Passing the same *table* for several calls, such as for the
+    training and test portions of a dataset, gives the strings the
+    same ids in each. :meth:`GraphCorpus.to_arrays` returns the same
+    arrays for the graphs of a corpus.
+
+    This function requires `NumPy <https://numpy.org/>`_.
+
+    Args:
+        graphs: an iterable of graphs
+        table: the :class:`~penman.graph.StringTable` for the strings
+            of the triples; if unspecified, a new table is used
+    Returns:
+        A :class:`GraphArrays` of the graphs.
+    Example:
+        >>> from penman import decode
+        >>> from penman.corpus import to_arrays
+        >>> arrays = to_arrays([decode('(a / alpha :ARG0 (b / beta))'),
+        ...                     decode('(c / gamma :mod 1)')])
+        >>> arrays.node_offsets
+        array([0, 2, 3])
+        >>> arrays.edge_sources, arrays.edge_targets
+        (array([0], dtype=int32), array([1], dtype=int32))
+        >>> [arrays.table[i] for i in arrays.node_concepts]
+        ['alpha', 'beta', 'gamma']
+    """
+    np = _numpy('to_arrays()')
+    if table is None:
+        table = StringTable()
+    triples: List[Tuple[Variable, Role, Target]] = []
+    offsets = array('q', [0])
+    top_variables: List[Optional[Variable]] = []
+    for g in graphs:
+        triples.extend(g.triples)
+        offsets.append(len(triples))
+        top_variables.append(g._top)
+    # intern each distinct string once, in order, then look up the
+    # ids of all triples without a method call for each string
+    strings = chain(chain.from_iterable(triples),
+                    [top for top in top_variables if top is not None])
+    for string in dict.fromkeys(strings):
+        table.intern(string)
+    ids = table._ids
+    columns = np.fromiter(map(ids.__getitem__, chain.from_iterable(triples)),
+                          dtype=np.int32,
+                          count=3 * len(triples)).reshape(-1, 3)
+    tops = np.array([-1 if top is None else ids[top]
+                     for top in top_variables], dtype=np.int32)
+    return _graph_arrays(np, table,
+                         columns[:, 0].copy(),
+                         columns[:, 1].copy(),
+                         columns[:, 2].copy(),
+                         np.frombuffer(offsets, dtype=np.int64),
+                         tops)
+
+
+def _graph_arrays(np, table: StringTable,
+                  sources, roles, targets, offsets, tops) -> GraphArrays:
+    """
+    Return the :class:`GraphArrays` of columns of triple ids.
+
+    The columns are those of :class:`GraphCorpus`. Variables are
+    identified across graphs by keys combining the graph index and
+    the variable's id, as in :meth:`GraphCorpus.source_concepts`.
+    """
+    n = len(table)
+    count = len(tops)
+    lengths = np.diff(offsets)
+    graph_ids = np.repeat(np.arange(count, dtype=np.int64), lengths)
+    source_keys = graph_ids * n + sources
+    target_keys = graph_ids * n + targets
+
+    # the variables are the sources and the explicit tops; positions
+    # order the nodes by their first triple, and a top that is not a
+    # source comes after the triples of its graph
+    has_top = tops >= 0
+    top_graphs = np.arange(count, dtype=np.int64)[has_top]
+    keys = np.concatenate([source_keys, top_graphs * n + tops[has_top]])
+    positions = np.concatenate([np.arange(len(sources), dtype=np.int64) * 2,
+                                offsets[1:][has_top] * 2 - 1])
+    unique_keys, first, inverse = np.unique(
+        keys, return_index=True, return_inverse=True)
+    order = np.argsort(positions[first], kind='stable')
+    node_keys = unique_keys[order]
+    node_graphs = node_keys // n
+    # ranks[i] is the node number of unique_keys[i]
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    key_nodes = ranks[inverse.reshape(-1)]
+    source_nodes = key_nodes[:len(sources)]
+
+    # targets that are not variables get -1
+    target_nodes = np.full(len(targets), -1, dtype=np.int64)
+    if len(unique_keys):
+        pos = np.searchsorted(unique_keys, target_keys)
+        pos[pos == len(unique_keys)] = 0
+        found = unique_keys[pos] == target_keys
+        target_nodes[found] = ranks[pos[found]]
+
+    concept_role = table.lookup(CONCEPT_ROLE)
+    node_concepts = np.full(len(node_keys), -1, dtype=np.int32)
+    is_instance = roles == concept_role
+    instance_nodes, first = np.unique(source_nodes[is_instance],
+                                      return_index=True)
+    node_concepts[instance_nodes] = targets[is_instance][first]
+
+    # the top is the explicit top or else the source of the first triple
+    top_nodes = np.full(count, -1, dtype=np.int64)
+    top_nodes[has_top] = key_nodes[len(sources):]
+    nonempty = ~has_top & (lengths > 0)
+    top_nodes[nonempty] = source_nodes[offsets[:-1][nonempty]]
+
+    is_edge = target_nodes >= 0
+    is_attribute = ~is_edge & ~is_instance
+    bounds = np.arange(count + 1)
+    return GraphArrays(
+        table=table,
+        node_offsets=np.searchsorted(node_graphs, bounds),
+        node_variables=(node_keys % n).astype(np.int32),
+        node_concepts=node_concepts,
+        tops=top_nodes.astype(np.int32),
+        edge_offsets=np.searchsorted(graph_ids[is_edge], bounds),
+        edge_sources=source_nodes[is_edge].astype(np.int32),
+        edge_targets=target_nodes[is_edge].astype(np.int32),
+        edge_roles=roles[is_edge],
+        attribute_offsets=np.searchsorted(graph_ids[is_attribute], bounds),
+        attribute_sources=source_nodes[is_attribute].astype(np.int32),
+        attribute_roles=roles[is_attribute],
+        attribute_targets=targets[is_attribute],
+    )
+
+
+class GraphCorpus(Sequence):
+    """
+    An in-memory corpus of graphs stored as columns of integer ids.
+
+    The triples of all graphs are stored together in three NumPy
+    ``int32`` arrays, :attr:`sources`, :attr:`roles`, and
+    :attr:`targets`, of ids into a :class:`~penman.graph.StringTable`
+    shared by the whole corpus. The triples of the *i*\\ th graph are
+    those from ``offsets[i]`` to ``offsets[i + 1]``, and the
+    :attr:`graph_ids` array gives the graph of each triple. Questions
+    about the whole corpus can then be answered with array operations
+    instead of loops over the triples of each graph, and
+    :meth:`find`, :meth:`count`, and :meth:`role_counts_by_concept`
+    do some of the common ones.
+
+    Accessing the corpus by index returns a new
+    :class:`~penman.graph.Graph` with the graph's triples, top,
+    epidata, and metadata. The corpus cannot be modified.
+
+    This class requires `NumPy <https://numpy.org/>`_.
+
+    Args:
+        graphs: an iterable of graphs, such as the output of
+            :meth:`penman.codec.PENMANCodec.iterdecode`
+        table: the :class:`~penman.graph.StringTable` for the
+            strings of the triples; if unspecified, a new table is
+            used
+    Example:
+        >>> from penman.corpus import GraphCorpus
+        >>> corpus = GraphCorpus.load('corpus.txt')
+        >>> corpus.count(role=':polarity', target='-')
+        152
+        >>> corpus[0].top
+        'w'
+    """
+
+    def __init__(self,
+                 graphs: Iterable[Graph] = (),
+                 table: StringTable = None):
+        np = _numpy()
+        if table is None:
+            table = StringTable()
+        intern = table.intern
+        sources, roles, targets = array('i'), array('i'), array('i')
+        offsets = array('q', [0])
+        tops = array('i')
+        epidata: List[_AlignedEpidata] = []
+        metadata: List[Dict[str, str]] = []
+        for g in graphs:
+            triples = g.triples
+            sources.extend([intern(t[0]) for t in triples])
+            roles.extend([intern(t[1]) for t in triples])
+            targets.extend([intern(t[2]) for t in triples])
+            offsets.append(len(sources))
+            tops.append(-1 if g._top is None else intern(g._top))
+            epidata.append(_align_epidata(triples, g.epidata))
+            metadata.append(dict(g.metadata))
+
+        self.table = table
+        #: The ids of the sources of all triples in the corpus.
+        self.sources = _to_int32(np, sources)
+        #: The ids of the roles of all triples in the corpus.
+        self.roles = _to_int32(np, roles)
+        #: The ids of the targets of all triples in the corpus.
+        self.targets = _to_int32(np, targets)
+        #: The offsets of the triples of each graph, plus the total.
+        self.offsets = np.frombuffer(offsets, dtype=np.int64)
+        #: The ids of the explicit top variables, or -1 for none.
+        self.tops = _to_int32(np, tops)
+        #: The index of the graph of each triple.
+        self.graph_ids = np.repeat(
+            np.arange(len(tops), dtype=np.int32), np.diff(self.offsets))
+        self.metadata = metadata
+        self._epidata = epidata
+
+    @classmethod
+    def load(cls,
+             source: file_or_filename,
+             model: Model = None,
+             workers: int = None,
+             chunksize: int = 100) -> 'GraphCorpus':
+        """
+        Decode the graphs in *source* into a new corpus.
+
+        Graphs are added to the corpus as they are decoded, so the
+        decoded graphs are not all kept in memory at once.
+
+        Args:
+            source: a filename or file object of PENMAN graphs
+            model: the model used for interpreting the graphs
+            workers: the number of processes used for decoding; see
+                :meth:`penman.codec.PENMANCodec.iterdecode`
+            chunksize: the number of graphs decoded in each chunk
+        Returns:
+            A :class:`GraphCorpus` of the decoded graphs.
+        """
+        codec = PENMANCodec(model=model)
+        if isinstance(source, (str, Path)):
+            with open(source) as fh:
+                return cls(codec.iterdecode(
+                    fh, workers=workers, chunksize=chunksize))
+        else:
+            return cls(codec.iterdecode(
+                source, workers=workers, chunksize=chunksize))
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} ({len(self)} graphs)>'
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('graph index out of range')
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        # sources and roles are strings, but the table holds any target
+        strings: List[Any] = self.table.strings
+        triples = [(strings[s], strings[r], strings[t])
+                   for s, r, t in zip(self.sources[start:end].tolist(),
+                                      self.roles[start:end].tolist(),
+                                      self.targets[start:end].tolist())]
+        top = int(self.tops[i])
+        return Graph(triples,
+                     top=None if top < 0 else strings[top],
+                     epidata=_unalign_epidata(triples, self._epidata[i]),
+                     metadata=self.metadata[i])
+
+    def __iter__(self) -> Iterator[Graph]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def mask(self,
+             source: Variable = None,
+             role: Role = None,
+             target: Target = None):
+        """
+        Return a boolean array selecting the matching triples.
+
+        Triples match if they have the given *source*, *role*, and
+        *target*; those not given match any triple.
+        """
+        np = _numpy()
+        mask = np.ones(len(self.sources), dtype=bool)
+        for column, key in ((self.sources, source),
+                            (self.roles, role),
+                            (self.targets, target)):
+            if key is not None:
+                i = self.table.lookup(key)
+                if i is None:
+                    mask[:] = False  # the key is in no triple
+                    break
+                mask &= column == i
+        return mask
+
+    def find(self,
+             source: Variable = None,
+             role: Role = None,
+             target: Target = None):
+        """
+        Return the sorted indices of graphs with a matching triple.
+
+        See :meth:`mask` for the meaning of the arguments.
+
+        Example:
+            >>> corpus.find(role=':polarity', target='-')
+            array([   3,   17,   42, ...])
+        """
+        np = _numpy()
+        return np.unique(self.graph_ids[self.mask(source, role, target)])
+
+    def count(self,
+              source: Variable = None,
+              role: Role = None,
+              target: Target = None) -> int:
+        """
+        Return the number of graphs with a matching triple.
+
+        See :meth:`mask` for the meaning of the arguments.
+        """
+        return len(self.find(source, role, target))
+
+    def source_concepts(self):
+        """
+        Return the concept ids of the source of each triple.
+
+        The concept of a source is the target of the first instance
+        triple of the source in the same graph. The id is -1 for
+        sources without an instance triple.
+        """
+        np = _numpy()
+        n = len(self.table)
+        concept_role = self.table.lookup(CONCEPT_ROLE)
+        keys = self.graph_ids.astype(np.int64) * n + self.sources
+        is_instance = self.roles == concept_role
+        instance_keys = keys[is_instance]
+        order = np.argsort(instance_keys, kind='stable')
+        sorted_keys = instance_keys[order]
+        concepts = self.targets[is_instance][order]
+        if len(sorted_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int32)
+        pos = np.searchsorted(sorted_keys, keys)
+        pos[pos == len(sorted_keys)] = 0
+        found = sorted_keys[pos] == keys
+        return np.where(found, concepts[pos], -1).astype(np.int32)
+
+    def to_arrays(self) -> GraphArrays:
+        """
+        Return the nodes, edges, and attributes of the corpus as arrays.
+
+        The arrays are computed from the columns of the corpus, with
+        ids in the corpus's :attr:`table`. See :func:`to_arrays`.
+        """
+        np = _numpy()
+        return _graph_arrays(np, self.table, self.sources, self.roles,
+                             self.targets, self.offsets, self.tops)
+
+    def role_counts_by_concept(self) -> Dict[Any, Dict[Role, int]]:
+        """
+        Return the number of triples with each role by source concept.
+
+        Instance triples and triples whose source has no concept are
+        not counted.
+
+        Example:
+            >>> counts = corpus.role_counts_by_concept()
+            >>> counts['want-01'][':ARG0']
+            12
+        """
+        np = _numpy()
+        n = len(self.table)
+        concepts = self.source_concepts()
+        selected = ((concepts >= 0)
+                    & (self.roles != self.table.lookup(CONCEPT_ROLE)))
+        pairs = (concepts[selected].astype(np.int64) * n
+                 + self.roles[selected])
+        keys, counts = np.unique(pairs, return_counts=True)
+        strings = self.table.strings
+        result: Dict[Any, Dict[Role, int]] = {}
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            concept, role = divmod(key, n)
+            result.setdefault(strings[concept], {})[strings[role]] = count
+        return result
+
+
+def iterdecode_mapped(path: Union[str, Path],
+                      model: Model = None,
+                      workers: int = None,
+                      chunksize: int = 100) -> Iterator[Graph]:
+    """
+    Yield graphs decoded from a memory-mapped corpus file.
+
+    The UTF-8 file at *path* is mapped into memory and split into
+    chunks of *chunksize* graphs with
+    :func:`~penman.lexer.scan_graphs`. Only one chunk at a time is
+    decoded to a string for parsing, so the text of the whole file is
+    never held in memory.
+
+    If *workers* is given, the chunks are decoded by a pool of
+    *workers* processes. Each process maps the file itself and is only
+    sent the offsets of its chunk, so the processes share the file's
+    pages instead of each receiving a copy of the text.
+
+    Args:
+        path: the filename of a PENMAN corpus
+        model: the model used for interpreting the graphs
+        workers: if given, the number of processes used to decode
+        chunksize: the number of graphs in each chunk
+    Returns:
+        The :class:`~penman.graph.Graph` objects in *path*.
+    """
+    # not a generator so invalid arguments are reported right away
+    if workers is not None and workers < 1:
+        raise ValueError('workers must be a positive integer')
+    if chunksize < 1:
+        raise ValueError('chunksize must be a positive integer')
+    return _iterdecode_mapped(path, model, workers, chunksize)
+
+
+def _iterdecode_mapped(path: Union[str, Path],
+                       model: Optional[Model],
+                       workers: Optional[int],
+                       chunksize: int) -> Iterator[Graph]:
+    codec = PENMANCodec(model=model)
+    data = _map_file(path)
+    try:
+        chunks = _chunk_offsets(data, chunksize)
+        if workers is None:
+            yield from chunk_graphs(
+                _decode_offsets(codec.model, data, start, end)
+                for start, end in chunks)
+        else:
+            tasks = ((codec.model, os.fspath(path), start, end)
+                     for start, end in chunks)
+            yield from chunk_graphs(imap(_decode_mapped, tasks, workers))
+    finally:
+        _close(data)
+
+
+def iter_metadata(source: file_or_filename) -> Iterator[Dict[str, str]]:
+    """
+    Yield the metadata of each graph in *source* without decoding it.
+
+    Only the comments before each graph are parsed; graphs are found
+    with :func:`~penman.lexer.scan_graphs` and their bodies are not
+    tokenized. A filename is read through a memory map of the (UTF-8)
+    file. The metadata is the same as the
+    :attr:`~penman.graph.Graph.metadata` of decoded graphs, and an
+    empty dictionary is yielded for graphs without metadata.
+
+    Args:
+        source: a filename or file-like object to read from
+    Returns:
+        The metadata dictionary of each graph in *source*.
+    Example:
+        >>> from penman.corpus import iter_metadata
+        >>> for metadata in iter_metadata('corpus.txt'):
+        ...     print(metadata.get('id'), metadata.get('snt'))
+    """
+    codec = PENMANCodec()
+    if isinstance(source, (str, Path)):
+        data = _map_file(source)
+        try:
+            for start, body, _ in scan_graphs(data):
+                comments = data[start:body].decode('utf-8')
+                yield codec._parse_comment_text(comments)
+        finally:
+            _close(data)
+    else:
+        for text, _, spans in _split_chunks(source, 100):
+            for start, body, _ in spans:
+                yield codec._parse_comment_text(text[start:body])
+
+
+def _numpy(feature: str = 'GraphCorpus'):
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(f'{feature} requires NumPy') from None
+    return numpy
+
+
+def _to_int32(np, column: array):
+    return np.frombuffer(column, dtype=np.intc).astype(np.int32, copy=False)
+
+
+def _map_file(path: Union[str, Path]) -> _Data:
+    """Return a read-only memory map of the file at *path*."""
+    with open(path, 'rb') as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return b''  # empty files cannot be mapped
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _close(data: _Data) -> None:
+    if isinstance(data, mmap.mmap):
+        data.close()
+
+
+def _count_lines(data: _Data, end: int) -> int:
+    """Return the number of newlines in *data* before *end*."""
+    count = 0
+    for i in range(0, end, 1 << 20):
+        count += data[i:min(i + (1 << 20), end)].count(b'\n')
+    return count
+
+
+def _chunk_offsets(data: _Data,
+                   chunksize: int) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) offsets of chunks of *chunksize* graphs.
+
+    The chunks cover all of *data* so nothing between the graphs is
+    skipped.
+    """
+    start = count = 0
+    for span in scan_graphs(data):
+        count += 1
+        if count == chunksize:
+            yield start, span.end
+            start = span.end
+            count = 0
+    if start < len(data):
+        yield start, len(data)
+
+
+def _decode_offsets(model: Model,
+                    data: _Data,
+                    start: int,
+                    end: int) -> DecodedChunk:
+    """Decode the graphs from *start* to *end* in *data*."""
+    text = data[start:end].decode('utf-8')
+    graphs, error, stopped = decode_chunk(model, text, 1)
+    if isinstance(error, DecodeError) and error.lineno:
+        error.lineno += _count_lines(data, start)
+    return graphs, error, stopped
+
+
+def _decode_mapped(model: Model,
+                   path: str,
+                   start: int,
+                   end: int) -> DecodedChunk:
+    """Map the file at *path* and decode from *start* to *end*."""
+    data = _map_file(path)
+    try:
+        return _decode_offsets(model, data, start, end)
+    finally:
+        _close(data)
@@ -4,11 +4,25 @@
 Data structures for Penman graphs and triples.
 """
 
-from typing import (Union, Optional, Mapping, List, Dict, Set, NamedTuple)
-from collections import defaultdict
-import copy
+from typing import (
+    Any,
+    Union,
+    Optional,
+    Mapping,
+    Iterable,
+    Iterator,
+    List,
+    Dict,
+    Set,
+    Tuple,
+    NamedTuple,
+    Callable,
+    cast,
+)
+from collections import (defaultdict, deque)
+from array import array
 
-from penman.exceptions import GraphError
+from penman.exceptions import (GraphError, DecodeError)
 from penman.types import (
     Variable,
     Constant,
@@ -17,7 +31,7 @@ from penman.types import (
     BasicTriple,
     Triples,
 )
-from penman.epigraph import Epidata
+from penman.epigraph import (Epidatum, Epidata)
 
 
 CONCEPT_ROLE = ':instance'
@@ -57,6 +71,154 @@ class Attribute(Triple):
     """The target constant."""
 
 
+# the positions of triple elements, used for the tables of _TripleList
+_SOURCE, _ROLE, _TARGET = 0, 1, 2
+
+# the top variable, edges, and attributes cached by Graph._split()
+_Split = Tuple[Optional[Variable], List[BasicTriple], List[BasicTriple]]
+
+# the outgoing and incoming edges of each variable, cached by
+# Graph._adjacency() along with the split they were computed from
+_Adjacency = Tuple[_Split,
+                   Dict[Variable, List['Edge']],
+                   Dict[Variable, List['Edge']]]
+
+
+class _TripleList(list):
+    """
+    A list of triples with indexes for looking up triples.
+
+    Each index table maps the source, role, or target of the triples
+    to the list of triples with it, in order. A table is built when
+    first requested by :meth:`_table`. After that, it is updated when
+    triples are appended or removed, and it is discarded to be built
+    again when the list is changed in other ways, such as by sorting
+    or inserting.
+
+    The division of the triples into edges and attributes is also
+    cached (see :meth:`Graph._split`), but as it depends on the set of
+    variables it is discarded on any change to the list. The
+    adjacency lists of the edges (see :meth:`Graph._adjacency`) are
+    kept with the division they were computed from.
+    """
+
+    __slots__ = '_tables', '_split', '_adjacency'
+
+    def __init__(self, triples: Triples = ()):
+        super().__init__(triples)
+        self._tables: List[Optional[Dict[Any, List[BasicTriple]]]] = [
+            None, None, None]
+        self._split: Optional[_Split] = None
+        self._adjacency: Optional[_Adjacency] = None
+
+    def __reduce_ex__(self, protocol):
+        # tables are not copied or pickled; they are rebuilt when needed
+        return (type(self), (list(self),))
+
+    def _table(self, pos: int) -> Dict[Any, List[BasicTriple]]:
+        """
+        Return the index table for the triple position *pos*.
+
+        The keys are variables, roles, or targets, depending on *pos*.
+        """
+        table = self._tables[pos]
+        if table is None:
+            table = {}
+            for triple in self:
+                key = triple[pos]
+                if key in table:
+                    table[key].append(triple)
+                else:
+                    table[key] = [triple]
+            self._tables[pos] = table
+        return table
+
+    def _add(self, triple: BasicTriple) -> None:
+        self._split = None
+        for pos, table in enumerate(self._tables):
+            if table is not None:
+                key = triple[pos]
+                if key in table:
+                    table[key].append(triple)
+                else:
+                    table[key] = [triple]
+
+    def _discard(self, triple: BasicTriple) -> None:
+        self._split = None
+        for pos, table in enumerate(self._tables):
+            if table is not None:
+                key = triple[pos]
+                selected = table[key]
+                selected.remove(triple)
+                if not selected:
+                    del table[key]
+
+    def _invalidate(self) -> None:
+        self._tables = [None, None, None]
+        self._split = None
+
+    def append(self, triple):
+        source, role, target = triple  # validate before adding
+        super().append(triple)
+        self._add(triple)
+
+    def extend(self, triples):
+        triples = list(triples)
+        super().extend(triples)
+        self._split = None
+        if any(table is not None for table in self._tables):
+            for triple in triples:
+                self._add(triple)
+
+    # like list.__iadd__(), this takes any iterable, unlike __add__()
+    def __iadd__(self, triples):  # type: ignore[misc]
+        self.extend(triples)
+        return self
+
+    def insert(self, i, triple):
+        super().insert(i, triple)
+        self._invalidate()
+
+    def remove(self, triple):
+        super().remove(triple)
+        self._discard(triple)
+
+    def pop(self, i=-1):
+        triple = super().pop(i)
+        self._discard(triple)
+        return triple
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            super().__delitem__(key)
+            self._invalidate()
+        else:
+            triple = self[key]
+            super().__delitem__(key)
+            self._discard(triple)
+
+    def __imul__(self, n):  # type: ignore[misc]
+        super().__imul__(n)
+        self._invalidate()
+        return self
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._invalidate()
+
+    def reverse(self):
+        super().reverse()
+        self._invalidate()
+
+
 class Graph(object):
     """
     A basic class for modeling a rooted, directed acyclic graph.
@@ -96,8 +258,8 @@ class Graph(object):
 
         # the following (a) creates a new list (b) validates that
         # they are triples, and (c) ensures roles begin with :
-        self.triples = [(src, _ensure_colon(role), tgt)
-                        for src, role, tgt in triples]
+        self._triples = _TripleList((src, _ensure_colon(role), tgt)
+                                    for src, role, tgt in triples)
         self._top = top
         self.epidata = dict(epidata)
         self.metadata = dict(metadata)
@@ -119,9 +281,17 @@ class Graph(object):
                 and len(self.triples) == len(other.triples)
                 and set(self.triples) == set(other.triples))
 
+    def __setstate__(self, state):
+        # graphs pickled before the triples were indexed keep them in
+        # a plain list under 'triples'
+        if 'triples' in state:
+            state = dict(state)
+            state['_triples'] = _TripleList(state.pop('triples'))
+        self.__dict__.update(state)
+
     def __or__(self, other):
         if isinstance(other, Graph):
-            g = copy.deepcopy(self)
+            g = self.copy()
             g.metadata.clear()
             g |= other
             return g
@@ -142,7 +312,7 @@ class Graph(object):
 
     def __sub__(self, other):
         if isinstance(other, Graph):
-            g = copy.deepcopy(self)
+            g = self.copy()
             g.metadata.clear()
             g -= other
             return g
@@ -163,6 +333,50 @@ class Graph(object):
         else:
             return NotImplemented
 
+    def copy(self) -> 'Graph':
+        """
+        Return a copy of the graph that can be changed independently.
+
+        Unlike :func:`copy.deepcopy`, the triples, which are tuples,
+        and the epigraphical markers are shared with the copy, so only
+        the list of triples, the lists of epidata, and the metadata
+        are copied. The copy is always a regular :class:`Graph`.
+
+        Example:
+            >>> g = Graph([('a', ':instance', 'alpha')])
+            >>> h = g.copy()
+            >>> h.triples.append(('a', ':ARG0', 'b'))
+            >>> len(g.triples), len(h.triples)
+            (1, 2)
+        """
+        g = Graph.__new__(Graph)
+        g._triples = triples = _TripleList(self._triples)
+        # the cached split and adjacency lists are replaced, not
+        # changed, when the triples change, so they can be shared
+        triples._split = self._triples._split
+        triples._adjacency = self._triples._adjacency
+        g._top = self._top
+        g.epidata = {t: list(epis) for t, epis in self.epidata.items()}
+        g.metadata = dict(self.metadata)
+        return g
+
+    @property
+    def triples(self) -> List[BasicTriple]:
+        """
+        The list of triples that make up the graph.
+
+        Assigning a list that is not already the triples of a graph
+        copies it into a new indexed list, so later changes to the
+        assigned list do not change the graph.
+        """
+        return self._triples
+
+    @triples.setter
+    def triples(self, triples: Triples):
+        if not isinstance(triples, _TripleList):
+            triples = _TripleList(triples)
+        self._triples = triples
+
     @property
     def top(self) -> Union[Variable, None]:
         """
@@ -175,15 +389,19 @@ class Graph(object):
 
     @top.setter
     def top(self, top: Union[Variable, None]):
-        if top is not None and top not in self.variables():
+        if top is not None and not self._is_variable(top):
             raise GraphError('top must be a valid node')
         self._top = top  # check if top is valid variable?
 
     def variables(self) -> Set[Variable]:
         """
         Return the set of variables (nonterminal node identifiers).
+
+        The variables are kept in an index that is updated as the
+        triples change, so this only copies the index into a new set
+        that the caller is free to modify.
         """
-        vs = set(src for src, _, _ in self.triples)
+        vs = set(self._triples._table(_SOURCE))
         if self._top is not None:
             vs.add(self._top)
         return vs
@@ -204,10 +422,12 @@ class Graph(object):
 
         Edges don't include terminal triples (concepts or attributes).
         """
-        variables = self.variables()
+        if source is role is target is None:
+            return [Edge(*t) for t in self._split()[1]]
+        is_variable = self._is_variable
         return [Edge(*t)
                 for t in self._filter_triples(source, role, target)
-                if t[2] in variables]
+                if is_variable(t[2])]
 
     def attributes(self,
                    source: Optional[Variable] = None,
@@ -219,10 +439,12 @@ class Graph(object):
         Attributes don't include concept triples or those where the
         target is a nonterminal.
         """
-        variables = self.variables()
+        if source is role is target is None:
+            return [Attribute(*t) for t in self._split()[2]]
+        is_variable = self._is_variable
         return [Attribute(*t)
                 for t in self._filter_triples(source, role, target)
-                if t[1] != CONCEPT_ROLE and t[2] not in variables]
+                if t[1] != CONCEPT_ROLE and not is_variable(t[2])]
 
     def _filter_triples(self,
                         source: Optional[Variable],
@@ -232,15 +454,82 @@ class Graph(object):
         Filter triples based on their source, role, and/or target.
         """
         if source is role is target is None:
-            triples = list(self.triples)
-        else:
-            triples = [
-                t for t in self.triples
-                if ((source is None or source == t[0])
-                    and (role is None or role == t[1])
-                    and (target is None or target == t[2]))
-            ]
-        return triples
+            return list(self.triples)
+        # only look at the triples of the most selective index
+        triples = self._triples
+        candidates: List[BasicTriple] = triples
+        for pos, key in ((_SOURCE, source), (_ROLE, role), (_TARGET, target)):
+            if key is not None:
+                selected = triples._table(pos).get(key, [])
+                if len(selected) < len(candidates):
+                    candidates = selected
+        return [
+            t for t in candidates
+            if ((source is None or source == t[0])
+                and (role is None or role == t[1])
+                and (target is None or target == t[2]))
+        ]
+
+    def _is_variable(self, target: Target) -> bool:
+        """Return ``True`` if *target* is a variable of the graph."""
+        return (target in self._triples._table(_SOURCE)
+                or (target == self._top and target is not None))
+
+    def _split(self) -> _Split:
+        """
+        Return the top variable and the lists of edges and attributes.
+
+        The result is cached on the triple list until the triples or
+        the top variable change.
+        """
+        triples = self._triples
+        split = triples._split
+        if split is None or split[0] != self._top:
+            is_variable = self._is_variable
+            edges: List[BasicTriple] = []
+            attributes: List[BasicTriple] = []
+            for t in triples:
+                if is_variable(t[2]):
+                    edges.append(t)
+                elif t[1] != CONCEPT_ROLE:
+                    attributes.append(t)
+            split = triples._split = (self._top, edges, attributes)
+        return split
+
+    def _adjacency(self) -> _Adjacency:
+        """
+        Return the split and the outgoing and incoming edges by variable.
+
+        The adjacency lists are computed in one pass over the edges
+        and cached until the split of the triples changes.
+        """
+        triples = self._triples
+        split = self._split()
+        adjacency = triples._adjacency
+        if adjacency is None or adjacency[0] is not split:
+            outgoing: Dict[Variable, List[Edge]] = {}
+            incoming: Dict[Variable, List[Edge]] = {}
+            for t in split[1]:
+                edge = Edge(*t)
+                outgoing.setdefault(edge.source, []).append(edge)
+                incoming.setdefault(edge.target, []).append(edge)
+            adjacency = triples._adjacency = (split, outgoing, incoming)
+        return adjacency
+
+    def invalidate(self) -> None:
+        """
+        Discard the cached indexes of the graph's triples.
+
+        The variables, edges, and attributes of a graph are computed
+        from indexes that are updated when :attr:`triples` is changed
+        with list methods such as :meth:`list.append`, item
+        assignment, or deletion. Call this method after changing the
+        triples in a way that the graph cannot observe, such as with
+        ``list.append(g.triples, triple)``, so the indexes are rebuilt
+        when next needed. Assigning a new list to :attr:`triples`
+        does not require it.
+        """
+        self._triples._invalidate()
 
     def reentrancies(self) -> Dict[Variable, int]:
         """
@@ -261,6 +550,619 @@ class Graph(object):
             entrancies[t.target] += 1
         return dict((v, cnt - 1) for v, cnt in entrancies.items() if cnt >= 2)
 
+    def successors(self, var: Variable) -> List[Edge]:
+        """
+        Return the edges with *var* as their source.
+
+        The edges are in the order of :attr:`triples`. Like
+        :meth:`predecessors` and the traversal methods, this uses
+        adjacency lists that are computed once for all variables and
+        kept until the triples or top change, so it does not scan
+        the triples.
+
+        Example:
+            >>> from penman import decode
+            >>> g = decode('(a / alpha :ARG0 (b / beta) :ARG1-of (g / gamma))')
+            >>> g.successors('a')
+            [Edge(source='a', role=':ARG0', target='b')]
+            >>> g.predecessors('a')
+            [Edge(source='g', role=':ARG1', target='a')]
+        """
+        return list(self._adjacency()[1].get(var, ()))
+
+    def predecessors(self, var: Variable) -> List[Edge]:
+        """
+        Return the edges with *var* as their target.
+
+        The edges are in the order of :attr:`triples`.
+        """
+        return list(self._adjacency()[2].get(var, ()))
+
+    def descendants(self, var: Variable) -> Set[Variable]:
+        """
+        Return the variables reachable from *var* by following edges.
+
+        The set does not include *var* unless it is reachable from
+        itself through a cycle.
+        """
+        outgoing = self._adjacency()[1]
+        self._check_variable(var)
+        found: Set[Variable] = set()
+        agenda = [var]
+        while agenda:
+            for edge in outgoing.get(agenda.pop(), ()):
+                if edge.target not in found:
+                    found.add(edge.target)
+                    agenda.append(edge.target)
+        return found
+
+    def bfs(self, start: Variable = None) -> Iterator[Variable]:
+        """
+        Yield the variables reachable from *start* breadth-first.
+
+        The traversal follows edges from their sources to their
+        targets, visiting the targets of each variable in the order
+        of :attr:`triples`, and each variable is yielded once,
+        starting with *start*.
+
+        Args:
+            start: the variable to start from; if unspecified, the
+                top variable is used
+        Example:
+            >>> from penman import decode
+            >>> g = decode('(a :ARG0 (b :ARG0 (d)) :ARG1 (c))')
+            >>> list(g.bfs())
+            ['a', 'b', 'c', 'd']
+            >>> list(g.dfs())
+            ['a', 'b', 'd', 'c']
+        """
+        outgoing = self._adjacency()[1]
+        if start is None:
+            start = self.top
+            if start is None:
+                return
+        self._check_variable(start)
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            var = queue.popleft()
+            yield var
+            for edge in outgoing.get(var, ()):
+                if edge.target not in seen:
+                    seen.add(edge.target)
+                    queue.append(edge.target)
+
+    def dfs(self, start: Variable = None) -> Iterator[Variable]:
+        """
+        Yield the variables reachable from *start* depth-first.
+
+        Variables are yielded in preorder, once each, visiting the
+        targets of each variable in the order of :attr:`triples`.
+
+        Args:
+            start: the variable to start from; if unspecified, the
+                top variable is used
+        """
+        outgoing = self._adjacency()[1]
+        if start is None:
+            start = self.top
+            if start is None:
+                return
+        self._check_variable(start)
+        seen: Set[Variable] = set()
+        stack = [start]
+        while stack:
+            var = stack.pop()
+            if var in seen:
+                continue
+            seen.add(var)
+            yield var
+            # reversed so the first target is visited first
+            stack.extend(edge.target
+                         for edge in reversed(outgoing.get(var, ()))
+                         if edge.target not in seen)
+
+    def subgraph(self, var: Variable) -> 'Graph':
+        """
+        Return the subgraph of *var* and its descendants.
+
+        The subgraph has *var* as its top and the triples of the graph
+        whose source is *var* or one of its :meth:`descendants`, in
+        order, with copies of their epidata. It has no metadata.
+
+        Example:
+            >>> from penman import decode, encode
+            >>> g = decode('(a / alpha :ARG0 (b / beta :ARG1 (g / gamma)))')
+            >>> print(encode(g.subgraph('b')))
+            (b / beta
+               :ARG1 (g / gamma))
+        """
+        variables = self.descendants(var)
+        variables.add(var)
+        triples = [t for t in self._triples if t[0] in variables]
+        epidata = self.epidata
+        return Graph(triples,
+                     top=var,
+                     epidata={t: list(epidata[t])
+                              for t in triples if t in epidata})
+
+    def _check_variable(self, var: Variable) -> None:
+        if not self._is_variable(var):
+            raise GraphError(f'not a variable: {var!r}')
+
+
+# attributes of a LazyGraph that are only set when it is decoded
+_LAZY_ATTRIBUTES = frozenset(('_triples', 'epidata', '_top'))
+
+
+class LazyGraph(Graph):
+    """
+    A graph that is decoded from its PENMAN string when first used.
+
+    The graph's :attr:`metadata` is available without decoding. The
+    first access of :attr:`triples`, :attr:`epidata`, or anything that
+    uses them, such as :attr:`top` or :meth:`edges`, decodes *text*
+    with *decode*. After that, the lazy graph behaves like a regular
+    :class:`Graph`.
+
+    A copy of the decoded triples, top, and epidata is kept so
+    :meth:`is_modified` can tell whether the graph has changed. If
+    it has not, :meth:`penman.codec.PENMANCodec.encode` returns the
+    original text instead of configuring and formatting the graph.
+
+    Args:
+        text: the PENMAN string of the graph and its leading comments
+        metadata: the metadata in the leading comments of *text*
+        decode: a function that decodes *text* into a :class:`Graph`
+        body: the offset of the graph in *text* after the comments
+        lineno: the line number where *text* starts in its file,
+            used for the line numbers of decoding errors
+    Example:
+        >>> from penman.codec import PENMANCodec
+        >>> codec = PENMANCodec()
+        >>> g = next(codec.iterdecode('(a / alpha)', lazy=True))
+        >>> g.is_loaded()
+        False
+        >>> g.triples
+        [('a', ':instance', 'alpha')]
+        >>> g.is_loaded()
+        True
+    """
+
+    def __init__(self,
+                 text: str,
+                 metadata: Mapping[str, str],
+                 decode: Callable[[str], Graph],
+                 body: int = 0,
+                 lineno: int = 1):
+        self.text = text
+        self.body = body
+        self.lineno = lineno
+        self.metadata = dict(metadata)
+        self._metadata = dict(metadata)
+        self._decode = decode
+
+    def __getattr__(self, name):
+        # only called for attributes not yet set
+        if name in _LAZY_ATTRIBUTES and '_decode' in self.__dict__:
+            self._load()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def _load(self) -> None:
+        d = self.__dict__
+        try:
+            g = self._decode(self.text)
+        except DecodeError as exc:
+            if exc.lineno:
+                exc.lineno += self.lineno - 1
+            raise
+        d['_original'] = (list(g.triples),
+                          g._top,
+                          {t: list(epis) for t, epis in g.epidata.items()})
+        # attributes assigned before decoding are not replaced
+        d.setdefault('_triples', g._triples)
+        d.setdefault('epidata', g.epidata)
+        d.setdefault('_top', g._top)
+
+    def invalidate(self) -> None:
+        # an unloaded graph has no indexes to discard
+        if '_triples' in self.__dict__:
+            super().invalidate()
+
+    def is_loaded(self) -> bool:
+        """Return ``True`` if the graph has been decoded."""
+        return '_original' in self.__dict__
+
+    def is_modified(self) -> bool:
+        """
+        Return ``True`` if the graph has changed since it was decoded.
+
+        The triples, top, and epidata are compared with those from
+        decoding, so changes made in place are detected, too. Changes
+        to :attr:`metadata` are not considered.
+        """
+        d = self.__dict__
+        if '_original' not in d:
+            return any(name in d for name in _LAZY_ATTRIBUTES)
+        triples, top, epidata = d['_original']
+        return not (d['_top'] == top
+                    and d['_triples'] == triples
+                    and d['epidata'] == epidata)
+
+
+class StringTable(object):
+    """
+    A table that assigns integer ids to strings.
+
+    Each distinct string is stored once and gets the next unused id.
+    :class:`CompactGraph` objects store the ids of their variables,
+    roles, and targets, so graphs that share a table also share the
+    strings. Besides strings, the table accepts any hashable target,
+    such as ``None`` for the target of an untyped node.
+
+    Args:
+        strings: strings to add to the table, in order
+    Example:
+        >>> table = StringTable()
+        >>> table.intern('alpha')
+        0
+        >>> table.intern(':ARG0'), table.intern('alpha')
+        (1, 0)
+        >>> table[1]
+        ':ARG0'
+    """
+
+    __slots__ = 'strings', '_ids'
+
+    def __init__(self, strings: Iterable[Target] = ()):
+        self.strings: List[Target] = []
+        self._ids: Dict[Target, int] = {}
+        for string in strings:
+            self.intern(string)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, i: int) -> Target:
+        return self.strings[i]
+
+    def __contains__(self, string) -> bool:
+        return string in self._ids
+
+    def intern(self, string: Target) -> int:
+        """Return the id of *string*, adding it to the table if needed."""
+        ids = self._ids
+        try:
+            return ids[string]
+        except KeyError:
+            i = ids[string] = len(self.strings)
+            self.strings.append(string)
+            return i
+
+    def lookup(self, string: Target) -> Optional[int]:
+        """Return the id of *string*, or ``None`` if it is not in the table."""
+        return self._ids.get(string)
+
+
+# the typecode of the arrays of string ids in a CompactGraph
+_ID_TYPECODE = 'l'
+
+# the id of an absent top variable
+_NO_ID = -1
+
+
+class CompactGraph(object):
+    """
+    A memory-efficient, read-only graph.
+
+    A compact graph uses less memory than a :class:`Graph` with the
+    same triples by storing the sources, roles, and targets of the
+    triples as integer ids in three :class:`array.array` columns,
+    with the strings themselves in a :class:`StringTable`. Graphs
+    that are given the same *table* share its strings; otherwise each
+    graph has a table of its own, which is released with the graph.
+    There is no instance dictionary and epigraphical data is stored
+    by triple position.
+
+    For reading, a compact graph supports the same attributes and
+    methods as :class:`Graph`, except for the traversal methods such
+    as :meth:`Graph.successors`, so it can be inspected, compared,
+    and encoded like a regular graph, but :attr:`triples` is created
+    when requested and :attr:`epidata` is created when first
+    requested, so neither should be modified. Use :meth:`to_graph` to
+    get a graph that can be modified.
+
+    Args:
+        triples: an iterable of triples (:class:`Triple` or 3-tuples)
+        top: the variable of the top node; if unspecified, the source
+            of the first triple is used
+        epidata: a mapping of triples to epigraphical markers
+        metadata: a mapping of metadata types to descriptions
+        table: the :class:`StringTable` for the strings of the
+            triples; if unspecified, a new table is used
+    Example:
+        >>> from penman.graph import Graph, CompactGraph
+        >>> g = Graph([('b', ':instance', 'bark-01'),
+        ...            ('d', ':instance', 'dog'),
+        ...            ('b', ':ARG0', 'd')])
+        >>> cg = CompactGraph.from_graph(g)
+        >>> cg == g
+        True
+        >>> cg.edges()
+        [Edge(source='b', role=':ARG0', target='d')]
+    """
+
+    __slots__ = ('metadata', '_table', '_sources', '_roles', '_targets',
+                 '_top', '_epidata', '_epidata_map', '_variable_id_set')
+
+    def __init__(self,
+                 triples: Triples = None,
+                 top: Variable = None,
+                 epidata: Mapping[BasicTriple, Epidata] = None,
+                 metadata: Mapping[str, str] = None,
+                 table: StringTable = None):
+        if table is None:
+            table = StringTable()
+        triples = [(src, _ensure_colon(role), tgt)
+                   for src, role, tgt in (triples or ())]
+        intern = table.intern
+        self.metadata = dict(metadata or ())
+        self._table = table
+        self._sources = array(_ID_TYPECODE, [intern(t[0]) for t in triples])
+        self._roles = array(_ID_TYPECODE, [intern(t[1]) for t in triples])
+        self._targets = array(_ID_TYPECODE, [intern(t[2]) for t in triples])
+        self._top = _NO_ID if top is None else intern(top)
+        self._epidata = _align_epidata(triples, epidata)
+        # the graph is read-only, so these are computed at most once
+        self._epidata_map: Optional[Dict[BasicTriple, Epidata]] = None
+        self._variable_id_set: Optional[Set[int]] = None
+
+    @classmethod
+    def from_graph(cls,
+                   g: Graph,
+                   table: StringTable = None) -> 'CompactGraph':
+        """
+        Return a compact copy of graph *g*.
+
+        Args:
+            g: the :class:`Graph` to copy
+            table: the :class:`StringTable` for the strings of the
+                triples
+        Returns:
+            A :class:`CompactGraph` with the triples, top, epidata,
+            and metadata of *g*.
+        """
+        return cls(g.triples,
+                   top=g._top,
+                   epidata=g.epidata,
+                   metadata=g.metadata,
+                   table=table)
+
+    def to_graph(self) -> Graph:
+        """
+        Return a regular :class:`Graph` copy of the compact graph.
+        """
+        # new epidata lists, as the graph may modify them
+        epidata = _unalign_epidata(self._iter_triples(), self._epidata)
+        return Graph(self.triples,
+                     top=self._top_variable(),
+                     epidata=epidata,
+                     metadata=self.metadata)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f'<{name} object (top={self.top}) at {id(self)}>'
+
+    def __str__(self):
+        return str(self.to_graph()).replace('Graph(', 'CompactGraph(', 1)
+
+    def __eq__(self, other):
+        if not isinstance(other, (Graph, CompactGraph)):
+            return NotImplemented
+        triples = self.triples
+        return (self.top == other.top
+                and len(triples) == len(other.triples)
+                and set(triples) == set(other.triples))
+
+    def __reduce__(self):
+        # the table may be large and shared, so only the strings of
+        # the graph are pickled and interned in a new table
+        return (type(self), (self.triples, self._top_variable(),
+                             self.epidata, self.metadata))
+
+    def _top_variable(self) -> Union[Variable, None]:
+        """Return the explicit top variable, if any."""
+        if self._top == _NO_ID:
+            return None
+        return cast(Variable, self._table[self._top])
+
+    def _iter_triples(self) -> Iterator[BasicTriple]:
+        # sources are variables and roles are strings, but the table
+        # holds any target
+        strings: List[Any] = self._table.strings
+        get = strings.__getitem__
+        return zip(map(get, self._sources),
+                   map(get, self._roles),
+                   map(get, self._targets))
+
+    @property
+    def triples(self) -> List[BasicTriple]:
+        """
+        A new list of the triples that make up the graph.
+        """
+        return list(self._iter_triples())
+
+    @property
+    def epidata(self) -> Dict[BasicTriple, Epidata]:
+        """
+        A mapping of triples to their epigraphical markers.
+
+        The mapping is created when first requested and the same
+        mapping is returned afterwards.
+        """
+        epidata = self._epidata_map
+        if epidata is None:
+            epidata = _unalign_epidata(self._iter_triples(), self._epidata)
+            self._epidata_map = epidata
+        return epidata
+
+    @property
+    def top(self) -> Union[Variable, None]:
+        """
+        The top variable.
+        """
+        top = self._top
+        if top == _NO_ID:
+            if len(self._sources) == 0:
+                return None
+            top = self._sources[0]  # implicit top
+        return cast(Variable, self._table[top])
+
+    def variables(self) -> Set[Variable]:
+        """
+        Return the set of variables (nonterminal node identifiers).
+        """
+        strings: List[Any] = self._table.strings
+        return {strings[i] for i in self._variable_ids()}
+
+    def instances(self) -> List[Attribute]:
+        """
+        Return instances (concept triples).
+        """
+        return [Attribute(*t)
+                for t in self._filter_triples(None, CONCEPT_ROLE, None)]
+
+    def edges(self,
+              source: Optional[Variable] = None,
+              role: Role = None,
+              target: Variable = None) -> List[Edge]:
+        """
+        Return edges filtered by their *source*, *role*, or *target*.
+
+        Edges don't include terminal triples (concepts or attributes).
+        """
+        variable_ids = self._variable_ids()
+        return [Edge(*t)
+                for t in self._filter_triples(
+                    source, role, target,
+                    lambda r, t: t in variable_ids)]
+
+    def attributes(self,
+                   source: Optional[Variable] = None,
+                   role: Role = None,
+                   target: Constant = None) -> List[Attribute]:
+        """
+        Return attributes filtered by their *source*, *role*, or *target*.
+
+        Attributes don't include concept triples or those where the
+        target is a nonterminal.
+        """
+        variable_ids = self._variable_ids()
+        concept_id = self._table.lookup(CONCEPT_ROLE)
+        return [Attribute(*t)
+                for t in self._filter_triples(
+                    source, role, target,
+                    lambda r, t: r != concept_id and t not in variable_ids)]
+
+    def reentrancies(self) -> Dict[Variable, int]:
+        """
+        Return a mapping of variables to their re-entrancy count.
+
+        See :meth:`Graph.reentrancies` for details.
+        """
+        entrancies: Dict[Variable, int] = defaultdict(int)
+        top = self.top
+        if top is not None:
+            entrancies[top] += 1  # implicit entrancy to top
+        for t in self.edges():
+            entrancies[t.target] += 1
+        return dict((v, cnt - 1) for v, cnt in entrancies.items() if cnt >= 2)
+
+    def _is_variable(self, target: Target) -> bool:
+        """Return ``True`` if *target* is a variable of the graph."""
+        i = self._table.lookup(target)
+        return i is not None and i in self._variable_ids()
+
+    def _variable_ids(self) -> Set[int]:
+        ids = self._variable_id_set
+        if ids is None:
+            ids = set(self._sources)
+            if self._top != _NO_ID:
+                ids.add(self._top)
+            self._variable_id_set = ids
+        return ids
+
+    def _filter_triples(self,
+                        source: Optional[Variable],
+                        role: Optional[Role],
+                        target: Optional[Target],
+                        test: Callable[[int, int], bool] = None
+                        ) -> List[BasicTriple]:
+        """
+        Filter triples based on their source, role, and/or target.
+
+        If *test* is given, it is called with the role and target ids
+        of each triple and only triples for which it returns ``True``
+        are kept.
+        """
+        lookup = self._table.lookup
+        keys: List[Optional[int]] = []
+        for key in (source, role, target):
+            if key is None:
+                keys.append(None)
+            else:
+                i = lookup(key)
+                if i is None:
+                    return []  # the key is in no triple
+                keys.append(i)
+        src, rol, tgt = keys
+        strings: List[Any] = self._table.strings
+        return [
+            (strings[s], strings[r], strings[t])
+            for s, r, t in zip(self._sources, self._roles, self._targets)
+            if ((src is None or src == s)
+                and (rol is None or rol == r)
+                and (tgt is None or tgt == t)
+                and (test is None or test(r, t)))
+        ]
+
+
+# epidata stored by triple position; None where a triple has none
+_AlignedEpidata = Optional[Tuple[Optional[Tuple[Epidatum, ...]], ...]]
+
+
+def _align_epidata(triples: List[BasicTriple],
+                   epidata: Optional[Mapping[BasicTriple, Epidata]]
+                   ) -> _AlignedEpidata:
+    """
+    Return the epidata of *triples* by position, or ``None`` if empty.
+    """
+    if not epidata:
+        return None
+    aligned: List[Optional[Tuple[Epidatum, ...]]] = []
+    seen: Set[BasicTriple] = set()
+    for triple in triples:
+        # only the first of duplicate triples has the epidata
+        if triple in epidata and triple not in seen:
+            aligned.append(tuple(epidata[triple]))
+        else:
+            aligned.append(None)
+        seen.add(triple)
+    return tuple(aligned)
+
+
+def _unalign_epidata(triples: Iterable[BasicTriple],
+                     aligned: _AlignedEpidata) -> Dict[BasicTriple, Epidata]:
+    """
+    Return the mapping of triples to epidata from *aligned* epidata.
+    """
+    if aligned is None:
+        return {}
+    return {triple: list(epis)
+            for triple, epis in zip(triples, aligned)
+            if epis is not None}
+
 
 def _ensure_colon(role):
     if not role.startswith(':'):
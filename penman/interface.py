@@ -7,8 +7,10 @@ from typing import Union, Iterable, List
 from pathlib import Path
 
 from penman.codec import PENMANCodec
+from penman.corpus import (IndexedCorpus, iterdecode_mapped)
 from penman.model import Model
 from penman.graph import Graph
+from penman.layout import LayoutStrategy
 from penman.types import (Variable, file_or_filename)
 
 
@@ -36,7 +38,9 @@ def encode(g: Graph,
            top: Variable = None,
            model: Model = None,
            indent: Union[int, bool] = -1,
-           compact: bool = False) -> str:
+           compact: bool = False,
+           canonical: bool = False,
+           strategy: LayoutStrategy = None) -> str:
     """
     Serialize the graph *g* from *top* to PENMAN notation.
 
@@ -46,6 +50,10 @@ def encode(g: Graph,
         model: the model used for interpreting the graph
         indent: how to indent formatted strings
         compact: if ``True``, put initial attributes on the first line
+        canonical: if ``True``, serialize the canonical tree of *g*
+            so that equal graphs give identical strings
+        strategy: if given, the layout strategy used to configure *g*
+            instead of its layout markers
     Returns:
         the PENMAN-serialized string of the Graph *g*
     Example:
@@ -58,42 +66,97 @@ def encode(g: Graph,
     return codec.encode(g,
                         top=top,
                         indent=indent,
-                        compact=compact)
+                        compact=compact,
+                        canonical=canonical,
+                        strategy=strategy)
 
 
 def load(source: file_or_filename,
-         model: Model = None) -> List[Graph]:
+         model: Model = None,
+         workers: int = None,
+         chunksize: int = 100,
+         mmap: bool = False) -> List[Graph]:
     """
     Deserialize a list of PENMAN-encoded graphs from *source*.
 
+    If *mmap* is ``True``, *source* must be the filename of a UTF-8
+    file, which is memory-mapped and decoded with
+    :func:`penman.corpus.iterdecode_mapped`. Worker processes then
+    share the mapped file instead of being sent its text.
+
     Args:
         source: a filename or file-like object to read from
         model: the model used for interpreting the graph
+        workers: if given, the number of processes used to decode
+        chunksize: the approximate number of graphs decoded at a time
+            by each process
+        mmap: if ``True``, decode from a memory map of *source*
     Returns:
         a list of Graph objects
     """
     codec = PENMANCodec(model=model)
-    if isinstance(source, (str, Path)):
+    if mmap:
+        if not isinstance(source, (str, Path)):
+            raise ValueError('mmap=True requires a filename')
+        return list(iterdecode_mapped(
+            source, model=model, workers=workers, chunksize=chunksize))
+    elif isinstance(source, (str, Path)):
         with open(source) as fh:
-            return list(codec.iterdecode(fh))
+            return list(codec.iterdecode(
+                fh, workers=workers, chunksize=chunksize))
     else:
         assert hasattr(source, 'read')
-        return list(codec.iterdecode(source))
+        return list(codec.iterdecode(
+            source, workers=workers, chunksize=chunksize))
 
 
 def loads(string: str,
-          model: Model = None) -> List[Graph]:
+          model: Model = None,
+          workers: int = None,
+          chunksize: int = 100) -> List[Graph]:
     """
     Deserialize a list of PENMAN-encoded graphs from *string*.
 
     Args:
         string: a string containing graph data
         model: the model used for interpreting the graph
+        workers: if given, the number of processes used to decode
+        chunksize: the approximate number of graphs decoded at a time
+            by each process
     Returns:
         a list of Graph objects
     """
     codec = PENMANCodec(model=model)
-    return list(codec.iterdecode(string))
+    return list(codec.iterdecode(
+        string, workers=workers, chunksize=chunksize))
+
+
+def load_indexed(path: Union[str, Path],
+                 model: Model = None,
+                 index_path: Union[str, Path] = None) -> IndexedCorpus:
+    """
+    Return a lazy sequence of the PENMAN-encoded graphs in *path*.
+
+    Graphs are decoded only when they are accessed by position or by
+    their ``::id`` metadata. The byte offsets of the graphs are kept in
+    a sidecar index file which is built the first time and rebuilt
+    when the size or modification time of *path* changes.
+
+    Args:
+        path: the filename of a PENMAN corpus
+        model: the model used for interpreting the graphs
+        index_path: the filename of the index; by default it is *path*
+            with ``.idx`` appended
+    Returns:
+        an :class:`~penman.corpus.IndexedCorpus` of Graph objects
+    Example:
+
+        >>> corpus = load_indexed('corpus.txt')
+        >>> g = corpus[1000]
+        >>> g = corpus.by_id('sent-42')
+
+    """
+    return IndexedCorpus(path, model=model, index_path=index_path)
 
 
 def dump(graphs: Iterable[Graph],
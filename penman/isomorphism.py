@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""
+Structural hashing and isomorphism checking of graphs.
+
+Two graphs are isomorphic if they are the same except for the names
+of their variables. Isomorphic graphs have the same
+:func:`structural_hash`, so it can be used to find duplicates among
+many graphs without comparing each pair, and :func:`is_isomorphic`
+uses it to reject most non-isomorphic graphs before searching for a
+mapping of variables.
+"""
+
+from typing import (Any, List, Dict, Tuple, Iterator, Optional)
+from collections import (defaultdict, Counter)
+import hashlib
+
+from penman.types import (Variable, Target, BasicTriple)
+from penman.graph import (CONCEPT_ROLE, Graph)
+
+
+class _Structure(object):
+    """
+    The variables of a graph colored by their structural position.
+
+    Colors are computed by Weisfeiler-Lehman refinement: each
+    variable starts with a color for its concepts, attributes, and
+    whether it is the top, and then, until no more variables are
+    distinguished (but at least once), a new color is computed from
+    its color and the roles and colors of its neighbors. Colors are
+    the ranks of the sorted descriptions, so they do not depend on
+    variable names.
+    """
+
+    __slots__ = 'variables', 'colors', 'edges', 'digest'
+
+    def __init__(self, g: Graph):
+        variables = g.variables()
+        top = g.top
+        concepts: Dict[Variable, List[str]] = defaultdict(list)
+        attributes: Dict[Variable, List[Tuple[str, str]]] = defaultdict(list)
+        outgoing: Dict[Variable, List[Tuple[str, Variable]]] = defaultdict(
+            list)
+        incoming: Dict[Variable, List[Tuple[str, Variable]]] = defaultdict(
+            list)
+        edges: List[BasicTriple] = []
+        for source, role, target in g.triples:
+            if target in variables:
+                outgoing[source].append((role, target))
+                incoming[target].append((role, source))
+                edges.append((source, role, target))
+            elif role == CONCEPT_ROLE:
+                concepts[source].append(repr(target))
+            else:
+                attributes[source].append((role, repr(target)))
+
+        # reprs make the values of constants comparable when sorting
+        signatures: Dict[Variable, Any] = {
+            v: repr((v == top,
+                     sorted(concepts.get(v, ())),
+                     sorted(attributes.get(v, ()))))
+            for v in variables}
+        digest = hashlib.blake2b(digest_size=16)
+        colors = _rank(signatures, digest)
+        size = len(set(colors.values()))
+        # refine at least once so the edges are always described
+        while True:
+            signatures = {
+                v: (colors[v],
+                    tuple(sorted([(role, colors[t])
+                                  for role, t in outgoing[v]])),
+                    tuple(sorted([(role, colors[s])
+                                  for role, s in incoming[v]])))
+                for v in variables}
+            colors = _rank(signatures, digest)
+            new_size = len(set(colors.values()))
+            if new_size == size or new_size == len(variables):
+                break
+            size = new_size
+
+        self.variables = variables
+        self.colors = colors
+        self.edges = edges
+        self.digest = digest
+
+
+def _rank(signatures: Dict[Variable, Any], digest) -> Dict[Variable, int]:
+    """
+    Return the rank of each variable's signature among the signatures.
+
+    The sorted signatures are added to *digest*.
+    """
+    ordered = sorted(signatures.values())
+    digest.update(repr(ordered).encode('utf-8'))
+    ranks = {sig: i for i, sig in enumerate(sorted(set(ordered)))}
+    return {v: ranks[sig] for v, sig in signatures.items()}
+
+
+def structural_hash(g: Graph) -> str:
+    """
+    Return a hash of the structure of graph *g*.
+
+    The hash depends on the concepts, roles, attributes, and top of
+    the graph but not on its variable names, epigraphical data, or
+    metadata, so graphs that are isomorphic have the same hash. The
+    hash is stable across processes and Python versions. Graphs that
+    are not isomorphic almost always have different hashes, but in
+    rare cases, such as some regular graphs, they do not; use
+    :func:`is_isomorphic` to be certain.
+
+    Args:
+        g: a :class:`~penman.graph.Graph`
+    Returns:
+        A string of 32 hexadecimal digits.
+    Example:
+        >>> from penman import decode
+        >>> from penman.isomorphism import structural_hash
+        >>> g1 = decode('(a / alpha :ARG0 (b / beta))')
+        >>> g2 = decode('(x / alpha :ARG0 (y / beta))')
+        >>> structural_hash(g1) == structural_hash(g2)
+        True
+    """
+    return _Structure(g).digest.hexdigest()
+
+
+def is_isomorphic(g1: Graph, g2: Graph) -> bool:
+    """
+    Return ``True`` if graphs *g1* and *g2* differ only in variables.
+
+    Graphs with different numbers of triples or different structural
+    hashes are rejected without further work. Otherwise a mapping of
+    the variables of *g1* to those of *g2* is searched for, trying
+    only variables with the same structural color.
+
+    Args:
+        g1: a :class:`~penman.graph.Graph`
+        g2: a :class:`~penman.graph.Graph`
+    Example:
+        >>> from penman import decode
+        >>> from penman.isomorphism import is_isomorphic
+        >>> is_isomorphic(decode('(a / alpha :ARG0 (b / beta))'),
+        ...               decode('(b / alpha :ARG0 (a / beta))'))
+        True
+        >>> is_isomorphic(decode('(a / alpha :ARG0 (b / beta))'),
+        ...               decode('(a / alpha :ARG1 (b / beta))'))
+        False
+    """
+    if len(g1.triples) != len(g2.triples):
+        return False
+    s1 = _Structure(g1)
+    s2 = _Structure(g2)
+    if s1.digest.digest() != s2.digest.digest():
+        return False
+    return _find_mapping(s1, s2) is not None
+
+
+def _find_mapping(s1: _Structure,
+                  s2: _Structure) -> Optional[Dict[Variable, Variable]]:
+    """
+    Return a mapping of the variables of *s1* to those of *s2*.
+
+    The structures must have the same digest, which ensures mapped
+    variables with the same color have the same concepts and
+    attributes. Return ``None`` if there is no mapping that also
+    preserves the edges.
+    """
+    by_color: Dict[int, List[Variable]] = defaultdict(list)
+    for v, color in sorted(s2.colors.items(), key=lambda item: item[1]):
+        by_color[color].append(v)
+    for vs in by_color.values():
+        vs.sort()
+    # map variables in the smallest color classes first
+    order = sorted(s1.variables,
+                   key=lambda v: (len(by_color[s1.colors[v]]), s1.colors[v]))
+    empty: Counter = Counter()
+    edges1, edges2 = _edge_table(s1.edges), _edge_table(s2.edges)
+    mapping: Dict[Variable, Variable] = {}
+    used = set()
+
+    def consistent(u: Variable, x: Variable) -> bool:
+        if edges1.get((u, u), empty) != edges2.get((x, x), empty):
+            return False
+        for w, y in mapping.items():
+            if (edges1.get((u, w), empty) != edges2.get((x, y), empty)
+                    or edges1.get((w, u), empty) != edges2.get((y, x), empty)):
+                return False
+        return True
+
+    # depth-first search with an explicit stack of candidate iterators
+    stack: List[Iterator[Variable]] = []
+    depth = 0
+    while depth < len(order):
+        u = order[depth]
+        if len(stack) == depth:
+            stack.append(iter(by_color[s1.colors[u]]))
+        elif u in mapping:
+            used.discard(mapping.pop(u))  # backtrack
+        for x in stack[depth]:
+            if x not in used and consistent(u, x):
+                mapping[u] = x
+                used.add(x)
+                depth += 1
+                break
+        else:
+            stack.pop()
+            depth -= 1
+            if depth < 0:
+                return None
+    return mapping
+
+
+def _edge_table(edges: List[BasicTriple]
+                ) -> Dict[Tuple[Variable, Target], Counter]:
+    """Return the counts of roles between each pair of variables."""
+    table: Dict[Tuple[Variable, Target], Counter] = defaultdict(Counter)
+    for source, role, target in edges:
+        table[(source, target)][role] += 1
+    return table
@@ -50,12 +50,15 @@ following data::
                           ('b', ':ARG0', 'd')]            : POP
 """
 
-from typing import Union, Mapping, Callable, Any, List, Set, cast
-import copy
+from typing import (
+    Union, Mapping, Callable, Any, List, Dict, Set, Tuple, Iterator,
+    cast)
+from collections import (defaultdict, deque)
+import heapq
 import logging
 
 from penman.exceptions import LayoutError
-from penman.types import Variable, BasicTriple
+from penman.types import Variable, Target, BasicTriple
 from penman.epigraph import Epidatum
 from penman.surface import (Alignment, RoleAlignment)
 from penman.tree import (Tree, Node, Branch, is_atomic)
@@ -68,6 +71,14 @@ logger = logging.getLogger(__name__)
 _default_model = Model()
 
 _Nodemap = Mapping[Variable, Union[Node, None]]
+_Sites = Dict[Variable, BasicTriple]
+_Incident = Dict[Variable, List[Tuple[BasicTriple, Variable, bool]]]
+_TripleContexts = Dict[BasicTriple, Union[Variable, None]]
+
+#: A function that takes a graph and its top variable and returns a
+#: mapping of the graph's other variables to the edges where their
+#: nodes are defined; see :func:`configure`.
+LayoutStrategy = Callable[[Graph, Variable], _Sites]
 
 
 # Epigraphical markers
@@ -96,6 +107,10 @@ class _Pop(LayoutMarker):
     def __repr__(self):
         return 'POP'
 
+    def __reduce__(self):
+        # copies and unpickled objects must remain the POP singleton
+        return 'POP'
+
 
 #: Epigraphical marker to indicate the end of a node context.
 POP = _Pop()
@@ -145,52 +160,78 @@ def interpret(t: Tree, model: Model = None) -> Graph:
 
 
 def _interpret_node(t: Node, variables: Set[Variable], model: Model):
-    has_concept = False
-    triples = []
-    epidata = {}
-    var, edges = t
-    for role, target in edges:
-        epis: List[Epidatum] = []
-
-        if role == '/':
-            role = CONCEPT_ROLE
-            has_concept = True
-        elif '~' in role:
-            role, _, alignment = role.partition('~')
-            epis.append(RoleAlignment.from_string(alignment))
-
-        # atomic targets
-        if is_atomic(target):
-            if target and '~' in target:
-                target, _, alignment = target.partition('~')
-                epis.append(Alignment.from_string(alignment))
-            triple = (var, role, target)
-            if model.is_role_inverted(role):
-                if target in variables:
-                    triple = model.invert(triple)
-                else:
-                    logger.warning('cannot deinvert attribute: %r', triple)
-            triples.append(triple)
-            epidata[triple] = epis
-        # nested nodes
+    """
+    Interpret node *t* and its descendants as triples and epidata.
+
+    The nested nodes are visited depth-first with an explicit stack,
+    so the depth of the tree is not limited by the recursion limit.
+    All triples are appended to one list and all epidata are put in
+    one dictionary.
+    """
+    triples: List[BasicTriple] = []
+    epidata: Dict[BasicTriple, List[Epidatum]] = {}
+    # each entry is a node's variable, its remaining branches, and
+    # whether it has a concept
+    stack = [_open_node(t, triples)]
+    while stack:
+        var, branches, has_concept = stack[-1]
+        for role, target in branches:
+            epis: List[Epidatum] = []
+
+            if role == '/':
+                role = CONCEPT_ROLE
+            elif '~' in role:
+                role, _, alignment = role.partition('~')
+                epis.append(RoleAlignment.from_string(alignment))
+
+            # atomic targets
+            if is_atomic(target):
+                if target and '~' in target:
+                    target, _, alignment = target.partition('~')
+                    epis.append(Alignment.from_string(alignment))
+                triple = (var, role, target)
+                if model.is_role_inverted(role):
+                    if target in variables:
+                        triple = model.invert(triple)
+                    else:
+                        logger.warning('cannot deinvert attribute: %r',
+                                       triple)
+                triples.append(triple)
+                epidata[triple] = epis
+            # nested nodes
+            else:
+                triple = model.deinvert((var, role, target[0]))
+                triples.append(triple)
+                epidata[triple] = epis
+
+                # descend to the nested node
+                epidata[triple].append(Push(target[0]))
+                stack.append(_open_node(target, triples))
+                break
         else:
-            triple = model.deinvert((var, role, target[0]))
-            triples.append(triple)
-            epidata[triple] = epis
+            stack.pop()
+            if not has_concept:
+                epidata[(var, CONCEPT_ROLE, None)] = []
+            if stack:
+                epidata[triples[-1]].append(POP)
 
-            # recurse to nested nodes
-            epidata[triple].append(Push(target[0]))
-            _, _triples, _epis = _interpret_node(target, variables, model)
-            triples.extend(_triples)
-            epidata.update(_epis)
-            epidata[triples[-1]].append(POP)
+    return t[0], triples, epidata
 
-    if not has_concept:
-        instance = (var, CONCEPT_ROLE, None)
-        triples.insert(0, instance)
-        epidata[instance] = []
 
-    return var, triples, epidata
+def _open_node(t: Node, triples: List[BasicTriple]):
+    """
+    Start interpreting node *t* and return its entry for the stack.
+
+    If *t* has no concept, an instance triple without a concept is
+    appended to *triples* so it comes before the node's other triples.
+    Its epidata are added when the node is done, after those of the
+    nested nodes.
+    """
+    var, edges = t
+    has_concept = any(role == '/' for role, _ in edges)
+    if not has_concept:
+        triples.append((var, CONCEPT_ROLE, None))
+    return var, iter(edges), has_concept
 
 
 # Graph to tree configuration #################################################
@@ -198,7 +239,9 @@ def _interpret_node(t: Node, variables: Set[Variable], model: Model):
 def configure(g: Graph,
               top: Variable = None,
               model: Model = None,
-              strict: bool = False) -> Tree:
+              strict: bool = False,
+              ignore_markers: bool = False,
+              strategy: LayoutStrategy = None) -> Tree:
     """
     Create a tree from a graph by making as few decisions as possible.
 
@@ -212,6 +255,16 @@ def configure(g: Graph,
     deterministic, but may result in a tree different than the one
     expected.
 
+    If *ignore_markers* is ``True``, the layout markers of *g* are
+    not read, so the tree is the one configured for the graph without
+    them. If a layout *strategy* is given, any layout markers are
+    also ignored and the strategy decides where each node is defined. The edges
+    of each node are otherwise kept in the order of the triples, and
+    an edge is inverted only if it defines the node of its source.
+    This module provides the strategies :func:`first_occurrence`,
+    :func:`least_depth`, and :func:`fewest_inverted`, and other
+    functions with the same signature may be used.
+
     Args:
         g: the :class:`~penman.graph.Graph` to configure
         top: the variable to use as the top of the graph; if ``None``,
@@ -220,6 +273,10 @@ def configure(g: Graph,
             tree
         strict: if ``True``, raise :exc:`~penman.exceptions.LayoutError`
             if decisions must be made about the configuration
+        ignore_markers: if ``True``, configure the tree as if *g* had
+            no layout markers
+        strategy: a :data:`LayoutStrategy` function for deciding
+            where nodes are defined instead of using layout markers
     Returns:
         The configured :class:`Tree`.
     Example:
@@ -239,7 +296,13 @@ def configure(g: Graph,
     """
     if model is None:
         model = _default_model
-    node, data, nodemap = _configure(g, top, model, strict)
+    if strategy is not None:
+        node = _configure_strategy(g, top, model, strategy)
+        tree = Tree(node, metadata=g.metadata)
+        logger.debug('Configured: %s', tree)
+        return tree
+    node, data, nodemap = _configure(
+        g, top, model, strict, improvise=True, ignore_markers=ignore_markers)
     # remove any superfluous POPs at the end (maybe from dereification)
     while data and data[-1] is POP:
         data.pop()
@@ -261,9 +324,14 @@ def configure(g: Graph,
     return tree
 
 
-def _configure(g, top, model, strict):
+def _configure(g, top, model, strict, improvise=False,
+               ignore_markers=False):
     """
     Create the tree that can be created without any improvising.
+
+    If *improvise* is ``True`` and the graph has no layout markers,
+    or if they are ignored with *ignore_markers*, the whole tree is
+    created with :func:`_configure_unmarked` and no data remain.
     """
     if len(g.triples) == 0:
         return (g.top, []), [], {}
@@ -275,26 +343,95 @@ def _configure(g, top, model, strict):
         raise LayoutError(f'top is not a variable: {top!r}')
     nodemap[top] = (top, [])
 
-    data = list(reversed(_preconfigure(g, strict)))
+    data = _preconfigure(g.triples, g.epidata, strict, ignore_markers)
+    if improvise and all(datum is not POP and datum[1] is None
+                         for datum in data):
+        triples = [datum[0] for datum in data]
+        node = _configure_unmarked(triples, top, nodemap, model)
+        return node, [], nodemap
+
+    data.reverse()
     node = _configure_node(top, data, nodemap, model)
 
     return node, data, nodemap
 
 
-def _preconfigure(g, strict):
+def _configure_strategy(g, top, model, strategy):
+    """
+    Create the tree where *strategy* decides the node definitions.
+
+    The triples are arranged with new layout markers in the order
+    they are configured, which then takes a single pass.
+    """
+    if top is None:
+        top = g.top
+    if len(g.triples) == 0:
+        return (top, [])
+    variables = g.variables()
+    if top not in variables:
+        raise LayoutError(f'top is not a variable: {top!r}')
+
+    sites = dict(strategy(g, top))
+    # the branches of each node, with the variable each one pushes
+    owned: Dict[Variable, List[Tuple[BasicTriple, Variable]]] = {}
+    for triple in g.triples:
+        source, role, target = triple
+        owner, pushed = source, None
+        if role != CONCEPT_ROLE:
+            if target in sites and sites[target] == triple:
+                del sites[target]
+                pushed = target
+            elif source in sites and sites[source] == triple:
+                del sites[source]
+                owner, pushed = target, source
+        owned.setdefault(owner, []).append((triple, pushed))
+
+    epidata = g.epidata
+    triples: List[BasicTriple] = []
+    new_epidata: Dict[BasicTriple, List[Epidatum]] = {}
+    placed = {top}
+    stack = [iter(owned.get(top, ()))]
+    while stack:
+        for triple, pushed in stack[-1]:
+            triples.append(triple)
+            epis = [epi for epi in epidata.get(triple, ())
+                    if not isinstance(epi, LayoutMarker)]
+            new_epidata[triple] = epis
+            if pushed is not None:
+                epis.append(Push(pushed))
+                placed.add(pushed)
+                stack.append(iter(owned.get(pushed, ())))
+                break
+        else:
+            stack.pop()
+            if stack:
+                new_epidata[triples[-1]].append(POP)
+    if len(placed) < len(variables):
+        raise LayoutError('possibly disconnected graph')
+
+    data = _preconfigure(triples, new_epidata, False)
+    data.reverse()
+    nodemap: _Nodemap = {var: None for var in variables}
+    nodemap[top] = (top, [])
+    return _configure_node(top, data, nodemap, model)
+
+
+def _preconfigure(triples, epidata, strict, ignore_markers=False):
     """
     Arrange the triples and epidata for ordered traversal.
 
-    Also perform some basic validation.
+    Layout markers are skipped if *ignore_markers* is ``True``. Also
+    perform some basic validation.
     """
     data = []
-    epidata = g.epidata
     pushed = set()
-    for triple in g.triples:
+    for triple in triples:
         var, role, target = triple
         push, pops = None, []
         for epi in epidata.get(triple, []):
-            if isinstance(epi, Push):
+            if ignore_markers and isinstance(epi, LayoutMarker):
+                continue
+            elif isinstance(epi, Push):
                 if push is not None or epi.variable in pushed:
                     if strict:
                         raise LayoutError(
@@ -331,47 +468,202 @@ def _configure_node(var, data, nodemap, model):
     """
     Configure a node and any descendants.
 
+    Nested nodes are configured depth-first with an explicit stack,
+    so the depth of the tree is not limited by the recursion limit.
+
     Side-effects:
       * *data* is modified
       * *nodemap* is modified
     """
     node = nodemap[var]
-    edges = node[1]
-
-    while data:
-        datum = data.pop()
-        if datum is POP:
-            break
-
-        triple, push = datum
-        if triple[0] == var:
-            source, role, target = triple
-        elif triple[2] == var:
-            source, role, target = model.invert(triple)
-        else:
-            # misplaced triple
-            data.append(datum)
-            break
-
-        if role == CONCEPT_ROLE:
-            if not target:
-                continue  # prefer (a) over (a /) when concept is missing
-            role = '/'
-            index = 0
+    # each entry is a node's variable, the node, and the index and
+    # role of the branch for the nested node being configured
+    stack: List[Tuple[Variable, Node, int, str]] = []
+
+    while True:
+        edges = node[1]
+        nested = None
+
+        while data:
+            datum = data.pop()
+            if datum is POP:
+                break
+
+            triple, push = datum
+            if triple[0] == var:
+                source, role, target = triple
+            elif triple[2] == var:
+                source, role, target = model.invert(triple)
+            else:
+                # misplaced triple
+                data.append(datum)
+                break
+
+            if role == CONCEPT_ROLE:
+                if not target:
+                    continue  # prefer (a) over (a /) when concept is missing
+                role = '/'
+                index = 0
+            else:
+                index = len(edges)
+
+            if push and push.variable == target:
+                nested = nodemap[target] = (target, [])
+                break
+            elif target in nodemap and nodemap[target] is None:
+                # site of potential node context
+                nodemap[target] = node
+
+            edges.insert(index, (role, target))
+
+        if nested is not None:
+            stack.append((var, node, index, role))
+            var, node = nested[0], nested
+        elif stack:
+            # the node is done; add it to the node it is nested in
+            done = node
+            var, node, index, role = stack.pop()
+            node[1].insert(index, (role, done))
         else:
-            index = len(edges)
+            return node
 
-        if push and push.variable == target:
-            nodemap[push.variable] = (push.variable, [])
-            target = _configure_node(
-                push.variable, data, nodemap, model)
-        elif target in nodemap and nodemap[target] is None:
-            # site of potential node context
-            nodemap[target] = node
 
-        edges.insert(index, (role, target))
+def _configure_unmarked(triples, top, nodemap, model):
+    """
+    Configure the tree of *triples*, which have no layout markers.
+
+    The result is the same as that of :func:`_configure_node` and
+    the loop over :func:`_find_next` in :func:`configure`. That loop
+    rescans the remaining triples for the next one with a node
+    context and moves the triples it skips to the end, so the search
+    goes around the remaining triples from a cursor and a node takes
+    consecutive triples until the one it started from. Here the
+    remaining triples are a circular linked list, and when the triple
+    at the cursor has no node context, two heaps give the positions
+    of those that do after and before the cursor, so each triple is
+    visited a constant number of times and each search takes
+    logarithmic time. The branches to each variable in the node that
+    holds its context are remembered, so establishing the context
+    does not scan the node's branches.
 
-    return node
+    Side-effects:
+      * *nodemap* is modified
+    """
+    n = len(triples)
+    following = list(range(1, n + 1))
+    following[-1] = 0
+    preceding = list(range(-1, n - 1))
+    preceding[0] = n - 1
+    pending = [True] * n
+    remaining = n
+    # the variable whose node holds the node context of each variable
+    site: Dict[Variable, Variable] = {top: top}
+    nodes: Dict[Variable, Node] = {top: (top, [])}
+    # concepts are inserted before the other branches at the end
+    concepts: Dict[Variable, List[Branch]] = {top: []}
+    # the branch lists and indices of the branches to each variable
+    # in the node that holds its context, until it is established
+    references: Dict[Variable, List[Tuple[List[Branch], int]]] = {}
+    # the positions of the triples with each variable, built when
+    # first needed, and variables given a site since the heaps of
+    # positions after and before the cursor were last updated
+    positions: Dict[Variable, List[int]] = {}
+    new_sites: List[Variable] = []
+    after: List[int] = []
+    before: List[int] = []
+    invert = model.invert
+
+    i = stop = cursor = 0
+    var = top
+    while True:
+        # consume triples from i until one is misplaced or *stop*
+        start = i
+        edges = nodes[var][1]
+        var_concepts = concepts[var]
+        while True:
+            triple = triples[i]
+            if triple[0] == var:
+                role, target = triple[1], triple[2]
+            elif triple[2] == var:
+                _, role, target = invert(triple)
+            else:
+                break  # misplaced triple
+            pending[i] = False
+            remaining -= 1
+            following[preceding[i]] = following[i]
+            preceding[following[i]] = preceding[i]
+
+            if role != CONCEPT_ROLE:
+                branches = edges
+                branches.append((role, target))
+            elif target:  # prefer (a) over (a /) when concept is missing
+                branches = var_concepts
+                branches.append(('/', target))
+            else:
+                branches = None
+            if branches is not None and target in nodemap:
+                if target not in site:
+                    # site of potential node context
+                    site[target] = var
+                    references[target] = []
+                    new_sites.append(target)
+                if site[target] == var and target != var:
+                    references[target].append((branches,
+                                               len(branches) - 1))
+
+            i = following[i]
+            if remaining == 0 or i == stop:
+                break
+        if remaining == 0:
+            break
+        if i < start and start >= stop:
+            after, before = before, []  # consuming went around
+        cursor = i
+
+        # find the next triple with a node context
+        source, _, target = triples[cursor]
+        if source in site or target in site:
+            i = cursor  # usually the next triple has a node context
+        else:
+            if not positions:
+                positions.update((v, []) for v in nodemap)
+                for j, (src, _, tgt) in enumerate(triples):
+                    positions[src].append(j)
+                    if tgt in positions and tgt != src:
+                        positions[tgt].append(j)
+                new_sites[:] = site
+            for v in new_sites:
+                for j in positions[v]:
+                    if pending[j]:
+                        heapq.heappush(after if j >= cursor else before, j)
+            new_sites.clear()
+            while after and not pending[after[0]]:
+                heapq.heappop(after)
+            if not after:
+                after, before = before, after  # go around to the start
+                while after and not pending[after[0]]:
+                    heapq.heappop(after)
+                if not after:
+                    raise LayoutError('possibly disconnected graph')
+            i = heapq.heappop(after)
+            source, _, target = triples[i]
+
+        # establish the node context
+        var = source if source in site else target
+        if site[var] != var:
+            node = nodes[var] = (var, [])
+            concepts[var] = []
+            for branches, index in references.pop(var):
+                branches[index] = (branches[index][0], node)
+            site[var] = var
+        stop = cursor
+
+    for var, (_, edges) in nodes.items():
+        if concepts[var]:
+            edges[:0] = reversed(concepts[var])
+    for var in nodemap:
+        nodemap[var] = nodes.get(var)
+    return nodes[top]
 
 
 def _find_next(data, nodemap):
@@ -423,13 +715,333 @@ def reconfigure(g: Graph,
                 model: Model = None,
                 strict: bool = False) -> Tree:
     """
-    Create a tree from a graph after any discarding layout markers.
+    Create a tree from a graph after discarding any layout markers.
+
+    This is the same as :func:`configure` with *ignore_markers* set
+    to ``True``; the graph is not copied or modified.
+    """
+    return configure(g, top=top, model=model, strict=strict,
+                     ignore_markers=True)
+
+
+def canonicalize(g: Graph,
+                 top: Variable = None,
+                 model: Model = None) -> Tree:
+    """
+    Create the canonical tree for the triples and top of graph *g*.
+
+    Unlike :func:`configure`, the order of the triples and any
+    epigraphical data are ignored, so graphs that are equal (see
+    :class:`~penman.graph.Graph`) always have the same canonical
+    tree. The tree is built by a depth-first traversal from the top
+    that visits the relations of each node in the order of
+    :meth:`~penman.model.Model.canonical_order`, breaking ties by the
+    targets, and defines each node where it is first reached. The
+    variables are then reset with :meth:`Tree.reset_variables`. The
+    tree's metadata is empty.
+
+    Args:
+        g: the :class:`~penman.graph.Graph` to canonicalize
+        top: the variable to use as the top of the graph; if
+            ``None``, the top of *g* will be used
+        model: the :class:`~penman.model.Model` used to invert
+            relations and order them
+    Returns:
+        The canonical :class:`Tree`.
+    Example:
+        >>> from penman.codec import PENMANCodec
+        >>> from penman.graph import Graph
+        >>> from penman import layout
+        >>> codec = PENMANCodec()
+        >>> g1 = codec.decode('(x / see-01 :ARG1 (y / cat) :ARG0 (z / dog))')
+        >>> g2 = Graph(list(reversed(g1.triples)), top='x')
+        >>> print(codec.format(layout.canonicalize(g1)))
+        (s / see-01
+           :ARG0 (d / dog)
+           :ARG1 (c / cat))
+        >>> layout.canonicalize(g1) == layout.canonicalize(g2)
+        True
+    """
+    if model is None:
+        model = _default_model
+    if top is None:
+        top = g.top
+    if len(g.triples) == 0:
+        empty: Any = (top, [])  # top may be None, as in the tree of ()
+        return Tree(empty)
+    variables = g.variables()
+    if top not in variables:
+        raise LayoutError(f'top is not a variable: {top!r}')
+
+    concepts: Dict[Variable, List[Target]] = defaultdict(list)
+    relations: Dict[Variable, List[Tuple[Branch, int]]] = defaultdict(list)
+    count = 0
+    for triple in g.triples:
+        source, role, target = triple
+        if role == CONCEPT_ROLE:
+            if target:  # prefer (a) over (a /) when concept is missing
+                concepts[source].append(target)
+            continue
+        relations[source].append(((role, target), count))
+        if target in variables and target != source:
+            _, inv_role, inv_target = model.invert(triple)
+            relations[target].append(((inv_role, inv_target), count))
+        count += 1
+    for var in concepts:
+        concepts[var].sort(key=_constant_key)
+
+    # the canonical order only depends on the role, so compute it once
+    orders: Dict[str, Any] = {}
+
+    def key(relation: Tuple[Branch, int]) -> Any:
+        branch = relation[0]
+        role, target = branch
+        order = orders.get(role)
+        if order is None:
+            order = orders[role] = model.canonical_order(branch)
+        # order variables by concept before their arbitrary names
+        label = concepts[target][0] if concepts.get(target) else target
+        return (order, _constant_key(label), _constant_key(target))
+
+    def new_node(var: Variable) -> Tuple[Node, Iterator]:
+        edges: List[Branch] = [('/', c) for c in concepts.get(var, ())]
+        return (var, edges), iter(sorted(relations.get(var, ()), key=key))
+
+    node, rels = new_node(top)
+    stack = [(node, rels)]
+    placed = {top}
+    done: Set[int] = set()
+    while stack:
+        current, rels = stack[-1]
+        for (role, target), i in rels:
+            if i in done:
+                continue
+            done.add(i)
+            if target in variables and target not in placed:
+                placed.add(target)
+                child, child_rels = new_node(target)
+                current[1].append((role, child))
+                stack.append((child, child_rels))
+                break
+            current[1].append((role, target))
+        else:
+            stack.pop()
+    if len(done) < count or len(placed) < len(variables):
+        raise LayoutError('possibly disconnected graph')
+
+    tree = Tree(node)
+    tree.reset_variables()
+    return tree
+
+
+def _constant_key(value: Target) -> Tuple[str, str]:
+    return (type(value).__name__, str(value))
+
+
+# Layout strategies ###########################################################
+
+def first_occurrence(g: Graph, top: Variable) -> _Sites:
+    """
+    Define each node of *g* where it first occurs in the tree.
+
+    This :data:`LayoutStrategy` traverses the graph depth-first from
+    *top*, following the edges of each node in the order of the
+    triples in either direction, and defines each node at the edge
+    that first reaches it. Unlike :func:`configure` without a
+    strategy, layout markers such as those from a previous
+    serialization are ignored.
+
+    Args:
+        g: the :class:`~penman.graph.Graph` to lay out
+        top: the variable at the top of the tree
+    Returns:
+        A mapping of the variables of *g*, except *top*, to the
+        edges where their nodes are defined.
+    Example:
+        >>> from penman.codec import PENMANCodec
+        >>> from penman import layout
+        >>> codec = PENMANCodec()
+        >>> g = codec.decode('''
+        ...   (b / bark-01 :ARG0 d
+        ...      :ARG1-of (t / try-01 :ARG0 (d / dog)))''')
+        >>> t = layout.configure(g, strategy=layout.first_occurrence)
+        >>> print(codec.format(t))
+        (b / bark-01
+           :ARG0 (d / dog
+                    :ARG0-of (t / try-01
+                                :ARG1 b)))
+    """
+    incident = _incident(g)
+    sites: _Sites = {}
+    placed = {top}
+    stack = [iter(incident.get(top, ()))]
+    while stack:
+        for edge, other, _ in stack[-1]:
+            if other not in placed:
+                placed.add(other)
+                sites[other] = edge
+                stack.append(iter(incident.get(other, ())))
+                break
+        else:
+            stack.pop()
+    return sites
+
+
+def least_depth(g: Graph, top: Variable) -> _Sites:
+    """
+    Define each node of *g* as close to *top* as possible.
+
+    This :data:`LayoutStrategy` traverses the graph breadth-first
+    from *top* and defines each node at one of the edges that reach
+    it with the fewest edges from the top, so every node, and thus
+    the tree, has the least possible depth. Among such edges, those
+    that need not be inverted are preferred, and then those that
+    come first in the order of the triples.
+
+    Args:
+        g: the :class:`~penman.graph.Graph` to lay out
+        top: the variable at the top of the tree
+    Returns:
+        A mapping of the variables of *g*, except *top*, to the
+        edges where their nodes are defined.
+    Example:
+        >>> from penman.codec import PENMANCodec
+        >>> from penman import layout
+        >>> codec = PENMANCodec()
+        >>> g = codec.decode('''
+        ...   (a / alpha
+        ...      :ARG0 (b / beta
+        ...               :ARG0 (g / gamma))
+        ...      :ARG1 g)''')
+        >>> t = layout.configure(g, strategy=layout.least_depth)
+        >>> print(codec.format(t))
+        (a / alpha
+           :ARG0 (b / beta
+                    :ARG0 g)
+           :ARG1 (g / gamma))
+    """
+    incident = _incident(g)
+    sites: _Sites = {}
+    placed = {top}
+    frontier = [top]
+    while frontier:
+        next_frontier = []
+        for forward in (True, False):
+            for var in frontier:
+                for edge, other, is_forward in incident.get(var, ()):
+                    if is_forward is forward and other not in placed:
+                        placed.add(other)
+                        sites[other] = edge
+                        next_frontier.append(other)
+        frontier = next_frontier
+    return sites
+
+
+def fewest_inverted(g: Graph, top: Variable) -> _Sites:
+    """
+    Define the nodes of *g* so that few edges are inverted.
+
+    This :data:`LayoutStrategy` traverses the graph breadth-first
+    from *top* and follows edges in their normal direction whenever
+    possible. Only when no other node can be reached is an edge
+    inverted. It then reaches the node with the fewest edges from a
+    node that is not the target of any edge, as such nodes must be
+    reached by an inverted edge anyway, and the nodes below them can
+    then be reached without one. The number of inverted edges is
+    not always the least possible, but it is rarely more.
+
+    Args:
+        g: the :class:`~penman.graph.Graph` to lay out
+        top: the variable at the top of the tree
+    Returns:
+        A mapping of the variables of *g*, except *top*, to the
+        edges where their nodes are defined.
+    Example:
+        >>> from penman.codec import PENMANCodec
+        >>> from penman import layout
+        >>> codec = PENMANCodec()
+        >>> g = codec.decode('''
+        ...   (d / dog
+        ...      :ARG0-of (b / bark-01)
+        ...      :ARG0-of (t / try-01
+        ...                  :ARG1 b))''')
+        >>> t = layout.configure(g, strategy=layout.fewest_inverted)
+        >>> print(codec.format(t))
+        (d / dog
+           :ARG0-of (t / try-01
+                       :ARG1 (b / bark-01
+                                :ARG0 d)))
+        >>> t = layout.configure(g, top='t',
+        ...                      strategy=layout.fewest_inverted)
+        >>> print(codec.format(t))
+        (t / try-01
+           :ARG0 (d / dog)
+           :ARG1 (b / bark-01
+                    :ARG0 d))
+    """
+    incident = _incident(g)
+    # the number of edges from the nearest node that is not a target
+    targets = {target for source, role, target in g.edges()
+               if role != CONCEPT_ROLE and source != target}
+    distances = {var: 0 for var in incident if var not in targets}
+    queue = deque(distances)
+    while queue:
+        var = queue.popleft()
+        for _, other, forward in incident[var]:
+            if forward and other not in distances:
+                distances[other] = distances[var] + 1
+                queue.append(other)
+
+    sites: _Sites = {}
+    candidates: _Sites = {}
+    heap: List[Tuple[int, int, Variable]] = []
+    placed = {top}
+    queue.append(top)
+    while True:
+        while queue:
+            var = queue.popleft()
+            for edge, other, forward in incident.get(var, ()):
+                if other in placed:
+                    continue
+                elif forward:
+                    placed.add(other)
+                    sites[other] = edge
+                    queue.append(other)
+                elif other not in candidates:
+                    candidates[other] = edge
+                    # nodes reachable only from cycles have no distance
+                    distance = distances.get(other, 0)
+                    heapq.heappush(heap, (distance, len(candidates), other))
+        # no more nodes can be reached without inverting an edge
+        while heap and heap[0][2] in placed:
+            heapq.heappop(heap)
+        if not heap:
+            break
+        var = heapq.heappop(heap)[2]
+        placed.add(var)
+        sites[var] = candidates[var]
+        queue.append(var)
+    return sites
+
+
+def _incident(g: Graph) -> _Incident:
+    """
+    Return the edges of each variable in *g* in the order of triples.
+
+    Each edge is paired with the variable at its other end and
+    whether the variable is the edge's source.
     """
-    p = copy.deepcopy(g)
-    for epilist in p.epidata.values():
-        epilist[:] = [epi for epi in epilist
-                      if not isinstance(epi, LayoutMarker)]
-    return configure(p, top=top, model=model, strict=strict)
+    incident: _Incident = {}
+    for edge in g.edges():
+        source, role, target = edge
+        # concepts that are also variables, as in (b / a :ARG0 (a / x))
+        if role == CONCEPT_ROLE:
+            continue
+        target = cast(Variable, target)
+        incident.setdefault(source, []).append((edge, target, True))
+        if target != source:
+            incident.setdefault(target, []).append((edge, source, False))
+    return incident
 
 
 def rearrange(t: Tree,
@@ -488,7 +1100,7 @@ def has_valid_layout(g: Graph,
     """
     if model is None:
         model = _default_model
-    tree, data, nodemap, variables = _configure(g, top, model, strict)
+    tree, data, nodemap = _configure(g, top, model, strict)
     return len(data) == 0
 
 
@@ -505,10 +1117,7 @@ def get_pushed_variable(g: Graph,
         >>> get_pushed_variable(g, ('a', ':ARG0', 'b'))
         'b'
     """
-    for epi in g.epidata[triple]:
-        if isinstance(epi, Push):
-            return epi.variable
-    return None
+    return LayoutAnalysis(g).get_pushed_variable(triple)
 
 
 def appears_inverted(g: Graph, triple: BasicTriple) -> bool:
@@ -531,24 +1140,7 @@ def appears_inverted(g: Graph, triple: BasicTriple) -> bool:
     Returns:
         ``True`` if *triple* appears inverted in graph *g*.
     """
-    variables = g.variables()
-    if triple[1] == CONCEPT_ROLE or triple[2] not in variables:
-        # attributes and instance triples should never be inverted
-        return False
-    else:
-        # edges may appear inverted...
-        variable = get_pushed_variable(g, triple)
-        if variable is not None:
-            # ... when their source is pushed
-            return variable == triple[0]
-        else:
-            # ... or when their target is the current node context
-            for variable, _triple in zip(node_contexts(g), g.triples):
-                if variable is None:
-                    break  # we can no longer guess the node context
-                elif _triple == triple:
-                    return triple[2] == variable
-    return False
+    return LayoutAnalysis(g).appears_inverted(triple)
 
 
 def node_contexts(g: Graph) -> List[Union[Variable, None]]:
@@ -564,7 +1156,7 @@ def node_contexts(g: Graph) -> List[Union[Variable, None]]:
         ...      :attr val
         ...      :ARG0 (b / beta :ARG0 (g / gamma))
         ...      :ARG0-of g)''')
-        >>> for ctx, trp in zip(layout.node_contexts(g), trp):
+        >>> for ctx, trp in zip(layout.node_contexts(g), g.triples):
         ...     print(ctx, ':', trp)
         ...
         a : ('a', ':instance', 'alpha')
@@ -575,27 +1167,112 @@ def node_contexts(g: Graph) -> List[Union[Variable, None]]:
         g : ('g', ':instance', 'gamma')
         a : ('g', ':ARG0', 'a')
     """
-    variables = g.variables()
-    stack = [g.top]
-    contexts: List[Union[Variable, None]] = [None] * len(g.triples)
-    for i, triple in enumerate(g.triples):
-        eligible: List[Variable] = [triple[0]]
-        if triple[1] != CONCEPT_ROLE and triple[2] in variables:
-            eligible.append(cast(Variable, triple[2]))
-
-        if stack[-1] not in eligible:
-            break
-        else:
-            contexts[i] = stack[-1]
-
-        pushed = get_pushed_variable(g, triple)
-        if pushed:
-            stack.append(pushed)
-
-        try:
-            for epi in g.epidata[triple]:
-                if epi is POP:
-                    stack.pop()
-        except IndexError:
-            break  # more POPs than contexts in stack
-    return contexts
+    return LayoutAnalysis(g).node_contexts()
+
+
+class LayoutAnalysis(object):
+    """
+    Layout information of a graph, computed once for many queries.
+
+    The functions :func:`appears_inverted` and :func:`node_contexts`
+    walk the triples of a graph each time they are called, so calling
+    them for every triple takes quadratic time. This class walks the
+    triples of graph *g* once, when the node contexts are first
+    needed, so each query takes constant time. The graph should not be
+    modified while the analysis is in use.
+
+    Args:
+        g: a :class:`~penman.graph.Graph`
+    Example:
+        >>> from penman import decode
+        >>> from penman.layout import LayoutAnalysis
+        >>> g = decode('(a / alpha :ARG0 (b / beta) :ARG1-of (g / gamma))')
+        >>> analysis = LayoutAnalysis(g)
+        >>> analysis.get_pushed_variable(('g', ':ARG1', 'a'))
+        'g'
+        >>> analysis.appears_inverted(('g', ':ARG1', 'a'))
+        True
+    """
+
+    __slots__ = '_graph', '_contexts', '_triple_contexts'
+
+    def __init__(self, g: Graph):
+        self._graph = g
+        self._contexts: List[Union[Variable, None]] = []
+        self._triple_contexts: Union[_TripleContexts, None] = None
+
+    def get_pushed_variable(self,
+                            triple: BasicTriple) -> Union[Variable, None]:
+        """
+        Return the variable pushed by *triple*, if any, otherwise ``None``.
+
+        See :func:`get_pushed_variable`.
+        """
+        for epi in self._graph.epidata.get(triple, ()):
+            if isinstance(epi, Push):
+                return epi.variable
+        return None
+
+    def appears_inverted(self, triple: BasicTriple) -> bool:
+        """
+        Return ``True`` if *triple* appears inverted in serialization.
+
+        See :func:`appears_inverted`.
+        """
+        g = self._graph
+        if triple[1] == CONCEPT_ROLE or not g._is_variable(triple[2]):
+            # attributes and instance triples should never be inverted
+            return False
+        variable = self.get_pushed_variable(triple)
+        if variable is not None:
+            # edges may appear inverted when their source is pushed...
+            return variable == triple[0]
+        # ... or when their target is the current node context
+        triple_contexts = self._triple_contexts
+        if triple_contexts is None:
+            triple_contexts = self._analyze()
+        return triple_contexts.get(triple) == triple[2]
+
+    def node_contexts(self) -> List[Union[Variable, None]]:
+        """
+        Return the list of node contexts corresponding to triples.
+
+        See :func:`node_contexts`.
+        """
+        if self._triple_contexts is None:
+            self._analyze()
+        return list(self._contexts)
+
+    def _analyze(self) -> _TripleContexts:
+        g = self._graph
+        variables = g.variables()
+        epidata = g.epidata
+        triples = g.triples
+        stack = [g.top]
+        contexts: List[Union[Variable, None]] = [None] * len(triples)
+        triple_contexts: _TripleContexts = {}
+        for i, triple in enumerate(triples):
+            context = stack[-1]
+            if not (context == triple[0]
+                    or (context == triple[2]
+                        and triple[1] != CONCEPT_ROLE
+                        and triple[2] in variables)):
+                break
+            contexts[i] = context
+            if triple not in triple_contexts:
+                triple_contexts[triple] = context
+
+            pushed = self.get_pushed_variable(triple)
+            if pushed:
+                stack.append(pushed)
+
+            try:
+                for epi in epidata.get(triple, ()):
+                    if epi is POP:
+                        stack.pop()
+            except IndexError:
+                break  # more POPs than contexts in stack
+
+        self._contexts = contexts
+        self._triple_contexts = triple_contexts
+        return triple_contexts
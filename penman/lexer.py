@@ -4,7 +4,13 @@
 Classes and functions for lexing PENMAN strings.
 """
 
-from typing import Union, Iterable, Iterator, NamedTuple, Pattern
+from typing import (
+    Any, Union, Optional, Iterable, Iterator, NamedTuple, Pattern, Match,
+    Tuple)
+from array import array
+from bisect import bisect_right
+from itertools import chain
+from mmap import mmap
 import re
 import logging
 
@@ -13,13 +19,19 @@ from penman.exceptions import DecodeError
 
 logger = logging.getLogger(__name__)
 
+# MULTILINE is needed so COMMENT stops at the end of each line when a
+# whole buffer is lexed at once.
+_FLAGS = re.VERBOSE | re.MULTILINE
+
 
 # These are the regex patterns for parsing. They must not have any
 # capturing groups. They are used during lexing and will be
 # checked by name during parsing.
 PATTERNS = {
     'COMMENT':    r'\#.*$',
-    'STRING':     r'"[^"\\]*(?:\\.[^"\\]*)*"',
+    # STRING cannot span lines so that lexing a whole buffer at once
+    # gives the same tokens as lexing it line by line
+    'STRING':     r'"[^"\\\n]*(?:\\.[^"\\\n]*)*"',
     # ROLE cannot be made up of COLON + SYMBOL because it then becomes
     # difficult to detect anonymous roles: (a : b) vs (a :b c)
     'ROLE':       r':[^\s()\/:]*',
@@ -33,7 +45,7 @@ PATTERNS = {
 
 def _compile(*names: str) -> Pattern[str]:
     pat = '\n|'.join(f'(?P<{name}>{PATTERNS[name]})' for name in names)
-    return re.compile(pat, flags=re.VERBOSE)
+    return re.compile(pat, flags=_FLAGS)
 
 
 # The order matters in these pattern lists as more permissive patterns
@@ -49,6 +61,41 @@ TRIPLE_RE = _compile('COMMENT',
                      'SYMBOL',
                      'UNEXPECTED')
 
+# GRAPH_RE finds the parentheses, comments, and strings that determine
+# the extent of graphs and skips everything else. Each match is any
+# number of skipped tokens followed by one of the named tokens, a
+# SYMBOL starting with an unterminated quote, or the end of the input.
+# The skipped tokens are whitespace, SLASH, ROLE, and SYMBOL tokens
+# that do not start with " or #; the lookaheads make each skipped
+# token maximal (as in the lexer) so there is no backtracking.
+_SKIP = r'''(?:[^\s()\/:"\#][^\s()\/:]*(?![^\s()\/:])
+              |:[^\s()\/:]*(?![^\s()\/:])
+              |\/
+              |\s+(?!\s))*'''
+_GRAPH_PATTERN = (
+    f'{_SKIP}'
+    f'(?:(?P<COMMENT>{PATTERNS["COMMENT"]})'
+    f'|(?P<STRING>{PATTERNS["STRING"]})'
+    f'|(?P<LPAREN>{PATTERNS["LPAREN"]})'
+    f'|(?P<RPAREN>{PATTERNS["RPAREN"]})'
+    f'|"[^\\s()\\/:]*'
+    f'|\\Z)'
+)
+GRAPH_RE = re.compile(_GRAPH_PATTERN, flags=_FLAGS)
+_GRAPH_BYTES_RE = re.compile(_GRAPH_PATTERN.encode('utf-8'), flags=_FLAGS)
+
+# the inputs of scan_graphs(): strings and bytes-like objects
+_Data = Union[str, bytes, mmap]
+
+
+class GraphSpan(NamedTuple):
+    """
+    The location of a top-level graph in a PENMAN string.
+    """
+    start: int  #: The offset of the graph's leading comments, if any.
+    body: int   #: The offset of the graph's opening parenthesis.
+    end: int    #: The offset after the graph's closing parenthesis.
+
 
 class Token(NamedTuple):
     """
@@ -157,6 +204,170 @@ class TokenIterator(Iterator[Token]):
         return DecodeError(message, lineno=lineno, offset=offset, text=line)
 
 
+class TokenStream(object):
+    """
+    A compact stream of tokens with L1 lookahead.
+
+    Unlike :class:`TokenIterator`, this stream does not create a
+    :class:`Token` for each match. Tokens are identified by integer
+    type codes, which are the indices of the named groups in
+    *pattern*, and consumed tokens are returned as :class:`re.Match`
+    objects, so the text of a token is only turned into a string when
+    :meth:`re.Match.group` is called. Line numbers and lines are only
+    computed when an error or warning needs them.
+
+    If *lines* is a string, it is lexed as a single buffer with the
+    same line boundaries as :meth:`str.splitlines`; otherwise each
+    line is lexed separately.
+
+    Args:
+        lines: a string or an iterable of lines to lex
+        pattern: the compiled pattern to use for lexing
+    Example:
+        >>> from penman.lexer import TokenStream, PENMAN_RE
+        >>> LPAREN = PENMAN_RE.groupindex['LPAREN']
+        >>> tokens = TokenStream('(a / alpha)', PENMAN_RE)
+        >>> tokens.type == LPAREN
+        True
+        >>> tokens.advance().group()
+        '('
+    """
+
+    __slots__ = ('type', '_names', '_matches', '_next', '_last',
+                 '_count', '_next_lineno', '_last_lineno', '_starts')
+
+    def __init__(self,
+                 lines: Union[Iterable[str], str],
+                 pattern: Pattern[str] = PENMAN_RE):
+        #: The type code of the next token, or ``0`` if exhausted.
+        self.type = 0
+        self._names = {i: name for name, i in pattern.groupindex.items()}
+        self._count = 0  # lines read; stays 0 for buffers
+        if isinstance(lines, str):
+            lines = _normalize_line_breaks(lines)
+            self._matches = pattern.finditer(lines)
+        else:
+            self._matches = chain.from_iterable(
+                map(pattern.finditer, self._count_lines(lines)))
+        self._next: Optional[Match[str]] = None
+        self._last: Optional[Match[str]] = None
+        self._next_lineno = self._last_lineno = 0
+        self._starts: Optional[array] = None
+        self._pull()
+
+    def __bool__(self):
+        return self._next is not None
+
+    def _count_lines(self, lines: Iterable[str]) -> Iterator[str]:
+        for line in lines:
+            self._count += 1
+            yield line
+
+    def _pull(self) -> None:
+        m = self._next = next(self._matches, None)
+        if m is None:
+            self.type = 0
+        else:
+            self.type = m.lastindex or 0
+            self._next_lineno = self._count
+
+    def advance(self) -> Match[str]:
+        """
+        Advance the stream and return the match for the next token.
+
+        Raises:
+            ~penman.exceptions.DecodeError
+                If the stream is already exhausted.
+        """
+        m = self._next
+        if m is None:
+            raise self.error('Unexpected end of input')
+        self._last = m
+        self._last_lineno = self._next_lineno
+        self._pull()
+        return m
+
+    def expect(self, *choices: int) -> Match[str]:
+        """
+        Return the match for the next token if its type is in *choices*.
+
+        The stream is advanced if successful.
+
+        Raises:
+            ~penman.exceptions.DecodeError
+                If the next token type is not in *choices*.
+        """
+        if self.type not in choices:
+            if self._next is None:
+                raise self.error('Unexpected end of input')
+            raise self.error(
+                'Expected: {}'.format(
+                    ', '.join(self._names[c] for c in choices)),
+                token=self._next)
+        return self.advance()
+
+    def locate(self, token: Match[str]) -> Tuple[int, int, str]:
+        """
+        Return the line number, offset, and line of *token*.
+
+        The *token* must be a match from this stream.
+        """
+        if token is self._next:
+            lineno = self._next_lineno
+        elif token is self._last:
+            lineno = self._last_lineno
+        else:
+            lineno = self._count
+        s = token.string
+        pos = token.start()
+        if lineno == 0:  # buffer: find the line in the buffer
+            if self._starts is None:
+                self._starts = _line_starts(s)
+            lineno = bisect_right(self._starts, pos)
+            start = self._starts[lineno - 1]
+            end = s.find('\n', start)
+            line = s[start:] if end == -1 else s[start:end]
+            return lineno, pos - start, line
+        else:  # single line
+            return lineno, pos, s.rstrip('\r\n')
+
+    def error(self, message: str, token: Match[str] = None) -> DecodeError:
+        """
+        Return a :exc:`~penman.exceptions.DecodeError` for *token*.
+
+        If *token* is not given, the error is located at the end of
+        the last consumed token.
+        """
+        if token is None:
+            if self._last is not None:
+                lineno, offset, line = self.locate(self._last)
+                offset += len(self._last.group())
+            else:
+                lineno, offset, line = 0, 0, None
+        else:
+            lineno, offset, line = self.locate(token)
+        return DecodeError(message, lineno=lineno, offset=offset, text=line)
+
+
+def _line_starts(s: str) -> array:
+    """Return the offsets of the start of each line in *s*."""
+    starts = array('q', [0])
+    i = s.find('\n')
+    while i != -1:
+        starts.append(i + 1)
+        i = s.find('\n', i + 1)
+    return starts
+
+
+# the line boundaries of str.splitlines() other than \n
+_LINE_BREAK_RE = re.compile('\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
+def _normalize_line_breaks(s: str) -> str:
+    """Return *s* with each line boundary replaced by ``\\n``."""
+    return _LINE_BREAK_RE.sub('\n', s)
+
+
 def lex(lines: Union[Iterable[str], str],
         pattern: Union[Pattern[str], str] = None) -> TokenIterator:
     """
@@ -166,23 +377,30 @@ def lex(lines: Union[Iterable[str], str],
     for PENMAN graphs. If *pattern* is given, it is used for lexing
     instead.
 
+    If *lines* is a single string, it is lexed as one buffer in a
+    single pass instead of being split into a list of lines first;
+    the :attr:`Token.line` string is only sliced out of the buffer
+    for lines that contain tokens. The buffer has the same line
+    boundaries as :meth:`str.splitlines`.
+
     Args:
-        lines: iterable of lines to lex
+        lines: a string or an iterable of lines to lex
         pattern: pattern to use for lexing instead of the default ones
     Returns:
         A :class:`TokenIterator` object
     """
-    if isinstance(lines, str):
-        lines = lines.splitlines()
     if pattern is not None:
         if isinstance(pattern, str):
-            regex = re.compile(pattern, flags=re.VERBOSE)
+            regex = re.compile(pattern, flags=_FLAGS)
         else:
             regex = pattern
     else:
         regex = PENMAN_RE
 
-    tokens = _lex(lines, regex)
+    if isinstance(lines, str):
+        tokens = _lex_buffer(_normalize_line_breaks(lines), regex)
+    else:
+        tokens = _lex(lines, regex)
     return TokenIterator(tokens)
 
 
@@ -203,3 +421,158 @@ def _lex(lines: Iterable[str], regex: Pattern[str]) -> Iterator[Token]:
             if debug:
                 logger.debug(token)
             yield token
+
+
+def _lex_buffer(s: str, regex: Pattern[str]) -> Iterator[Token]:
+    debug = logger.isEnabledFor(logging.DEBUG)
+    lineno = 1
+    start = 0
+    end = s.find('\n')
+    line = None
+    for m in regex.finditer(s):
+        typ = m.lastgroup
+        if typ is None:
+            raise ValueError(
+                'Lexer pattern generated a match without a named '
+                f'capturing group:\n{regex.pattern}')
+        pos = m.start()
+        # move forward to the line containing pos
+        while end != -1 and pos > end:
+            lineno += 1
+            start = end + 1
+            end = s.find('\n', start)
+            line = None
+        if line is None:
+            line = s[start:] if end == -1 else s[start:end]
+            if debug:
+                logger.debug('Line %d: %r', lineno, line)
+        token = Token(typ, m.group(), lineno, pos - start, line)
+        if debug:
+            logger.debug(token)
+        yield token
+
+
+def scan_graphs(data: _Data,
+                pos: int = 0) -> Iterator[GraphSpan]:
+    """
+    Yield the spans of the top-level graphs in *data*.
+
+    This finds the graphs in *data* by balancing parentheses without
+    lexing the graphs, so it is much faster than parsing. The
+    ``COMMENT`` and ``STRING`` patterns from :data:`PATTERNS` are used
+    so parentheses in comments and strings are ignored as they are by
+    the lexer. Comments between graphs are the leading comments of the
+    following graph and anything else outside of the graphs is
+    ignored. If the last graph is not closed, its span ends at the
+    end of *data*.
+
+    The *data* may be a string or a bytes-like object, such as a
+    :class:`mmap.mmap` of a UTF-8 file, in which case the offsets are
+    byte offsets.
+
+    Args:
+        data: a string or bytes-like object containing PENMAN graphs
+        pos: the offset in *data* where scanning starts; it should
+            not be inside a graph
+    Returns:
+        An iterator of :class:`GraphSpan` objects.
+    Example:
+        >>> from penman.lexer import scan_graphs
+        >>> s = '# ::id 1\\n(a / alpha)\\n\\n# ::id 2\\n(b :ARG ")")'
+        >>> for span in scan_graphs(s):
+        ...     print(span, repr(s[span.body:span.end]))
+        ...
+        GraphSpan(start=0, body=9, end=20) '(a / alpha)'
+        GraphSpan(start=22, body=31, end=43) '(b :ARG ")")'
+    """
+    # str or bytes patterns, depending on data
+    regex: Any
+    header: Any
+    balanced: Any
+    if isinstance(data, str):
+        regex, header, balanced = GRAPH_RE, _HEADER_RE, _BALANCED_RE
+    else:
+        regex = _GRAPH_BYTES_RE
+        header = _HEADER_BYTES_RE
+        balanced = _BALANCED_BYTES_RE
+    size = len(data)
+    start = -1
+    while pos < size:
+        # most graphs are preceded by only comments and whitespace
+        m = header.match(data, pos)
+        if m:
+            body = m.end() - 1
+            if start == -1:
+                start = m.start(1)
+            g = balanced.match(data, body)
+            end = g.end() if g else _scan_graph_end(regex, data, body)
+            yield GraphSpan(start, body, end)
+            start = -1
+            pos = end
+            continue
+        m = regex.search(data, pos)
+        typ = m.lastindex
+        if typ == _GRAPH_LPAREN:
+            body = m.start(typ)
+            if start == -1:
+                start = body
+            # most graphs are matched whole; the rest are scanned
+            g = balanced.match(data, body)
+            end = g.end() if g else _scan_graph_end(regex, data, body)
+            yield GraphSpan(start, body, end)
+            start = -1
+            pos = end
+        else:
+            if typ == _GRAPH_COMMENT and start == -1:
+                start = m.start(typ)
+            pos = m.end()
+            if pos == m.start():  # end of data
+                break
+
+
+def _scan_graph_end(regex: Pattern[Any], data: _Data, pos: int) -> int:
+    """Return the offset after the graph starting at *pos* in *data*."""
+    depth = 0
+    for m in regex.finditer(data, pos):
+        typ = m.lastindex
+        if typ == _GRAPH_LPAREN:
+            depth += 1
+        elif typ == _GRAPH_RPAREN:
+            depth -= 1
+            if depth == 0:
+                return m.end(typ)
+    return len(data)
+
+
+def _balanced_pattern(depth: int) -> str:
+    """
+    Return a pattern matching a graph nested at most *depth* deep.
+
+    The pattern only matches graphs without comments and where each
+    string follows whitespace, a parenthesis, or a slash, so strings
+    are where the lexer finds them. Other graphs do not match and
+    need to be scanned.
+    """
+    atom = (r'[^()"\#]+(?![^()"\#])'
+            rf'|(?<=[\s()\/]){PATTERNS["STRING"]}')
+    pattern = rf'\((?:{atom})*\)'
+    for _ in range(depth - 1):
+        pattern = rf'\((?:{atom}|{pattern})*\)'
+    return pattern
+
+
+_GRAPH_COMMENT = GRAPH_RE.groupindex['COMMENT']
+_GRAPH_LPAREN = GRAPH_RE.groupindex['LPAREN']
+_GRAPH_RPAREN = GRAPH_RE.groupindex['RPAREN']
+# the comments before a graph, possibly empty, up to its opening
+# parenthesis; the lookaheads keep backtracking linear on failure
+_HEADER_PATTERN = (
+    r'\s*(?!\s)'
+    rf'((?:{PATTERNS["COMMENT"]}\s*(?!\s))*)'
+    r'\('
+)
+_HEADER_RE = re.compile(_HEADER_PATTERN, flags=_FLAGS)
+_HEADER_BYTES_RE = re.compile(_HEADER_PATTERN.encode('utf-8'), flags=_FLAGS)
+_BALANCED_RE = re.compile(_balanced_pattern(32), flags=_FLAGS)
+_BALANCED_BYTES_RE = re.compile(_balanced_pattern(32).encode('utf-8'),
+                                flags=_FLAGS)
@@ -4,13 +4,22 @@ import sys
 import os
 import argparse
 import json
+import time
 import logging
 
 from penman.__about__ import __version__
 from penman.model import Model
 from penman import layout
 from penman.codec import PENMANCodec
+from penman.corpus import iter_metadata
 from penman import transform
+from penman import smatch
+
+LAYOUT_STRATEGIES = {
+    'first-occurrence': layout.first_occurrence,
+    'least-depth': layout.least_depth,
+    'fewest-inverted': layout.fewest_inverted,
+}
 
 
 def process(f, model, out, normalize_options, format_options, triples):
@@ -61,6 +70,32 @@ def process(f, model, out, normalize_options, format_options, triples):
         print(_process(t), file=out)
 
 
+def process_metadata(source, out):
+    """Write the metadata of each graph in *source* to *out*."""
+    for metadata in iter_metadata(source):
+        print(json.dumps(metadata, ensure_ascii=False), file=out)
+
+
+def process_smatch(test, gold, model, out, err, restarts, workers):
+    """Write the Smatch score of graphs in *test* against *gold*."""
+    codec = PENMANCodec(model=model)
+    start = time.perf_counter()
+    with open(gold) as fh:
+        pairs = smatch.pair_graphs(codec.iterdecode(test),
+                                   codec.iterdecode(fh))
+        scores = list(smatch.iterscore(
+            pairs, restarts=restarts, workers=workers))
+    elapsed = time.perf_counter() - start
+    score = smatch.total(scores)
+    print(f'Precision: {score.precision:.4f}', file=out)
+    print(f'Recall: {score.recall:.4f}', file=out)
+    print(f'F-score: {score.f_score:.4f}', file=out)
+    if err is not None:
+        rate = len(scores) / elapsed if elapsed else 0.0
+        print(f'scored {len(scores)} graph pairs in {elapsed:.2f}s '
+              f'({rate:.1f} pairs/s)', file=err)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Read and write graphs in the PENMAN notation.',
@@ -95,6 +130,9 @@ def main():
     form.add_argument(
         '--triples', action='store_true',
         help='print graphs as triple conjunctions')
+    form.add_argument(
+        '--metadata-only', action='store_true',
+        help="print each graph's metadata as a line of JSON")
     norm = parser.add_argument_group('normalization options')
     norm.add_argument(
         '--make-variables', metavar='FMT',
@@ -102,6 +140,9 @@ def main():
     norm.add_argument(
         '--rearrange', metavar='KEY', choices=('random', 'canonical'),
         help='sort or randomize the order of relations on each node')
+    norm.add_argument(
+        '--layout', metavar='STRATEGY', choices=tuple(LAYOUT_STRATEGIES),
+        help='choose where nodes are defined with STRATEGY (%(choices)s)')
     norm.add_argument(
         '--canonicalize-roles', action='store_true',
         help='canonicalize role forms')
@@ -118,6 +159,17 @@ def main():
         '--indicate-branches', action='store_true',
         help='insert triples to indicate tree structure')
 
+    evaluation = parser.add_argument_group('evaluation options')
+    evaluation.add_argument(
+        '--smatch', metavar='GOLD',
+        help='print the Smatch score of the graphs against GOLD')
+    evaluation.add_argument(
+        '--restarts', metavar='N', type=int, default=4,
+        help='use N random restarts for Smatch (default: 4)')
+    evaluation.add_argument(
+        '--workers', metavar='N', type=int,
+        help='compute Smatch scores in N processes')
+
     args = parser.parse_args()
 
     if args.quiet:
@@ -162,9 +214,22 @@ def main():
     format_options = {
         'indent': indent,
         'compact': args.compact,
+        'strategy': LAYOUT_STRATEGIES.get(args.layout),
     }
 
-    if args.FILE:
+    if args.smatch:
+        err = None if args.quiet else sys.stderr
+        if args.FILE:
+            with open(args.FILE[0]) as f:
+                process_smatch(f, args.smatch, model, sys.stdout, err,
+                               args.restarts, args.workers)
+        else:
+            process_smatch(sys.stdin, args.smatch, model, sys.stdout, err,
+                           args.restarts, args.workers)
+    elif args.metadata_only:
+        for source in args.FILE or [sys.stdin]:
+            process_metadata(source, sys.stdout)
+    elif args.FILE:
         for file in args.FILE:
             with open(file) as f:
                 process(f, model, sys.stdout,
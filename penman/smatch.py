@@ -0,0 +1,480 @@
+# -*- coding: utf-8 -*-
+
+"""
+Smatch-style scoring of graphs against gold graphs.
+
+Smatch [CAI2013]_ compares two graphs by the number of triples they
+share under the best one-to-one mapping of the variables of one graph
+to those of the other. Finding the best mapping is NP-hard, so, like
+Smatch, this module searches for it by hill-climbing from a mapping
+of nodes with the same concepts and from a number of random
+mappings. The random mappings are seeded for each pair of graphs, so
+scores are the same in every run and for any number of worker
+processes.
+
+.. [CAI2013] Shu Cai and Kevin Knight. 2013. Smatch: an Evaluation
+   Metric for Semantic Feature Structures. In Proceedings of ACL.
+"""
+
+from typing import (
+    Iterable, Iterator, List, Dict, Set, Tuple, NamedTuple, Optional)
+from collections import defaultdict
+from itertools import (islice, chain)
+import random
+
+from penman.exceptions import PenmanError
+from penman.types import Target
+from penman.graph import (CONCEPT_ROLE, Graph)
+from penman._parallel import imap
+
+
+#: The role of the pseudo-attribute marking the top node.
+TOP_ROLE = ':TOP'
+
+# the mapped index of a variable that is not mapped
+_UNMAPPED = -1
+
+# (variable index, concept), (index, role, value), (index, role, index)
+_Instance = Tuple[int, str]
+_Attribute = Tuple[int, str, str]
+_Relation = Tuple[int, str, int]
+_Node = Tuple[int, int]  # a variable of one graph mapped to the other's
+_Change = Tuple[int, Optional[int], Optional[int]]  # (i, j, k)
+
+
+class Score(NamedTuple):
+    """
+    Counts of matching triples for computing precision and recall.
+
+    Scores of many pairs of graphs are combined with :func:`total`.
+    """
+
+    matched: int
+    """The number of triples matched under the best mapping."""
+
+    test: int
+    """The number of triples in the test graph."""
+
+    gold: int
+    """The number of triples in the gold graph."""
+
+    @property
+    def precision(self) -> float:
+        """The ratio of matched triples to test triples."""
+        return self.matched / self.test if self.test else 0.0
+
+    @property
+    def recall(self) -> float:
+        """The ratio of matched triples to gold triples."""
+        return self.matched / self.gold if self.gold else 0.0
+
+    @property
+    def f_score(self) -> float:
+        """The harmonic mean of :attr:`precision` and :attr:`recall`."""
+        p, r = self.precision, self.recall
+        return 2 * p * r / (p + r) if p + r else 0.0
+
+
+def score(test: Graph,
+          gold: Graph,
+          restarts: int = 4,
+          seed: int = 0) -> Score:
+    """
+    Return the Smatch score of graph *test* against graph *gold*.
+
+    Concepts, roles, and attribute values are compared
+    case-insensitively. As in Smatch, the top node of each graph has
+    an extra ``:TOP`` attribute, so mapping the top of one graph to
+    the top of the other counts as a matching triple.
+
+    Args:
+        test: the graph to evaluate
+        gold: the graph to compare it to
+        restarts: the number of random mappings to search from in
+            addition to the mapping of nodes with the same concepts
+        seed: the seed for the random mappings
+    Returns:
+        A :class:`Score` of the best mapping found.
+    Example:
+        >>> from penman import decode
+        >>> from penman.smatch import score
+        >>> s = score(decode('(a / alpha :ARG0 (b / beta))'),
+        ...           decode('(x / alpha :ARG0 (y / gamma))'))
+        >>> s
+        Score(matched=3, test=4, gold=4)
+        >>> round(s.f_score, 2)
+        0.75
+    """
+    if restarts < 0:
+        raise ValueError('restarts must be a non-negative integer')
+    t = _Triples(test)
+    g = _Triples(gold)
+    matched = 0
+    if t.size and g.size:
+        table = _MatchTable(t, g)
+        rng = random.Random(seed)
+        mapping = table.initial_mapping()
+        matched = table.hill_climb(mapping)
+        for _ in range(restarts):
+            if matched == min(t.size, g.size):
+                break  # cannot improve
+            mapping = table.random_mapping(rng)
+            matched = max(matched, table.hill_climb(mapping))
+    return Score(matched, t.size, g.size)
+
+
+def iterscore(pairs: Iterable[Tuple[Graph, Graph]],
+              restarts: int = 4,
+              seed: int = 0,
+              workers: int = None,
+              chunksize: int = 100) -> Iterator[Score]:
+    """
+    Return the Smatch scores for each (*test*, *gold*) pair of graphs.
+
+    If *workers* is given, pairs are scored in a pool of that many
+    processes, *chunksize* pairs at a time. Scores are yielded in
+    the order of *pairs* and are the same as those of :func:`score`.
+
+    Args:
+        pairs: an iterable of pairs of test and gold graphs
+        restarts: the number of random restarts; see :func:`score`
+        seed: the seed for the random restarts of each pair
+        workers: if given, the number of processes used to score
+        chunksize: the number of pairs scored at a time by each
+            process
+    Returns:
+        An iterator of :class:`Score` objects.
+    """
+    # not a generator so invalid arguments are reported right away
+    if restarts < 0:
+        raise ValueError('restarts must be a non-negative integer')
+    if workers is None:
+        return (score(test, gold, restarts=restarts, seed=seed)
+                for test, gold in pairs)
+    if chunksize < 1:
+        raise ValueError('chunksize must be a positive integer')
+    pairs = iter(pairs)
+    tasks = iter(lambda: (list(islice(pairs, chunksize)), restarts, seed),
+                 ([], restarts, seed))
+    return chain.from_iterable(imap(_score_chunk, tasks, workers))
+
+
+def total(scores: Iterable[Score]) -> Score:
+    """
+    Return the corpus-level score of *scores*.
+
+    As in Smatch, the counts are summed before computing precision
+    and recall, so larger graphs have more weight.
+    """
+    matched = test = gold = 0
+    for s in scores:
+        matched += s.matched
+        test += s.test
+        gold += s.gold
+    return Score(matched, test, gold)
+
+
+def corpus_score(test_graphs: Iterable[Graph],
+                 gold_graphs: Iterable[Graph],
+                 restarts: int = 4,
+                 seed: int = 0,
+                 workers: int = None,
+                 chunksize: int = 100) -> Score:
+    """
+    Return the corpus-level Smatch score of *test_graphs*.
+
+    The graphs of *test_graphs* and *gold_graphs* are paired in
+    order, and a :exc:`~penman.exceptions.PenmanError` is raised if
+    one has more graphs than the other. See :func:`iterscore` for the
+    other arguments.
+
+    Example:
+        >>> import penman
+        >>> from penman.smatch import corpus_score
+        >>> s = corpus_score(penman.load('test.txt'),
+        ...                  penman.load('gold.txt'),
+        ...                  workers=4)
+        >>> print(f'{s.f_score:.4f}')
+        0.7512
+    """
+    return total(iterscore(pair_graphs(test_graphs, gold_graphs),
+                           restarts=restarts,
+                           seed=seed,
+                           workers=workers,
+                           chunksize=chunksize))
+
+
+def pair_graphs(test_graphs: Iterable[Graph],
+                gold_graphs: Iterable[Graph]) -> Iterator[Tuple[Graph, Graph]]:
+    """
+    Yield the pairs of graphs in *test_graphs* and *gold_graphs*.
+
+    This is like :func:`zip` except that a
+    :exc:`~penman.exceptions.PenmanError` is raised if one iterable
+    has more graphs than the other.
+
+    Example:
+        >>> import penman
+        >>> from penman.smatch import pair_graphs, iterscore
+        >>> pairs = pair_graphs(penman.load('test.txt'),
+        ...                     penman.load('gold.txt'))
+        >>> for s in iterscore(pairs):
+        ...     print(f'{s.f_score:.4f}')
+    """
+    test_graphs, gold_graphs = iter(test_graphs), iter(gold_graphs)
+    while True:
+        test = next(test_graphs, None)
+        gold = next(gold_graphs, None)
+        if test is None and gold is None:
+            break
+        elif test is None or gold is None:
+            raise PenmanError('different numbers of test and gold graphs')
+        yield test, gold
+
+
+def _score_chunk(pairs: List[Tuple[Graph, Graph]],
+                 restarts: int,
+                 seed: int) -> List[Score]:
+    """Score a chunk of graph pairs for parallel scoring."""
+    return [score(test, gold, restarts=restarts, seed=seed)
+            for test, gold in pairs]
+
+
+class _Triples(object):
+    """
+    The triples of a graph with variables replaced by indices.
+
+    As in Smatch, duplicate triples are counted once, so each triple
+    of one graph matches at most one triple of the other.
+    """
+
+    __slots__ = 'size', 'variables', 'instances', 'attributes', 'relations'
+
+    def __init__(self, g: Graph):
+        index: Dict[Target, int] = {}
+        for v, _, _ in g.instances():
+            index.setdefault(v, len(index))
+        for v in sorted(g.variables() - set(index)):
+            index[v] = len(index)
+
+        self.variables = len(index)
+        # dict.fromkeys() removes duplicates and keeps the order
+        self.instances: List[_Instance] = list(dict.fromkeys(
+            (index[v], _normalize(concept))
+            for v, _, concept in g.instances()))
+        attributes = [(index[v], _normalize(role), _normalize(value))
+                      for v, role, value in g.attributes()]
+        if g.top is not None:
+            attributes.append((index[g.top], TOP_ROLE, 'top'))
+        self.attributes: List[_Attribute] = list(dict.fromkeys(attributes))
+        self.relations: List[_Relation] = list(dict.fromkeys(
+            (index[v], _normalize(role), index[target])
+            for v, role, target in g.edges()
+            if role != CONCEPT_ROLE))
+        self.size = (len(self.instances)
+                     + len(self.attributes)
+                     + len(self.relations))
+
+
+def _normalize(value) -> str:
+    return '' if value is None else str(value).lower()
+
+
+class _MatchTable(object):
+    """
+    Tables of the triples matched by mapping variables.
+
+    A node ``(i, j)`` maps variable *i* of the test graph to variable
+    *j* of the gold graph. The table :attr:`unary` has the number of
+    triples matched by a node alone and :attr:`binary` has, for each
+    node, the other nodes and the number of triples matched when both
+    are in the mapping. The tables are built by joining the triples
+    of the two graphs on their concepts, roles, and values instead of
+    comparing every pair of triples.
+
+    The tables are sparse dictionaries keyed by nodes rather than
+    arrays over all pairs of variables: only a few pairs of variables
+    share any triples, and NumPy is not a dependency of this module.
+    """
+
+    __slots__ = ('size', 'candidates', 'unary', 'binary',
+                 '_nodes', '_neighbors', '_concepts')
+
+    def __init__(self, test: _Triples, gold: _Triples):
+        self.size = test.variables
+        unary: Dict[_Node, int] = defaultdict(int)
+        binary: Dict[_Node, Dict[_Node, int]] = defaultdict(
+            lambda: defaultdict(int))
+
+        by_concept: Dict[str, List[int]] = defaultdict(list)
+        for j, concept in gold.instances:
+            by_concept[concept].append(j)
+        concepts: Set[_Node] = set()
+        for i, concept in test.instances:
+            for j in by_concept.get(concept, ()):
+                unary[(i, j)] += 1
+                concepts.add((i, j))
+
+        by_attribute: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for j, role, value in gold.attributes:
+            by_attribute[(role, value)].append(j)
+        for i, role, value in test.attributes:
+            for j in by_attribute.get((role, value), ()):
+                unary[(i, j)] += 1
+
+        by_role: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for j, role, l in gold.relations:
+            by_role[role].append((j, l))
+        for i, role, k in test.relations:
+            for j, l in by_role.get(role, ()):
+                if (i == k) != (j == l):
+                    continue  # a loop can only match a loop
+                elif i == k:
+                    unary[(i, j)] += 1
+                else:
+                    binary[(i, j)][(k, l)] += 1
+                    binary[(k, l)][(i, j)] += 1
+
+        candidates: List[Set[int]] = [set() for _ in range(self.size)]
+        for i, j in unary:
+            candidates[i].add(j)
+        for i, j in binary:
+            candidates[i].add(j)
+
+        self.candidates = [sorted(js) for js in candidates]
+        self.unary = dict(unary)
+        self.binary = {node: dict(nodes) for node, nodes in binary.items()}
+        self._nodes = set(unary).union(binary)
+        neighbors: List[Set[int]] = [set() for _ in range(self.size)]
+        for (i, _), nodes in self.binary.items():
+            neighbors[i].update(k for k, _ in nodes)
+        self._neighbors = neighbors
+        self._concepts = concepts
+
+    def initial_mapping(self) -> List[int]:
+        """Return a mapping of variables to ones with the same concept."""
+        mapping = [_UNMAPPED] * self.size
+        used: Set[int] = set()
+        for i, js in enumerate(self.candidates):
+            for j in js:
+                if j not in used and (i, j) in self._concepts:
+                    mapping[i] = j
+                    used.add(j)
+                    break
+        return mapping
+
+    def random_mapping(self, rng: random.Random) -> List[int]:
+        """Return a random mapping of variables to candidates."""
+        mapping = [_UNMAPPED] * self.size
+        used: Set[int] = set()
+        for i, js in enumerate(self.candidates):
+            available = [j for j in js if j not in used]
+            if available:
+                j = mapping[i] = rng.choice(available)
+                used.add(j)
+        return mapping
+
+    def matches(self, mapping: List[int]) -> int:
+        """Return the number of triples matched by *mapping*."""
+        unary, binary = self.unary, self.binary
+        count = 0
+        for i, j in enumerate(mapping):
+            if j != _UNMAPPED:
+                count += unary.get((i, j), 0)
+                for (k, l), n in binary.get((i, j), {}).items():
+                    if k < i and mapping[k] == l:
+                        count += n
+        return count
+
+    def hill_climb(self, mapping: List[int]) -> int:
+        """
+        Improve *mapping* in place until no move or swap improves it.
+
+        Return the number of triples matched by the final mapping.
+        """
+        matched = self.matches(mapping)
+        # cached contributions of each variable mapped to each of its
+        # candidates; they only change when a neighbor is remapped
+        cache: List[Dict[int, int]] = [{} for _ in range(self.size)]
+        neighbors = self._neighbors
+        while True:
+            gain, (i, j, k) = self._best_change(mapping, cache)
+            if gain <= 0:
+                return matched
+            if j is not None:
+                mapping[i] = j
+            elif k is not None:
+                mapping[i], mapping[k] = mapping[k], mapping[i]
+                for x in neighbors[k]:
+                    cache[x].clear()
+            for x in neighbors[i]:
+                cache[x].clear()
+            matched += gain
+
+    def _best_change(self,
+                     mapping: List[int],
+                     cache: List[Dict[int, int]]) -> Tuple[int, _Change]:
+        """
+        Return the gain and the best move or swap for *mapping*.
+
+        A move ``(i, j, None)`` maps variable *i* to *j*, and a swap
+        ``(i, None, k)`` exchanges the mapped variables of *i* and *k*.
+        """
+        best_gain = 0
+        best: _Change = (0, None, None)
+        used = set(mapping)
+        contribution = self._contribution
+
+        def cached(i: int, j: int) -> int:
+            if j == _UNMAPPED:
+                return 0
+            values = cache[i]
+            if j not in values:
+                values[j] = contribution(i, j, mapping)
+            return values[j]
+
+        current = [cached(i, j) for i, j in enumerate(mapping)]
+        for i, js in enumerate(self.candidates):
+            for j in js:
+                if j not in used:
+                    gain = cached(i, j) - current[i]
+                    if gain > best_gain:
+                        best_gain, best = gain, (i, j, None)
+        size = self.size
+        binary = self.binary
+        nodes = self._nodes
+        empty: Dict[_Node, int] = {}
+        rows = [binary.get((i, j), empty) for i, j in enumerate(mapping)]
+        for i in range(size):
+            a = mapping[i]
+            row_ia = rows[i]
+            for k in range(i + 1, size):
+                b = mapping[k]
+                if a == b:
+                    continue  # both unmapped
+                elif (i, b) not in nodes and (k, a) not in nodes:
+                    continue  # the swap can only lose matches
+                # triples shared by i and k are in both contributions
+                # before the swap and in neither after it
+                row_ib = binary.get((i, b), empty)
+                row_ka = binary.get((k, a), empty)
+                before = current[i] + current[k] - row_ia.get((k, b), 0)
+                after = (cached(i, b) - row_ib.get((k, b), 0)
+                         + cached(k, a) - row_ka.get((i, a), 0)
+                         + row_ib.get((k, a), 0))
+                if after - before > best_gain:
+                    best_gain, best = after - before, (i, None, k)
+        return best_gain, best
+
+    def _contribution(self, i: int, j: int, mapping: List[int]) -> int:
+        """
+        Return the triples matched by mapping *i* to *j*.
+
+        Triples shared with variables other than *i* are counted if
+        those variables are mapped as they are in *mapping*.
+        """
+        count = self.unary.get((i, j), 0)
+        for (k, l), n in self.binary.get((i, j), {}).items():
+            if k != i and mapping[k] == l:
+                count += n
+        return count
@@ -13,7 +13,7 @@ from penman.surface import (Alignment, RoleAlignment, alignments)
 from penman.tree import (Tree, Node, is_atomic)
 from penman.graph import (Graph, CONCEPT_ROLE)
 from penman.model import Model
-from penman.layout import (Push, POP, appears_inverted, get_pushed_variable)
+from penman.layout import (Push, POP, LayoutAnalysis)
 
 
 logger = logging.getLogger(__name__)
@@ -88,12 +88,13 @@ def reify_edges(g: Graph, model: Model) -> Graph:
     vars = g.variables()
     if model is None:
         model = Model()
+    analysis = LayoutAnalysis(g)
     new_epidata = dict(g.epidata)
     new_triples: List[BasicTriple] = []
     for triple in g.triples:
         if model.is_role_reifiable(triple[1]):
             in_triple, node_triple, out_triple = model.reify(triple, vars)
-            if appears_inverted(g, triple):
+            if analysis.appears_inverted(triple):
                 in_triple, out_triple = out_triple, in_triple
             new_triples.extend((in_triple, node_triple, out_triple))
             var = node_triple[0]
@@ -331,6 +332,7 @@ _Dereification = Dict[Variable,
 def _dereify_agenda(g: Graph, model: Model) -> _Dereification:
 
     alns = alignments(g)
+    analysis = LayoutAnalysis(g)
     agenda: _Dereification = {}
     fixed: Set[Target] = set([g.top])
     inst: Dict[Variable, BasicTriple] = {}
@@ -354,7 +356,7 @@ def _dereify_agenda(g: Graph, model: Model) -> _Dereification:
             # passed initial checks
             # now figure out which other edge is the first one
             first, second = other[var]
-            if get_pushed_variable(g, second) == var:
+            if analysis.get_pushed_variable(second) == var:
                 first, second = second, first
             try:
                 dereified = model.dereify(instance, first, second)
@@ -96,12 +96,17 @@ def _format_edge(edge, level):
 
 
 def _nodes(node):
-    var, edges = node
-    ns = [] if var is None else [node]
-    for _, target in edges:
+    ns = []
+    # an explicit stack avoids the recursion limit on deep trees
+    agenda = [node]
+    while agenda:
+        node = agenda.pop()
+        var, edges = node
+        if var is not None:
+            ns.append(node)
         # if target is not atomic, assume it's a valid tree node
-        if not is_atomic(target):
-            ns.extend(_nodes(target))
+        agenda.extend(reversed([target for _, target in edges
+                                if not is_atomic(target)]))
     return ns
 
 
@@ -65,6 +65,7 @@ setup(
     install_requires=[
     ],
     extras_require={
+        'numpy': ['numpy'],
         'docs': docs_require,
         'tests': tests_require,
         'dev': docs_require + tests_require + [
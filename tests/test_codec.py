@@ -37,6 +37,19 @@ class TestPENMANCodec(object):
         assert codec.parse('(a :ARG~1 b~2)') == (
             'a', [(':ARG~1', 'b~2')])
 
+    def test_parse_deep(self):
+        depth = 5000
+        s = ''.join(f'(n{i} / c :ARG ' for i in range(depth))
+        s += '(x / c)' + ')' * depth
+        node = codec.parse(s).node
+        for i in range(depth):
+            var, edges = node
+            assert var == f'n{i}'
+            assert edges[0] == ('/', 'c')
+            assert edges[1][0] == ':ARG'
+            node = edges[1][1]
+        assert node == ('x', [('/', 'c')])
+
     def test_format(self):
         assert codec.format(
             (None, [])
@@ -176,6 +189,117 @@ class TestPENMANCodec(object):
         # fuller examples
         assert decode(x1[0]).triples == x1[1]
 
+    def test_decode_matches_interpret(self, x1, isi_aligned):
+        def _decode_via_tree(s):
+            return layout.interpret(codec.parse(s))
+
+        for s in ['()',
+                  '(a / )',
+                  '(a :ARG ())',
+                  '(a :ARG0-of b :ARG1 (b))',
+                  '(a / alpha~1 :ARG~e.2 (b :mod-of 7 :ARG-of a~3))',
+                  x1[0],
+                  isi_aligned[0]]:
+            g1 = decode(s)
+            g2 = _decode_via_tree(s)
+            assert g1.top == g2.top
+            assert g1.triples == g2.triples
+            assert repr(list(g1.epidata.items())) == repr(
+                list(g2.epidata.items()))
+
+    def test_decode_deep(self):
+        depth = 5000
+        s = ''.join(f'(n{i} :ARG ' for i in range(depth)) + '(x)'
+        g = decode(s + ')' * depth)
+        assert len(g.triples) == depth * 2 + 1
+        assert g.triples[-2:] == [('n4999', ':ARG', 'x'),
+                                  ('x', ':instance', None)]
+        assert g.epidata[('x', ':instance', None)] == [layout.POP] * depth
+
+    def test_decode_crlf(self):
+        s = '# ::id 1\r\n# ::flag\r\n(a / alpha\r\n   :ARG0 (b / beta))\r\n'
+        metadata = {'id': '1', 'flag': ''}
+        triples = [('a', ':instance', 'alpha'),
+                   ('a', ':ARG0', 'b'),
+                   ('b', ':instance', 'beta')]
+        g = decode(s)
+        assert g.metadata == metadata
+        assert g.triples == triples
+        for kwargs in ({}, {'lazy': True}, {'workers': 2}):
+            gs = list(codec.iterdecode(s * 2, **kwargs))
+            assert [g.metadata for g in gs] == [metadata, metadata]
+            assert [g.triples for g in gs] == [triples, triples]
+
+    def test_iterdecode_parallel(self, x1, isi_aligned):
+        s = '\n\n'.join([
+            '# ::id 1\n# ::snt a (b\n' + x1[0],
+            '(a / alpha :ARG "(")(b / beta)',
+            isi_aligned[0],
+            '(a :ARG0-of (b :ARG1 a))'] * 3)
+        gs = list(codec.iterdecode(s))
+        for chunksize in (1, 2, 100):
+            _gs = list(codec.iterdecode(s, workers=2, chunksize=chunksize))
+            assert [g.triples for g in _gs] == [g.triples for g in gs]
+            assert [g.metadata for g in _gs] == [g.metadata for g in gs]
+            assert all(epi is layout.POP
+                       for epi in _gs[-1].epidata[('b', ':ARG1', 'a')])
+
+        with pytest.raises(penman.DecodeError) as excinfo:
+            list(codec.iterdecode('(a)\n(b)\n(c :ARG (d e))',
+                                  workers=2, chunksize=1))
+        assert excinfo.value.lineno == 3
+
+        with pytest.raises(ValueError):
+            codec.iterdecode(s, workers=0)
+        with pytest.raises(ValueError):
+            codec.iterdecode(s, workers=2, chunksize=0)
+
+    def test_iterdecode_lazy(self, x1, isi_aligned):
+        s = '\n\n'.join([
+            '# ::id 1\n# ::snt a (b\n' + x1[0],
+            '(a / alpha :ARG "(")(b / beta)',
+            isi_aligned[0],
+            '(a :ARG0-of (b :ARG1 a))'])
+        gs = list(codec.iterdecode(s))
+        _gs = list(codec.iterdecode(s, lazy=True))
+        assert [g.metadata for g in _gs] == [g.metadata for g in gs]
+        assert not any(g.is_loaded() for g in _gs)
+        assert [g.triples for g in _gs] == [g.triples for g in gs]
+        assert [str(g) for g in _gs] == [str(g) for g in gs]
+        assert [encode(g) for g in _gs] == [
+            '# ::id 1\n# ::snt a (b\n' + x1[0],
+            '(a / alpha :ARG "(")',
+            '(b / beta)',
+            isi_aligned[0],
+            '(a :ARG0-of (b :ARG1 a))']
+
+        with pytest.raises(ValueError):
+            codec.iterdecode(s, lazy=True, workers=2)
+
+        # errors are raised when the graph is used
+        gs = list(codec.iterdecode('(a)\n(b)\n(c :ARG (d e))', lazy=True))
+        assert len(gs) == 3
+        with pytest.raises(penman.DecodeError) as excinfo:
+            gs[2].triples
+        assert excinfo.value.lineno == 3
+
+    def test_encode_lazy(self):
+        s = '# ::id 1\n(a / alpha\n     :ARG0 (b / beta))'
+        g = next(codec.iterdecode(s, lazy=True))
+        assert encode(g) == s
+        assert encode(g, indent=None) == (
+            '# ::id 1\n(a / alpha :ARG0 (b / beta))')
+        assert g.top == 'a'
+        assert encode(g) == s
+        g.metadata['id'] = '2'
+        assert encode(g) == '# ::id 2\n(a / alpha\n     :ARG0 (b / beta))'
+        g.triples.append(('b', ':ARG1', 'a'))
+        assert encode(g) == (
+            '# ::id 2\n'
+            '(a / alpha\n'
+            '   :ARG0 (b / beta)\n'
+            '   :ARG1-of b)')
+
     def test_decode_inverted_attributes(self, caplog):
         caplog.set_level(logging.WARNING, logger='penman.layout')
 
@@ -322,6 +446,24 @@ class TestPENMANCodec(object):
         g = penman.Graph([('a', 'ARG', 'b')], top='b')
         assert encode(g) == '(b :ARG-of a)'
 
+    def test_encode_canonical(self):
+        g1 = decode('(a / alpha :ARG1 (g / gamma) :ARG0 (b / beta))\n'
+                    '# ::id 1')
+        g2 = decode('(x / alpha :ARG0 (y / beta~1) :ARG1 (z / gamma))')
+        assert encode(g1) != encode(g2)
+        assert encode(g1, canonical=True) == encode(g2, canonical=True)
+        assert encode(g1, canonical=True, indent=None) == (
+            '(a / alpha :ARG0 (b / beta) :ARG1 (g / gamma))')
+
+    def test_encode_strategy(self):
+        g = decode('(d / dog :ARG0-of (b / bark-01) :ARG0-of (t / try-01 '
+                   ':ARG1 b))')
+        assert encode(g, indent=None) == (
+            '(d / dog :ARG0-of (b / bark-01) :ARG0-of (t / try-01 :ARG1 b))')
+        assert encode(g, indent=None,
+                      strategy=layout.fewest_inverted) == (
+            '(d / dog :ARG0-of (t / try-01 :ARG1 (b / bark-01 :ARG0 d)))')
+
     def test_encode_atoms(self):
         # string value
         g = penman.Graph([('a', 'ARG', '"string"')])
@@ -0,0 +1,228 @@
+
+import os
+
+import pytest
+
+from penman import corpus
+from penman.exceptions import DecodeError
+from penman.graph import Graph
+from penman.interface import (decode, load, load_indexed)
+
+
+TEXT = '''# ::id a1
+# ::snt Alpha.
+(a / alpha)
+
+# ::id b2 ::date today
+(b / beta
+   :ARG0 (c / "(gamma)"))
+
+(d / delta)
+'''
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(TEXT, encoding='utf-8')
+    return path
+
+
+def test_CorpusIndex(corpus_path, tmp_path):
+    index = corpus.CorpusIndex.build(corpus_path)
+    assert len(index) == 3
+    assert index.ids == ['a1', 'b2', '']
+    data = corpus_path.read_bytes()
+    assert data[index.starts[0]:index.ends[0]].startswith(b'# ::id a1')
+    assert data[index.bodies[1]:index.ends[1]].endswith(b'"(gamma)"))')
+    assert index.is_current(corpus_path)
+
+    index_path = tmp_path / 'corpus.idx'
+    index.write(index_path)
+    index2 = corpus.CorpusIndex.read(index_path)
+    assert index2.size == index.size
+    assert index2.mtime_ns == index.mtime_ns
+    assert index2.starts == index.starts
+    assert index2.bodies == index.bodies
+    assert index2.ends == index.ends
+    assert index2.ids == index.ids
+
+    index_path.write_bytes(b'not an index\n')
+    with pytest.raises(ValueError):
+        corpus.CorpusIndex.read(index_path)
+
+    empty = tmp_path / 'empty.txt'
+    empty.write_text('')
+    index = corpus.CorpusIndex.build(empty)
+    assert len(index) == 0
+    index.write(index_path)
+    assert len(corpus.CorpusIndex.read(index_path)) == 0
+
+
+def test_load_index(corpus_path):
+    index_path = f'{corpus_path!s}.idx'
+    index = corpus.load_index(corpus_path)
+    assert os.path.exists(index_path)
+    assert corpus.load_index(corpus_path).ends == index.ends
+
+    # the index is rebuilt when the file changes
+    with open(corpus_path, 'a', encoding='utf-8') as fh:
+        fh.write('\n(e / epsilon)\n')
+    assert len(corpus.load_index(corpus_path)) == 4
+    assert len(corpus.CorpusIndex.read(index_path)) == 4
+
+    # and when the index file is corrupt
+    with open(index_path, 'wb') as fh:
+        fh.write(corpus.INDEX_MAGIC + b'{}\n')
+    assert len(corpus.load_index(corpus_path)) == 4
+
+
+def test_IndexedCorpus(corpus_path, tmp_path):
+    index_path = tmp_path / 'other.idx'
+    with load_indexed(corpus_path, index_path=index_path) as gs:
+        assert os.path.exists(index_path)
+        assert len(gs) == 3
+        assert gs[1].top == 'b'
+        assert gs[1].metadata == {'id': 'b2', 'date': 'today'}
+        assert gs[-1].top == 'd'
+        assert [g.top for g in gs[::2]] == ['a', 'd']
+        assert [g.top for g in gs] == ['a', 'b', 'd']
+        assert gs.by_id('a1').metadata['snt'] == 'Alpha.'
+        assert gs.text(2) == '(d / delta)'
+        assert len(gs.corpus_index) == 3
+        assert gs.index(gs[1]) == 1
+        assert gs.count(gs[2]) == 1
+        with pytest.raises(IndexError):
+            gs[3]
+        with pytest.raises(KeyError):
+            gs.by_id('d')
+
+
+def test_iterdecode_mapped(corpus_path, tmp_path):
+    expected = load(corpus_path)
+    for workers, chunksize in [(None, 100), (2, 1), (2, 100)]:
+        gs = list(corpus.iterdecode_mapped(
+            corpus_path, workers=workers, chunksize=chunksize))
+        assert gs == expected
+        assert [g.metadata for g in gs] == [g.metadata for g in expected]
+
+    empty = tmp_path / 'empty.txt'
+    empty.write_text('')
+    assert list(corpus.iterdecode_mapped(empty)) == []
+
+    bad = tmp_path / 'bad.txt'
+    bad.write_text('(a / alpha)\n\n(b / beta\n   :ARG0 (c / gamma / x))\n')
+    for workers in (None, 2):
+        gs = corpus.iterdecode_mapped(bad, workers=workers, chunksize=1)
+        assert next(gs).top == 'a'
+        with pytest.raises(DecodeError) as excinfo:
+            next(gs)
+        assert excinfo.value.lineno == 4
+
+    # arguments are checked before the file is read
+    with pytest.raises(ValueError):
+        corpus.iterdecode_mapped(tmp_path / 'missing.txt', chunksize=0)
+    with pytest.raises(ValueError):
+        corpus.iterdecode_mapped(tmp_path / 'missing.txt', workers=0)
+
+
+def test_crlf(tmp_path):
+    path = tmp_path / 'crlf.txt'
+    path.write_bytes(TEXT.replace('\n', '\r\n').encode('utf-8')
+                     + b'# ::id e5\r\n# ::flag\r\n(e / epsilon)\r\n')
+    expected = [{'id': 'a1', 'snt': 'Alpha.'},
+                {'id': 'b2', 'date': 'today'},
+                {},
+                {'id': 'e5', 'flag': ''}]
+    assert [g.metadata for g in load(path)] == expected
+    for workers in (None, 2):
+        gs = list(corpus.iterdecode_mapped(path, workers=workers))
+        assert [g.metadata for g in gs] == expected
+        assert gs == load(path)
+    with corpus.IndexedCorpus(path) as gs:
+        assert gs.corpus_index.ids == ['a1', 'b2', '', 'e5']
+        assert gs.by_id('e5').metadata == {'id': 'e5', 'flag': ''}
+        assert [g.metadata for g in gs] == expected
+
+
+def test_iter_metadata(corpus_path):
+    expected = [{'id': 'a1', 'snt': 'Alpha.'},
+                {'id': 'b2', 'date': 'today'},
+                {}]
+    assert list(corpus.iter_metadata(corpus_path)) == expected
+    with open(corpus_path, encoding='utf-8') as fh:
+        assert list(corpus.iter_metadata(fh)) == expected
+    assert [g.metadata for g in load(corpus_path)] == expected
+
+    # bytes are read without newline translation
+    corpus_path.write_bytes(TEXT.replace('\n', '\r\n').encode('utf-8')
+                            + b'# ::flag\r\n(e / epsilon)\r\n')
+    expected.append({'flag': ''})
+    assert list(corpus.iter_metadata(corpus_path)) == expected
+
+
+def test_GraphCorpus(corpus_path):
+    np = pytest.importorskip('numpy')
+    graphs = load(corpus_path)
+    gc = corpus.GraphCorpus(graphs)
+    assert len(gc) == 3
+    assert gc.sources.dtype == np.int32
+    assert gc.offsets.tolist() == [0, 1, 4, 5]
+    assert gc.graph_ids.tolist() == [0, 1, 1, 1, 2]
+    assert list(gc) == graphs
+    assert gc[1].epidata == graphs[1].epidata
+    assert gc[-1].metadata == {}
+    assert [g.top for g in gc[:2]] == ['a', 'b']
+    with pytest.raises(IndexError):
+        gc[3]
+
+    assert gc.find(role=':ARG0').tolist() == [1]
+    assert gc.count(role=':instance') == 3
+    assert gc.count(target='"(gamma)"') == 1
+    assert gc.count(role=':missing') == 0
+    assert gc.role_counts_by_concept() == {'beta': {':ARG0': 1}}
+
+    assert list(corpus.GraphCorpus.load(corpus_path)) == graphs
+    empty = corpus.GraphCorpus()
+    assert len(empty) == 0
+    assert empty.count() == 0
+    assert empty.role_counts_by_concept() == {}
+
+
+def test_to_arrays(corpus_path):
+    pytest.importorskip('numpy')
+    graphs = [
+        decode('(a / alpha :ARG0 (b / beta :mod 1) :ARG1-of b)'),
+        Graph(),
+        Graph([('x', ':ARG0', 'y')], top='y'),
+    ]
+    arrays = corpus.to_arrays(graphs)
+    strings = arrays.table.strings
+    assert arrays.node_offsets.tolist() == [0, 2, 2, 4]
+    assert [strings[i] for i in arrays.node_variables] == ['a', 'b', 'x', 'y']
+    assert arrays.node_concepts.tolist()[2:] == [-1, -1]
+    assert [strings[i] for i in arrays.node_concepts[:2]] == ['alpha', 'beta']
+    assert arrays.tops.tolist() == [0, -1, 3]
+    assert arrays.edge_offsets.tolist() == [0, 2, 2, 3]
+    assert arrays.edge_sources.tolist() == [0, 1, 2]
+    assert arrays.edge_targets.tolist() == [1, 0, 3]
+    assert [strings[i] for i in arrays.edge_roles] == [
+        ':ARG0', ':ARG1', ':ARG0']
+    assert arrays.attribute_offsets.tolist() == [0, 1, 1, 1]
+    assert arrays.attribute_sources.tolist() == [1]
+    assert [strings[i] for i in arrays.attribute_targets] == ['1']
+
+    # a shared table keeps the ids of strings
+    table = arrays.table
+    again = corpus.to_arrays(graphs[:1], table=table)
+    assert again.edge_roles.tolist() == arrays.edge_roles[:2].tolist()
+
+    graphs = load(corpus_path)
+    expected = corpus.to_arrays(graphs)
+    gc = corpus.GraphCorpus(graphs)
+    arrays = gc.to_arrays()
+    for name in ('node_offsets', 'tops', 'edge_sources', 'edge_targets',
+                 'attribute_offsets'):
+        assert (getattr(arrays, name) == getattr(expected, name)).all()
+    assert ([gc.table[i] for i in arrays.node_variables]
+            == [expected.table[i] for i in expected.node_variables])
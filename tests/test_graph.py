@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import pickle
+
 import pytest
 
 import penman
+from penman.exceptions import GraphError
+from penman.graph import (LazyGraph, StringTable, CompactGraph)
 
 Graph = penman.Graph
 
@@ -192,3 +197,290 @@ class TestGraph(object):
             ('w', ':instance', 'wild'),
         ])
         assert g.reentrancies() == {'b': 1}
+
+    def test_indexes(self, x1):
+        g = Graph(x1[1])
+        assert g.edges(source='e2', role=':ARG1') == [('e2', ':ARG1', 'x1')]
+        assert g.attributes(role=':CARG') == [('x1', ':CARG', '"Abrams"')]
+        assert g.edges(target='nothing') == []
+
+        # tables are updated when triples are appended or removed
+        g.triples.append(('x1', ':ARG1', 'e3'))
+        assert g.edges(source='x1') == [('x1', ':ARG1', 'e3')]
+        g.triples.extend([('n', ':instance', 'new'), ('n', ':mod', 'x1')])
+        assert 'n' in g.variables()
+        assert g.edges(target='x1')[-1] == ('n', ':mod', 'x1')
+        g.triples.remove(('n', ':instance', 'new'))
+        assert g.edges(source='n') == [('n', ':mod', 'x1')]
+        assert g.triples.pop() == ('n', ':mod', 'x1')
+        assert 'n' not in g.variables()
+        del g.triples[-1]
+        assert g.edges(source='x1') == []
+        assert g == Graph(x1[1])
+
+        # and rebuilt after other changes
+        g.triples.insert(0, ('x1', ':ARG1', 'e3'))
+        assert g.edges(source='x1') == [('x1', ':ARG1', 'e3')]
+        g.triples[0] = ('x1', ':ARG2', 'e3')
+        assert g.edges(source='x1') == [('x1', ':ARG2', 'e3')]
+        g.triples.sort()
+        assert g.edges(role=':ARG1') == [
+            t for t in sorted(x1[1]) if t[1] == ':ARG1']
+        g.triples[:] = [('a', ':ARG0', 'b'), ('b', ':instance', 'beta')]
+        assert g.variables() == {'a', 'b'}
+        assert g.edges() == [('a', ':ARG0', 'b')]
+
+        g.triples = [('c', ':instance', 'gamma')]
+        assert g.variables() == {'c'}
+        assert g.instances() == [('c', ':instance', 'gamma')]
+
+        g2 = copy.deepcopy(g)
+        g2.triples.append(('c', ':ARG0', 'd'))
+        assert g.edges() == []
+        assert g2.attributes(role=':ARG0') == [('c', ':ARG0', 'd')]
+        g3 = pickle.loads(pickle.dumps(g2))
+        assert g3.attributes(role=':ARG0') == [('c', ':ARG0', 'd')]
+
+        # assigned lists are copied
+        triples = [('c', ':instance', 'gamma')]
+        g.triples = triples
+        triples.append(('c', ':ARG0', 'd'))
+        assert g.triples == [('c', ':instance', 'gamma')]
+
+        # graphs pickled with the triples in a plain list
+        state = dict(vars(g2))
+        state['triples'] = list(state.pop('_triples'))
+        g4 = Graph.__new__(Graph)
+        g4.__setstate__(state)
+        assert g4.triples == g2.triples
+        assert g4.attributes(role=':ARG0') == [('c', ':ARG0', 'd')]
+
+    def test_cached_split(self):
+        g = Graph([('a', ':instance', 'alpha'), ('a', ':ARG0', 'b')])
+        assert g.edges() == []
+        assert g.attributes() == [('a', ':ARG0', 'b')]
+        g.triples.append(('b', ':instance', 'beta'))
+        assert g.edges() == [('a', ':ARG0', 'b')]
+        assert g.attributes() == []
+        g.top = 'b'
+        assert g.edges() == [('a', ':ARG0', 'b')]
+
+        # the returned sets and lists are copies
+        g.variables().add('c')
+        g.edges().clear()
+        assert g.variables() == {'a', 'b'}
+        assert g.edges() == [('a', ':ARG0', 'b')]
+
+        # changes that bypass the list methods need invalidate()
+        list.append(g.triples, ('c', ':instance', 'gamma'))
+        list.append(g.triples, ('a', ':ARG1', 'c'))
+        g.invalidate()
+        assert g.variables() == {'a', 'b', 'c'}
+        assert g.edges() == [('a', ':ARG0', 'b'), ('a', ':ARG1', 'c')]
+
+    def test_copy(self):
+        g = penman.decode('# ::id 1\n(a / alpha :ARG0 (b / beta~e.2))')
+        g.top = 'b'
+        assert g.edges() == [('a', ':ARG0', 'b')]
+        h = g.copy()
+        assert h == g
+        assert h.top == 'b'
+        assert h.metadata == {'id': '1'}
+        assert h.epidata == g.epidata
+        assert h.edges() == [('a', ':ARG0', 'b')]
+        h.triples.append(('b', ':ARG1', 'c'))
+        h.epidata[('a', ':ARG0', 'b')].append(None)
+        h.metadata.clear()
+        assert len(g.triples) == 3
+        assert g.attributes() == []
+        assert h.attributes() == [('b', ':ARG1', 'c')]
+        assert g.epidata != h.epidata
+        assert g.metadata == {'id': '1'}
+        lazy = LazyGraph('(a / alpha)', {}, penman.decode)
+        assert type(lazy.copy()) is Graph
+        assert lazy.copy() == lazy
+
+    def test_traversal(self):
+        g = penman.decode('(a / alpha :ARG0 (b / beta :ARG0 (d / delta))'
+                          '   :ARG1 (c / gamma :ARG1 b :mod-of (e / eps))'
+                          '   :polarity -)')
+        assert g.successors('a') == [('a', ':ARG0', 'b'), ('a', ':ARG1', 'c')]
+        assert g.successors('d') == []
+        assert g.predecessors('b') == [('a', ':ARG0', 'b'),
+                                       ('c', ':ARG1', 'b')]
+        assert g.predecessors('c') == [('a', ':ARG1', 'c'),
+                                       ('e', ':mod', 'c')]
+        assert g.predecessors('a') == []
+        assert g.descendants('a') == {'b', 'c', 'd'}
+        assert g.descendants('e') == {'b', 'c', 'd'}
+        assert g.descendants('d') == set()
+        assert list(g.bfs()) == ['a', 'b', 'c', 'd']
+        assert list(g.bfs('e')) == ['e', 'c', 'b', 'd']
+        assert list(g.dfs()) == ['a', 'b', 'd', 'c']
+        assert list(g.dfs('c')) == ['c', 'b', 'd']
+        assert list(Graph().bfs()) == list(Graph().dfs()) == []
+        with pytest.raises(GraphError):
+            g.descendants('-')
+        with pytest.raises(GraphError):
+            list(g.bfs('zzz'))
+
+        # cycles
+        g.triples.append(('d', ':ARG2', 'a'))
+        assert g.successors('d') == [('d', ':ARG2', 'a')]
+        assert g.descendants('a') == {'a', 'b', 'c', 'd'}
+        assert list(g.dfs('d')) == ['d', 'a', 'b', 'c']
+
+        sub = penman.decode('(c / gamma :ARG1 (b / beta~1))').subgraph('c')
+        assert sub.top == 'c'
+        assert sub.triples == [('c', ':instance', 'gamma'),
+                               ('c', ':ARG1', 'b'),
+                               ('b', ':instance', 'beta')]
+        assert sub.epidata[('b', ':instance', 'beta')] != []
+        sub = g.subgraph('b')
+        assert sub.top == 'b'
+        assert set(sub.triples) == {('b', ':instance', 'beta'),
+                                    ('b', ':ARG0', 'd'),
+                                    ('d', ':instance', 'delta'),
+                                    ('d', ':ARG2', 'a'),
+                                    ('a', ':instance', 'alpha'),
+                                    ('a', ':ARG0', 'b'),
+                                    ('a', ':ARG1', 'c'),
+                                    ('a', ':polarity', '-'),
+                                    ('c', ':instance', 'gamma'),
+                                    ('c', ':ARG1', 'b')}
+        with pytest.raises(GraphError):
+            g.subgraph('-')
+
+
+class TestLazyGraph(object):
+    def test_load(self):
+        calls = []
+
+        def _decode(s):
+            calls.append(s)
+            return penman.decode(s)
+
+        g = LazyGraph('# ::id 1\n(a / alpha)', {'id': '1'}, _decode, body=9)
+        assert g.metadata == {'id': '1'}
+        assert not g.is_loaded()
+        assert not g.is_modified()
+        assert calls == []
+        assert g.top == 'a'
+        assert g.is_loaded()
+        assert g.triples == [('a', ':instance', 'alpha')]
+        assert g.epidata == {('a', ':instance', 'alpha'): []}
+        assert len(calls) == 1
+        assert g == penman.decode('(a / alpha)')
+        with pytest.raises(AttributeError):
+            g.missing
+
+    def test_is_modified(self):
+        g = LazyGraph('(a / alpha)', {}, penman.decode)
+        g.metadata['id'] = '1'
+        assert not g.is_modified()
+        g.triples.append(('a', ':ARG0', 'b'))
+        assert g.is_modified()
+        g.triples.pop()
+        assert not g.is_modified()
+        g.epidata[('a', ':instance', 'alpha')].append(None)
+        assert g.is_modified()
+
+        # assigned before decoding
+        g = LazyGraph('(a / alpha)', {}, penman.decode)
+        g.triples = [('b', ':instance', 'beta')]
+        assert g.is_modified()
+        assert g.triples == [('b', ':instance', 'beta')]
+        assert g.epidata == {('a', ':instance', 'alpha'): []}
+
+    def test_copy(self):
+        g = LazyGraph('(a / alpha)', {}, penman.decode)
+        g2 = copy.deepcopy(g)
+        assert not g2.is_loaded()
+        assert g2.triples == [('a', ':instance', 'alpha')]
+        g3 = pickle.loads(pickle.dumps(g))
+        assert g3.triples == [('a', ':instance', 'alpha')]
+
+
+def test_StringTable():
+    table = StringTable(['a', ':ARG0'])
+    assert len(table) == 2
+    assert table.intern('b') == 2
+    assert table.intern(':ARG0') == 1
+    assert table.intern(None) == 3
+    assert table[2] == 'b'
+    assert table.lookup('b') == 2
+    assert table.lookup('c') is None
+    assert 'a' in table
+    assert 'c' not in table
+
+
+class TestCompactGraph(object):
+    def test_init(self, x1):
+        table = StringTable()
+        g = Graph(x1[1])
+        cg = CompactGraph(x1[1], table=table)
+        assert cg.triples == g.triples
+        assert cg.top == 'e2'
+        assert cg == g and g == cg
+        assert len(table) < 3 * len(cg.triples)
+        assert not hasattr(cg, '__dict__')
+
+        cg = CompactGraph()
+        assert cg.triples == []
+        assert cg.top is None
+        assert cg.epidata == {}
+        assert cg.variables() == set()
+
+        cg = CompactGraph([('a', 'ARG0', None)], top='b', metadata={'id': '1'})
+        assert cg.triples == [('a', ':ARG0', None)]
+        assert cg.top == 'b'
+        assert cg.variables() == {'a', 'b'}
+        assert cg.metadata == {'id': '1'}
+
+    def test_from_graph(self):
+        g = penman.decode('''
+            # ::id 1
+            (a / alpha :ARG0 (b / beta :ARG1-of a) :mod 7)''')
+        cg = CompactGraph.from_graph(g)
+        assert cg.triples == g.triples
+        assert cg.epidata == g.epidata
+        assert cg.metadata == {'id': '1'}
+        assert cg.instances() == g.instances()
+        assert cg.edges() == g.edges()
+        assert cg.edges(target='b') == g.edges(target='b')
+        assert len(cg.edges(target='b')) == 2
+        assert cg.edges(role=':missing') == []
+        assert cg.attributes() == [('a', ':mod', '7')]
+        assert cg.reentrancies() == g.reentrancies()
+        assert penman.encode(cg) == penman.encode(g)
+        g2 = cg.to_graph()
+        assert isinstance(g2, Graph)
+        assert g2 == g
+        assert g2.epidata == g.epidata
+
+    def test_table(self):
+        triples = [('a', ':instance', 'alpha')]
+        assert CompactGraph(triples)._table is not CompactGraph()._table
+        table = StringTable()
+        cg = CompactGraph(triples, table=table)
+        cg2 = CompactGraph(triples, table=table)
+        assert cg._table is cg2._table is table
+        assert len(table) == 3
+        assert pickle.loads(pickle.dumps(cg))._table is not table
+
+    def test_cache(self):
+        g = penman.decode('(a / alpha~1 :ARG0 (b / beta))')
+        cg = CompactGraph.from_graph(g)
+        assert cg.epidata is cg.epidata
+        assert cg.epidata == g.epidata
+        assert cg._variable_ids() is cg._variable_ids()
+        g2 = cg.to_graph()
+        g2.epidata[('a', ':instance', 'alpha')].append('x')
+        assert cg.epidata == g.epidata
+
+    def test_copy(self):
+        cg = CompactGraph([('a', ':instance', 'alpha')], table=StringTable())
+        cg2 = pickle.loads(pickle.dumps(cg))
+        assert cg2 == cg
+        assert cg2.triples == [('a', ':instance', 'alpha')]
+        assert copy.deepcopy(cg) == cg
@@ -1,4 +1,6 @@
 
+import pytest
+
 from penman.interface import (
     decode,
     loads,
@@ -18,10 +20,24 @@ def test_loads():
     assert len(gs) == 2
     assert gs[0].triples == [('a', ':instance', 'alpha')]
     assert gs[1].triples == [('b', ':instance', 'beta')]
-
-
-def test_load():
-    pass
+    gs = loads('(a / alpha)(b / beta)', workers=2)
+    assert [g.top for g in gs] == ['a', 'b']
+
+
+def test_load(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text('# ::id 1\n(a / alpha)\n\n(b / beta)\n')
+    gs = load(path)
+    assert [g.top for g in gs] == ['a', 'b']
+    assert gs[0].metadata == {'id': '1'}
+    with open(path) as fh:
+        assert [g.top for g in load(fh)] == ['a', 'b']
+    gs = load(path, mmap=True)
+    assert [g.top for g in gs] == ['a', 'b']
+    assert gs[0].metadata == {'id': '1'}
+    with open(path) as fh:
+        with pytest.raises(ValueError):
+            load(fh, mmap=True)
 
 
 def test_encode():
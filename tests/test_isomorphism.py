@@ -0,0 +1,52 @@
+
+from penman import decode
+from penman.graph import Graph
+from penman.isomorphism import (structural_hash, is_isomorphic)
+
+
+def test_structural_hash():
+    g = decode('(a / alpha :ARG0 (b / beta :ARG1 (g / gamma)) :mod 7)')
+    h = structural_hash(g)
+    assert len(h) == 32
+    # variables, triple order, epidata, and metadata do not matter
+    assert structural_hash(decode(
+        '# ::id 1\n'
+        '(x / alpha :mod 7 :ARG0 (y / beta :ARG1 (z / gamma)))')) == h
+    assert structural_hash(decode(
+        '(x / alpha :ARG0 (y / beta) :mod 7 :ARG0-of (z / gamma))')) != h
+    assert structural_hash(decode(
+        '(a / alpha :ARG0 (b / beta :ARG1 (g / gamma)) :mod "7")')) != h
+    assert structural_hash(decode(
+        '(b / beta :ARG0-of (a / alpha :mod 7) :ARG1 (g / gamma))')) != h
+    assert structural_hash(Graph()) == structural_hash(Graph())
+
+
+def test_is_isomorphic():
+    g1 = decode('(a / alpha :ARG0 (b / beta :ARG0 a) :ARG1 (c / beta))')
+    g2 = decode('(x / alpha :ARG1 (y / beta) :ARG0 (z / beta :ARG0 x))')
+    g3 = decode('(x / alpha :ARG1 (y / beta :ARG0 x) :ARG0 (z / beta))')
+    assert is_isomorphic(g1, g2)
+    assert is_isomorphic(g2, g1)
+    assert not is_isomorphic(g1, g3)
+    assert not is_isomorphic(g1, decode('(a / alpha)'))
+    assert is_isomorphic(Graph(), Graph())
+
+    # the same colors but no mapping of variables: a 6-cycle and two
+    # 3-cycles
+    def cycles(*sizes):
+        triples = []
+        offset = 0
+        for size in sizes:
+            for i in range(size):
+                v = f'v{offset + i}'
+                triples.append((v, ':instance', 'x'))
+                triples.append((v, ':next', f'v{offset + (i + 1) % size}'))
+            offset += size
+        return Graph(triples, top='v0')
+
+    g1 = cycles(6)
+    g2 = cycles(3, 3)
+    g3 = Graph([(f'a{t[0][1:]}', t[1], f'a{t[2][1:]}' if t[1] == ':next'
+                 else t[2]) for t in reversed(g1.triples)], top='a0')
+    assert is_isomorphic(g1, g3)
+    assert not is_isomorphic(g1, g2)
@@ -1,4 +1,6 @@
 
+import sys
+
 import pytest
 
 from penman.exceptions import LayoutError
@@ -7,6 +9,7 @@ from penman.tree import Tree
 from penman.graph import Graph
 from penman.codec import PENMANCodec
 from penman.layout import (
+    POP,
     interpret,
     rearrange,
     configure,
@@ -15,6 +18,11 @@ from penman.layout import (
     get_pushed_variable,
     appears_inverted,
     node_contexts,
+    LayoutAnalysis,
+    canonicalize,
+    first_occurrence,
+    least_depth,
+    fewest_inverted,
 )
 
 
@@ -44,6 +52,25 @@ def test_interpret(amr_model):
         top='a')
 
 
+def test_deep_layout():
+    # deeper than the default recursion limit
+    depth = 2 * sys.getrecursionlimit()
+    node = (f'n{depth}', [('/', 'c')])
+    for i in range(depth - 1, -1, -1):
+        node = (f'n{i}', [('/', 'c'), (':ARG0-of', node), (':mod', 'x')])
+    g = interpret(Tree(node))
+    assert len(g.triples) == 3 * depth + 1
+    assert g.triples[:4] == [('n0', ':instance', 'c'),
+                             ('n1', ':ARG0', 'n0'),
+                             ('n1', ':instance', 'c'),
+                             ('n2', ':ARG0', 'n1')]
+    assert get_pushed_variable(g, ('n1', ':ARG0', 'n0')) == 'n1'
+    assert g.epidata[(f'n{depth}', ':instance', 'c')] == [POP]
+    t = configure(g)
+    assert len(t.nodes()) == depth + 1
+    assert interpret(t).triples == g.triples
+
+
 def test_rearrange():
     t = codec.parse('''
         (a / alpha
@@ -106,6 +133,107 @@ def test_configure(amr_model):
                (':consist-of-of', ('a', [('/', 'A')]))]))
 
 
+def test_configure_strategy():
+    g = codec.decode('''
+        (d / dog
+           :ARG0-of (b / bark-01)
+           :ARG0-of (t / try-01
+                       :ARG1 b))''')
+    assert first_occurrence(g, 'd') == {
+        'b': ('b', ':ARG0', 'd'),
+        't': ('t', ':ARG1', 'b')}
+    assert least_depth(g, 'd') == {
+        'b': ('b', ':ARG0', 'd'),
+        't': ('t', ':ARG0', 'd')}
+    assert fewest_inverted(g, 'd') == {
+        't': ('t', ':ARG0', 'd'),
+        'b': ('t', ':ARG1', 'b')}
+    assert fewest_inverted(g, 't') == {
+        'd': ('t', ':ARG0', 'd'),
+        'b': ('t', ':ARG1', 'b')}
+    assert configure(g, strategy=fewest_inverted) == Tree(
+        ('d', [('/', 'dog'),
+               (':ARG0-of', ('t', [('/', 'try-01'),
+                                   (':ARG1', ('b', [('/', 'bark-01'),
+                                                    (':ARG0', 'd')]))]))]))
+    assert configure(g, top='t', strategy=least_depth) == Tree(
+        ('t', [('/', 'try-01'),
+               (':ARG0', ('d', [('/', 'dog')])),
+               (':ARG1', ('b', [('/', 'bark-01'),
+                                (':ARG0', 'd')]))]))
+    # layout markers are ignored, other epigraphical data are kept
+    g = codec.decode('(a / alpha~1 :ARG0 (b / beta) :ARG1 b)')
+    assert configure(g, strategy=least_depth) == configure(g)
+    g = codec.decode('(a / alpha~1 :ARG0 b :ARG1 (b / beta))')
+    assert configure(g, strategy=first_occurrence) == Tree(
+        ('a', [('/', 'alpha~1'),
+               (':ARG0', ('b', [('/', 'beta')])),
+               (':ARG1', 'b')]))
+    with pytest.raises(LayoutError):
+        configure(g, top='c', strategy=least_depth)
+    g = Graph([('a', ':instance', 'alpha'), ('b', ':instance', 'beta')])
+    with pytest.raises(LayoutError):
+        configure(g, strategy=least_depth)
+    # concepts that are also variables are not edges
+    g = codec.decode('(w / want-01 :ARG0 (i2 / i) :ARG1 (i / i))')
+    assert configure(g, strategy=first_occurrence) == configure(g)
+    g = codec.decode('(b / a :ARG0 (a / x))')
+    for strategy in (first_occurrence, least_depth, fewest_inverted):
+        assert configure(g, strategy=strategy) == configure(g)
+
+
+def test_reconfigure():
+    g = codec.decode('''
+        (a / alpha
+           :ARG0 (g / gamma
+                    :ARG1 b)
+           :ARG1 (b / beta~1))''')
+    epidata = repr(g.epidata)
+    expected = Tree(
+        ('a', [('/', 'alpha'),
+               (':ARG0', ('g', [('/', 'gamma'),
+                                (':ARG1', ('b', [('/', 'beta~1')]))])),
+               (':ARG1', 'b')]))
+    assert configure(g) != expected
+    assert configure(g, ignore_markers=True) == expected
+    assert reconfigure(g) == expected
+    # the graph is not modified
+    assert repr(g.epidata) == epidata
+    assert configure(g) != expected
+
+
+def test_configure_unmarked():
+    # graphs built from triples have no layout markers
+    g = Graph([('c', ':instance', 'gamma'),
+               ('a', ':ARG0', 'b'),
+               ('d', ':ARG0-of', 'c'),
+               ('b', ':ARG1', 'c'),
+               ('a', ':instance', 'alpha'),
+               ('b', ':instance', 'beta'),
+               ('d', ':instance', 'delta'),
+               ('a', ':ARG1', 'd')],
+              top='a')
+    assert configure(g) == Tree(
+        ('a', [('/', 'alpha'),
+               (':ARG0', ('b', [('/', 'beta'),
+                                (':ARG1', ('c', [('/', 'gamma'),
+                                                 (':ARG0', 'd')]))])),
+               (':ARG1', ('d', [('/', 'delta')]))]))
+    g = Graph([('a', ':instance', 'alpha'),
+               ('b', ':instance', 'beta')],
+              top='a')
+    with pytest.raises(LayoutError):
+        configure(g)
+
+
+def test_has_valid_layout():
+    assert has_valid_layout(codec.decode('(a / alpha :ARG0 (b / beta))'))
+    g = Graph([('a', ':instance', 'alpha'),
+               ('b', ':instance', 'beta'),
+               ('a', ':ARG0', 'b')])
+    assert not has_valid_layout(g)
+
+
 def test_issue_34():
     # https://github.com/goodmami/penman/issues/34
     g = codec.decode('''
@@ -176,3 +304,53 @@ def test_node_contexts():
     # also ('b', ':instance', None) here
     g = codec.decode('(a :ARG0 (b) :ARG1 (g / gamma))')
     assert node_contexts(g) == ['a', 'a', 'b', 'a', 'g']
+
+
+def test_LayoutAnalysis():
+    g = codec.decode('''
+        (a / alpha
+           :ARG0 (b / beta)
+           :ARG1 (g / gamma
+                    :ARG0 (d / delta)
+                    :ARG1-of (e / epsilon)
+                    :ARG1-of b))''')
+    analysis = LayoutAnalysis(g)
+    assert analysis.node_contexts() == node_contexts(g)
+    for triple in g.triples:
+        assert (analysis.get_pushed_variable(triple)
+                == get_pushed_variable(g, triple))
+        assert analysis.appears_inverted(triple) == appears_inverted(g, triple)
+    assert analysis.appears_inverted(('b', ':ARG1', 'g'))
+    assert not analysis.appears_inverted(('a', ':instance', 'alpha'))
+    # graphs without epigraphical data
+    g = Graph([('a', ':instance', 'alpha'), ('b', ':ARG0', 'a')], top='a')
+    analysis = LayoutAnalysis(g)
+    assert analysis.node_contexts() == ['a', 'a']
+    assert analysis.get_pushed_variable(('b', ':ARG0', 'a')) is None
+    assert analysis.appears_inverted(('b', ':ARG0', 'a'))
+
+
+def test_canonicalize():
+    g1 = codec.decode('(a / alpha :ARG1 (g / gamma) :ARG0 (b / beta))')
+    g2 = codec.decode('(x / alpha :ARG0 (y / beta) :ARG1 (z / gamma))')
+    t = canonicalize(g1)
+    assert t == Tree(('a', [('/', 'alpha'),
+                            (':ARG0', ('b', [('/', 'beta')])),
+                            (':ARG1', ('g', [('/', 'gamma')]))]))
+    assert canonicalize(g2) == t
+    # triple order and epidata are ignored
+    g3 = Graph(list(reversed(g1.triples)), top='a')
+    assert canonicalize(g3) == t
+    g = codec.decode('(a / alpha :ARG0-of (b / beta :ARG1 a))')
+    assert canonicalize(g) == Tree(
+        ('a', [('/', 'alpha'),
+               (':ARG0-of', ('b', [('/', 'beta'), (':ARG1', 'a')]))]))
+    assert canonicalize(g, top='b') == Tree(
+        ('b', [('/', 'beta'),
+               (':ARG0', ('a', [('/', 'alpha'), (':ARG1-of', 'b')]))]))
+    assert canonicalize(Graph([])) == Tree((None, []))
+    with pytest.raises(LayoutError):
+        canonicalize(g, top='alpha')
+    with pytest.raises(LayoutError):
+        canonicalize(Graph([('a', ':instance', 'alpha'),
+                            ('b', ':instance', 'beta')], top='a'))
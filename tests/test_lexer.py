@@ -1,5 +1,9 @@
 
+import pytest
+
 from penman import lexer
+from penman.exceptions import DecodeError
+
 
 def test_lex_penman():
     def _lex(s):
@@ -26,6 +30,25 @@ def test_lex_penman():
         'COMMENT', 'COMMENT', 'LPAREN', 'SYMBOL', 'SLASH', 'SYMBOL', 'RPAREN']
 
 
+def test_lex_buffer():
+    def _lex(s):
+        return [tuple(tok) for tok in lexer.lex(s)]
+
+    s = '# comment\n(a / alpha\n\n  :ROLE "b c")\n(d)'
+    assert _lex(s) == _lex(s.splitlines())
+    assert _lex(s)[-4:-1] == [
+        ('RPAREN', ')', 4, 13, '  :ROLE "b c")'),
+        ('LPAREN', '(', 5, 0, '(d)'),
+        ('SYMBOL', 'd', 5, 1, '(d)')]
+    # strings do not span lines
+    assert _lex('(a :ROLE "b\nc")') == _lex(['(a :ROLE "b', 'c")'])
+    # line boundaries are those of str.splitlines()
+    for s in ('(a / b)\r:x 1', '(a / b)\r\n:x 1', '(a / b)\u2028:x 1',
+              '# c\x0c(a / b)\x85:x 1'):
+        assert _lex(s) == _lex(s.splitlines())
+    assert _lex('(a / b)\r:x 1')[-2] == ('ROLE', ':x', 2, 0, ':x 1')
+
+
 def test_lex_triples():
     def _lex(s):
         return [tok.type for tok in lexer.lex(s, pattern=lexer.TRIPLE_RE)]
@@ -55,5 +78,62 @@ def test_lex_triples():
         'SYMBOL', 'LPAREN', 'SYMBOL', 'RPAREN']
 
 
+def test_TokenStream():
+    def _lex(s):
+        tokens = lexer.TokenStream(s, lexer.PENMAN_RE)
+        types = []
+        while tokens:
+            types.append(tokens.type)
+            tokens.advance()
+        return types
+
+    names = lexer.PENMAN_RE.groupindex
+    s = '# comment\n(a / alpha\n  :ROLE "b c")'
+    assert _lex(s) == [names[tok.type] for tok in lexer.lex(s)]
+    assert _lex(s) == _lex(s.splitlines())
+    s = '# comment\r(a / alpha\x85  :ROLE "b c")'
+    assert _lex(s) == _lex(s.splitlines())
+
+    tokens = lexer.TokenStream('(a / b)\r:x 1', lexer.PENMAN_RE)
+    for _ in range(5):
+        tokens.advance()
+    assert tokens.locate(tokens.advance()) == (2, 0, ':x 1')
+
+    tokens = lexer.TokenStream('(a / alpha\n  :ROLE b)', lexer.PENMAN_RE)
+    assert tokens.expect(names['LPAREN']).group() == '('
+    assert tokens.expect(names['SYMBOL']).group() == 'a'
+    with pytest.raises(DecodeError):
+        tokens.expect(names['ROLE'])
+    tokens.advance()
+    alpha = tokens.advance()
+    assert tokens.locate(alpha) == (1, 5, '(a / alpha')
+    assert tokens.locate(tokens.advance()) == (2, 2, '  :ROLE b)')
+    e = tokens.error('test')
+    assert (e.lineno, e.offset, e.text) == (2, 7, '  :ROLE b)')
+
+
+def test_scan_graphs():
+    def _spans(s, pos=0):
+        return [tuple(span) for span in lexer.scan_graphs(s, pos)]
+
+    assert _spans('') == []
+    assert _spans('# comment\n') == []
+    s = '# ::id 1\n(a / alpha)\n\n# ::id 2\n# ::snt x\n(b :ARG (c))\n'
+    assert _spans(s) == [(0, 9, 20), (22, 41, 53)]
+    assert _spans(s.encode('utf-8')) == [(0, 9, 20), (22, 41, 53)]
+    assert _spans(s, 20) == [(22, 41, 53)]
+    # parentheses in strings and comments are ignored
+    s = '(a :ARG ")(" :ARG2 (b))\n(c # )\n)'
+    assert _spans(s) == [(0, 0, 23), (24, 24, 32)]
+    assert _spans('(a :ARG "x\\"(")') == [(0, 0, 15)]
+    # quotes inside symbols do not start strings
+    assert _spans('(a :ARG x"(")') == [(0, 0, 13)]
+    # graphs on one line, stray text, and an unclosed graph
+    assert _spans('(a)(b) x ) (c') == [(0, 0, 3), (3, 3, 6), (11, 11, 13)]
+    # deeply nested graphs
+    s = '(a :ARG ' * 100 + '(b)' + ')' * 100
+    assert _spans(s) == [(0, 0, len(s))]
+
+
 def test_TokenIterator():
     pass  # TODO: write tests for expect() and accept()
@@ -0,0 +1,97 @@
+
+import pytest
+
+from penman import decode
+from penman.exceptions import PenmanError
+from penman.graph import Graph
+from penman.smatch import (
+    Score,
+    score,
+    iterscore,
+    total,
+    corpus_score,
+    pair_graphs,
+)
+
+
+G1 = decode('(a / alpha :ARG0 (b / beta) :ARG1 (g / gamma :ARG0 b))')
+G2 = decode('(x / alpha :ARG1 (y / gamma :ARG0 (z / beta)) :ARG0 z)')
+G3 = decode('(x / alpha :ARG0 (y / beta) :polarity -)')
+
+
+def test_Score():
+    s = Score(3, 4, 6)
+    assert s.precision == 0.75
+    assert s.recall == 0.5
+    assert s.f_score == 0.6
+    assert Score(0, 0, 0).f_score == 0.0
+
+
+def test_score():
+    # 3 instances, 3 relations, and the top
+    assert score(G1, G2) == Score(7, 7, 7)
+    assert score(G1, G1).f_score == 1.0
+    # the :ARG1 and :ARG0 edges of g and its instance do not match
+    assert score(G1, G3) == Score(4, 7, 5)
+    assert score(G3, G1) == Score(4, 5, 7)
+    # case-insensitive
+    assert score(decode('(a / Alpha)'), decode('(a / alpha)')).matched == 2
+    assert score(decode('(a / alpha)'), decode('(a / beta)')).matched == 1
+    # a variable only matches one other variable
+    assert score(decode('(a / x :ARG0 (b / x))'),
+                 decode('(a / x)')) == Score(2, 4, 2)
+    # duplicate triples are counted once
+    s = score(Graph([('a', ':instance', 'x')] + [('a', ':mod', '1')] * 5),
+              Graph([('b', ':instance', 'x'), ('b', ':mod', '1')]))
+    assert s == Score(3, 3, 3)
+    s = score(decode('(a / x :ARG0 (b / y) :ARG0 b :mod 1 :MOD 1)'),
+              decode('(a / x :ARG0 (b / y) :ARG1 b :mod 1 :mod 2)'))
+    assert s == Score(5, 5, 7)
+    assert s.precision <= 1 and s.recall <= 1 and s.f_score <= 1
+    with pytest.raises(ValueError):
+        score(G1, G2, restarts=-1)
+
+
+def test_score_restarts():
+    # hill-climbing from the mapping of c to the gold a, which has
+    # the same concept, gets stuck; a seeded restart finds the optimum
+    test = decode('(a / x :ARG0 (b / x) :ARG1 (c / y))')
+    gold = decode('(a / y :ARG0 (b / y) :ARG1 (c / z))')
+    assert score(test, gold, restarts=0) == Score(1, 6, 6)
+    assert score(test, gold) == Score(3, 6, 6)
+    assert score(test, gold) == score(test, gold)
+
+
+def test_iterscore():
+    pairs = [(G1, G2), (G1, G3), (G3, G1)] * 3
+    expected = [score(t, g) for t, g in pairs]
+    assert list(iterscore(pairs)) == expected
+    assert list(iterscore(pairs, workers=2, chunksize=2)) == expected
+    assert list(iterscore([], workers=2)) == []
+    # arguments are checked before any pair is scored
+    with pytest.raises(ValueError):
+        iterscore(pairs, workers=2, chunksize=0)
+    with pytest.raises(ValueError):
+        iterscore(pairs, workers=0)
+    with pytest.raises(ValueError):
+        iterscore(pairs, restarts=-1)
+
+
+def test_total():
+    assert total([]) == Score(0, 0, 0)
+    assert total([Score(1, 2, 3), Score(4, 5, 6)]) == Score(5, 7, 9)
+
+
+def test_corpus_score():
+    assert corpus_score([G1, G1], [G2, G3]) == Score(11, 14, 12)
+    with pytest.raises(PenmanError):
+        corpus_score([G1, G1], [G2])
+    with pytest.raises(PenmanError):
+        corpus_score([G1], [G2, G3])
+
+
+def test_pair_graphs():
+    assert list(pair_graphs([G1, G2], [G2, G3])) == [(G1, G2), (G2, G3)]
+    assert list(pair_graphs([], [])) == []
+    with pytest.raises(PenmanError):
+        list(pair_graphs([G1], []))